@@ -0,0 +1,148 @@
+# agents/layout_engine.py
+from typing import Dict, List, Tuple
+
+# -------------------------------
+# Per visual type sizing rules
+# min / preferred are (width, height) in canvas pixels;
+# aspect is the preferred width / height ratio
+# -------------------------------
+VISUAL_SIZES: Dict[str, dict] = {
+    "card":    {"min": (200, 90),  "preferred": (300, 110), "aspect": 2.7},
+    "bar":     {"min": (380, 220), "preferred": (600, 300), "aspect": 1.8},
+    "column":  {"min": (380, 220), "preferred": (600, 300), "aspect": 1.8},
+    "line":    {"min": (380, 220), "preferred": (600, 300), "aspect": 2.0},
+    "pie":     {"min": (300, 220), "preferred": (400, 300), "aspect": 1.3},
+    "table":   {"min": (400, 220), "preferred": (620, 300), "aspect": 1.6},
+    "textbox": {"min": (200, 40),  "preferred": (1240, 40), "aspect": 31.0},
+}
+DEFAULT_SIZE = VISUAL_SIZES["bar"]
+
+# Shelves of these types keep their size; leftover height goes to the others
+FIXED_HEIGHT_TYPES = {"card", "textbox"}
+
+
+def size_rule(visual_type: str) -> dict:
+    return VISUAL_SIZES.get(visual_type, DEFAULT_SIZE)
+
+
+class LayoutEngine:
+    """
+    Deterministic shelf packer for one canvas region.
+
+    Visuals are placed row by row ("shelves"): cards first, then charts,
+    each group in input order. A shelf takes visuals while their minimum
+    widths (plus gaps) fit, then widths are distributed between minimum
+    and preferred size - or stretched past preferred to fill the row.
+    Heights follow the aspect preference, clamped to [min, preferred].
+    Shelves are then shrunk towards their minimum heights, or grown
+    (charts only) to fill the region. Shelves whose minimum heights no
+    longer fit are returned as overflow for the next page.
+
+    Guarantees for every placed visual (given a region at least as large
+    as the biggest minimum size): inside the region, no overlaps, never
+    smaller than its type's minimum size.
+    """
+
+    def __init__(self, x: int = 20, y: int = 70, width: int = 1240, height: int = 630, gap: int = 20):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.gap = gap
+
+    def pack(self, visual_types: List[str]) -> Tuple[Dict[int, tuple], List[int]]:
+        """
+        visual_types: one type per visual (input order).
+        Returns ({input index: (x, y, width, height)}, [overflow indices]).
+        """
+        order = sorted(
+            range(len(visual_types)),
+            key=lambda i: (visual_types[i] not in FIXED_HEIGHT_TYPES, i)
+        )
+
+        # 1. Shelves by minimum width (a type-group change starts a new shelf)
+        shelves = []
+        current, used = [], 0
+        for i in order:
+            min_w = min(size_rule(visual_types[i])["min"][0], self.width)
+            fixed = visual_types[i] in FIXED_HEIGHT_TYPES
+            if current and (
+                used + self.gap + min_w > self.width
+                or fixed != (visual_types[current[0]] in FIXED_HEIGHT_TYPES)
+            ):
+                shelves.append(current)
+                current, used = [], 0
+            used += min_w + (self.gap if current else 0)
+            current.append(i)
+        if current:
+            shelves.append(current)
+
+        # 2. Widths and natural heights per shelf
+        rows = []
+        for shelf in shelves:
+            rules = [size_rule(visual_types[i]) for i in shelf]
+            widths = self._widths(rules)
+            heights = [
+                max(r["min"][1], min(r["preferred"][1], int(w / r["aspect"])))
+                for r, w in zip(rules, widths)
+            ]
+            rows.append({
+                "items": shelf,
+                "widths": widths,
+                "height": max(heights),
+                "min_height": max(r["min"][1] for r in rules),
+                "fixed": visual_types[shelf[0]] in FIXED_HEIGHT_TYPES
+            })
+
+        # 3. Overflow: drop trailing shelves until minimum heights fit
+        overflow = []
+        while len(rows) > 1 and self._total(rows, "min_height") > self.height:
+            overflow = rows.pop()["items"] + overflow
+
+        # 4. Fit the region vertically
+        self._fit_heights(rows)
+
+        placements = {}
+        y = self.y
+        for row in rows:
+            x = self.x
+            for i, w in zip(row["items"], row["widths"]):
+                placements[i] = (x, y, w, row["height"])
+                x += w + self.gap
+            y += row["height"] + self.gap
+        return placements, sorted(overflow)
+
+    def _widths(self, rules: List[dict]) -> List[int]:
+        avail = self.width - self.gap * (len(rules) - 1)
+        mins = [min(r["min"][0], self.width) for r in rules]
+        prefs = [max(m, r["preferred"][0]) for m, r in zip(mins, rules)]
+
+        if sum(prefs) <= avail:
+            # Stretch proportionally to fill the row
+            widths = [p * avail // sum(prefs) for p in prefs]
+        else:
+            # Interpolate between min and preferred
+            slack = sum(prefs) - sum(mins)
+            t = (avail - sum(mins)) / slack if slack else 0.0
+            widths = [m + int((p - m) * t) for m, p in zip(mins, prefs)]
+        return [max(w, m) for w, m in zip(widths, mins)]
+
+    def _total(self, rows: List[dict], key: str) -> int:
+        return sum(row[key] for row in rows) + self.gap * max(len(rows) - 1, 0)
+
+    def _fit_heights(self, rows: List[dict]):
+        total = self._total(rows, "height")
+        if total > self.height:
+            # Shrink every shelf towards its minimum, proportionally
+            min_total = self._total(rows, "min_height")
+            # (t < 0 only if a lone shelf cannot fit at all; keep its minimum)
+            t = max(0.0, (self.height - min_total) / (total - min_total))
+            for row in rows:
+                row["height"] = row["min_height"] + int((row["height"] - row["min_height"]) * t)
+        else:
+            # Give the spare height to chart shelves
+            growable = [row for row in rows if not row["fixed"]]
+            spare = self.height - total
+            for k, row in enumerate(growable):
+                share = spare // len(growable) + (1 if k < spare % len(growable) else 0)
+                row["height"] += share
@@ -1,5 +1,9 @@
 from typing import List
 from core.models import BoundVisual, VisualLayout
+from agents.layout_engine import LayoutEngine
+from core.log import get_logger
+
+log = get_logger("layout")
 
 class LayoutPlanner:
     """
@@ -8,101 +12,78 @@ class LayoutPlanner:
     CANVAS_WIDTH = 1280
     CANVAS_HEIGHT = 720
     PADDING = 20
-    
-    # Standard grid (e.g., 2 columns, 3 rows) - customizable
-    GRID_COLS = 2
-    GRID_ROWS = 2
+
+    # Header textbox (approx. from template)
+    HEADER_X = 13
+    HEADER_Y = 10
+    HEADER_WIDTH = 1246
+    HEADER_HEIGHT = 40
+
+    def __init__(self):
+        # Everything below the header, inside the padding
+        content_y = self.HEADER_Y + self.HEADER_HEIGHT + self.PADDING
+        self.engine = LayoutEngine(
+            x=self.PADDING,
+            y=content_y,
+            width=self.CANVAS_WIDTH - 2 * self.PADDING,
+            height=self.CANVAS_HEIGHT - content_y - self.PADDING,
+            gap=self.PADDING
+        )
+
+    def paginate(self, visuals: List[BoundVisual]) -> List[List[BoundVisual]]:
+        """
+        Splits visuals into pages the layout engine can place without
+        shrinking anything below its minimum size. Each page takes what
+        fits; the overflow (in input order) continues on the next page.
+        """
+        pages = []
+        remaining = list(visuals)
+        while remaining:
+            placements, overflow = self.engine.pack([v.visual_type for v in remaining])
+            pages.append([v for i, v in enumerate(remaining) if i in placements])
+            remaining = [remaining[i] for i in overflow]
+        return pages or [[]]
 
     def plan_layout(self, visuals: List[BoundVisual], dashboard_title: str = "Dashboard") -> List[BoundVisual]:
         """
         Assigns x, y, width, height, tabOrder to each visual.
+        Sizes come from the constraint engine (agents/layout_engine.py);
+        use paginate() first for dashboards that may not fit one canvas.
         """
         # TODO: integrate LLM here to assign "Zones" (Header, Sidebar, Main)
-        # For now, use a smart flow algorithm to place them in a grid.
-        
+
         updated_visuals = []
-        
+
         # 0. HEADER (Compulsory)
-        header_height = 40 # Approx from template (37.85)
-        header_y = 10      # Approx from template (10.59)
-        header_x = 13      # Approx from template (13.62)
-        header_width = self.CANVAS_WIDTH - 2 * header_x # Center it roughly
-        
         header_visual = BoundVisual(
             visual_name="dashboard_header",
             visual_type="textbox",
             title=dashboard_title, # This will be the text content
             bindings=[],
             layout=VisualLayout(
-                x=int(header_x),
-                y=int(header_y),
-                width=int(1246), # From template
-                height=int(header_height),
+                x=self.HEADER_X,
+                y=self.HEADER_Y,
+                width=self.HEADER_WIDTH,
+                height=self.HEADER_HEIGHT,
                 tabOrder=0
             )
         )
         updated_visuals.append(header_visual)
 
-        # Simple Logic:
-        # 1. Cards take top row (small height)
-        # 2. Others take remaining grid
-        
-        cards = [v for v in visuals if v.visual_type == "card"]
-        charts = [v for v in visuals if v.visual_type != "card"]
-        
-        # Start Y below header
-        current_y = header_y + header_height + self.PADDING
-        
-        # PLACE CARDS (Top Row)
-        # PLACE CARDS (Stacked Vertically)
-        if cards:
-            card_height = 110
-            card_width = 1240
-            card_x = (self.CANVAS_WIDTH - card_width) // 2 # Center it: (1280 - 1240) / 2 = 20
-            
-            for i, card in enumerate(cards):
-                layout = VisualLayout(
-                    x=int(card_x),
-                    y=int(current_y),
-                    width=int(card_width),
-                    height=int(card_height),
-                    tabOrder=i + 1
-                )
-                card.layout = layout
-                updated_visuals.append(card)
-                
-                # Increment Y for next card (stacking)
-                current_y += card_height + self.PADDING
-            
-        # PLACE CHARTS (Grid below)
-        if charts:
-            # Dynamic grid based on count
-            count = len(charts)
-            cols = 2 if count > 1 else 1
-            rows = (count + cols - 1) // cols
-            
-            avail_width = self.CANVAS_WIDTH - 2 * self.PADDING
-            avail_height = self.CANVAS_HEIGHT - current_y - self.PADDING
-            
-            chart_width = (avail_width - (cols - 1) * self.PADDING) / cols
-            chart_height = (avail_height - (rows - 1) * self.PADDING) / rows
-            
-            base_tab_order = len(cards) + 1
-            
-            for i, chart in enumerate(charts):
-                row = i // cols
-                col = i % cols
-                
-                layout = VisualLayout(
-                    x=int(self.PADDING + col * (chart_width + self.PADDING)),
-                    y=int(current_y + row * (chart_height + self.PADDING)),
-                    width=int(chart_width),
-                    height=int(chart_height),
-                    tabOrder=base_tab_order + i
-                )
-                chart.layout = layout
-                updated_visuals.append(chart)
-                
-        # Re-merge to preserve original order if needed, but returning processed list is fine
-        return updated_visuals
+        # 1. Pack cards (top shelves) and charts (below) onto the canvas
+        placements, overflow = self.engine.pack([v.visual_type for v in visuals])
+        if overflow:
+            log.warning(
+                "%d visual(s) do not fit on '%s' and were left out: %s",
+                len(overflow), dashboard_title, [visuals[i].title for i in overflow]
+            )
+
+        # Reading order: top-to-bottom, left-to-right
+        for tab_order, (i, (x, y, width, height)) in enumerate(
+            sorted(placements.items(), key=lambda item: (item[1][1], item[1][0])), 1
+        ):
+            visual = visuals[i]
+            visual.layout = VisualLayout(x=x, y=y, width=width, height=height, tabOrder=tab_order)
+            updated_visuals.append(visual)
 
+        return updated_visuals
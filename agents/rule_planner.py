@@ -0,0 +1,260 @@
+# agents/rule_planner.py
+import re
+from typing import List, Optional, Tuple
+from compiler.resolver import NUMERIC_CONCEPTS, _numeric_measure
+from compiler.term_automaton import TermAutomaton
+from core.models import VisualIntent
+from core.log import get_logger
+
+log = get_logger("planner")
+
+# Share of the query's words the tagger must understand to skip the LLM
+MIN_CONFIDENCE = 0.9
+MAX_CARD_CONCEPTS = 5
+
+DATE_TYPES = {"datetime", "date"}
+DATE_TERMS = {"date", "day", "week", "month", "quarter", "year", "time", "period"}
+
+# -------------------------------
+# Query keywords (checked before schema terms of the same span)
+# -------------------------------
+KEYWORDS = {
+    "by": "BY", "per": "BY", "across": "BY", "for each": "BY", "split by": "BY",
+    "top": "TOP",
+    "over time": "TIME", "trend": "TIME", "trends": "TIME", "over the years": "TIME",
+    "daily": "TIME", "weekly": "TIME", "monthly": "TIME", "yearly": "TIME",
+    "share": "SHARE", "share of": "SHARE", "distribution": "SHARE", "distribution of": "SHARE",
+    "breakdown": "SHARE", "breakdown of": "SHARE", "proportion": "SHARE", "proportion of": "SHARE",
+    "list": "LIST", "list of": "LIST", "table": "LIST", "table of": "LIST", "details": "LIST",
+    "and": "AND", "vs": "AND", "versus": "AND", "&": "AND", ",": "AND",
+}
+FILLER = {
+    "show", "me", "the", "a", "an", "of", "what", "is", "are", "our", "my", "all",
+    "total", "sum", "overall", "chart", "graph", "visual", "give", "display", "see", "in"
+}
+# Asking for something open-ended: always the LLM's call
+VAGUE = {
+    "overview", "analysis", "analyze", "analyse", "insights", "insight", "dashboard",
+    "summary", "report", "kpi", "kpis", "performance", "why", "how", "compare", "explain"
+}
+
+
+def normalize_query(text: str) -> str:
+    text = re.sub(r"[_\-]", " ", text.lower())
+    text = re.sub(r"([,&])", r" \1 ", text)
+    return re.sub(r"\s+", " ", text).strip(" .!?")
+
+
+class RulePlanner:
+    """
+    Deterministic fast path for formulaic queries ("amount by country",
+    "top 5 products by amount", "amount over time", "total amount").
+
+    Every linguistic term (plus plural forms) and query keyword is
+    compiled into one Aho-Corasick automaton, so tagging a query is a
+    single pass however large the model. plan() returns None - and the
+    LLM planner is used instead - unless the tags form a known pattern
+    and at least `min_confidence` of the query's words were understood.
+    """
+
+    def __init__(self, linguistic_metadata: dict, min_confidence: float = MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self.automaton = TermAutomaton()
+        for phrase, tag in KEYWORDS.items():
+            self.automaton.add(phrase, ("KEYWORD", tag))
+        for word in FILLER:
+            self.automaton.add(word, ("FILLER", word))
+        for word in VAGUE:
+            self.automaton.add(word, ("VAGUE", word))
+
+        # term -> kinds of the field entities it names
+        kinds = {}
+        for entity in linguistic_metadata.get("entities", {}).values():
+            binding = entity.get("binding", {})
+            if "column" not in binding:
+                continue
+            if _numeric_measure(binding):
+                kind = "measure"
+            elif (binding.get("dataType") or "").lower() in DATE_TYPES:
+                kind = "date"
+            else:
+                kind = "dimension"
+            for term in entity.get("terms", []):
+                term = normalize_query(term.get("term", "") if isinstance(term, dict) else term)
+                if term:
+                    kinds.setdefault(term, set()).add(kind)
+
+        # Generic numeric words the resolver maps onto a measure
+        if any("measure" in k for k in kinds.values()):
+            for word in NUMERIC_CONCEPTS - FILLER - {"value"}:
+                kinds.setdefault(word, {"measure"})
+
+        self.date_concept = next(
+            (t for t in ("date", "time", "period") if "date" in kinds.get(t, ())),
+            next((t for t, k in kinds.items() if k == {"date"}), None)
+        )
+        for term, term_kinds in kinds.items():
+            kind = _pick_kind(term, term_kinds)
+            self.automaton.add(term, ("FIELD", kind, term))
+            for plural in _plurals(term):
+                self.automaton.add(plural, ("FIELD", kind, term))
+        self.automaton.build()
+
+    # ------------------------------------------------------------------
+    # Tagging
+    # ------------------------------------------------------------------
+    def tag(self, query: str) -> Tuple[list, float]:
+        """
+        ([(tag, value)], confidence): tags in query order, where tag is a
+        keyword tag, FIELD (value (kind, concept)), NUMBER or VAGUE.
+        Confidence is the share of words covered by a tag.
+        """
+        text = normalize_query(query)
+        words = [(m.start(), m.end()) for m in re.finditer(r"[^\s]+", text)]
+        if not words:
+            return [], 0.0
+
+        found, covered = [], set()
+        for start, end, payload in self.automaton.find_words(text):
+            covered.update(i for i, (s, e) in enumerate(words) if s >= start and e <= end)
+            if payload[0] == "KEYWORD":
+                found.append((start, (payload[1], None)))
+            elif payload[0] == "FIELD":
+                found.append((start, ("FIELD", (payload[1], payload[2]))))
+            elif payload[0] == "VAGUE":
+                found.append((start, ("VAGUE", payload[1])))
+
+        for i, (start, end) in enumerate(words):
+            if i not in covered and text[start:end].isdigit():
+                covered.add(i)
+                found.append((start, ("NUMBER", int(text[start:end]))))
+
+        tags = [tag for _, tag in sorted(found, key=lambda item: item[0])]
+        return tags, len(covered) / len(words)
+
+    # ------------------------------------------------------------------
+    # Patterns
+    # ------------------------------------------------------------------
+    def plan(self, query: str) -> Optional[Tuple[List[VisualIntent], str]]:
+        """(intents, dashboard_title) for a recognized query, else None."""
+        tags, confidence = self.tag(query)
+        if confidence < self.min_confidence or any(t == "VAGUE" for t, _ in tags):
+            log.debug("Rule fast path declined '%s' (confidence %.2f)", query, confidence)
+            return None
+
+        intents = self._match(tags)
+        if not intents:
+            log.debug("Rule fast path: no pattern for '%s'", query)
+            return None
+        log.info("Rule fast path planned '%s' (confidence %.2f)", query, confidence)
+        return intents, _title_case(normalize_query(query))
+
+    def _match(self, tags: list) -> Optional[List[VisualIntent]]:
+        flags = {t for t, _ in tags if t not in ("FIELD", "NUMBER")}
+        before_by, after_by, seen_by = [], [], False
+        top_n = None
+        for i, (tag, value) in enumerate(tags):
+            if tag == "BY":
+                if seen_by:
+                    return None
+                seen_by = True
+            elif tag == "FIELD":
+                (after_by if seen_by else before_by).append(value)
+            elif tag == "NUMBER":
+                # "top 0 products" is not a TopN filter Power BI accepts
+                if i == 0 or tags[i - 1][0] != "TOP" or value < 1:
+                    return None
+                top_n = value
+        fields = before_by + after_by
+        if not fields or ("TOP" in flags and top_n is None):
+            return None
+
+        measures = _unique(c for kind, c in fields if kind == "measure")
+        dims = _unique(c for kind, c in fields if kind != "measure")
+
+        # "list products and prices"
+        if "LIST" in flags:
+            if seen_by or top_n is not None:
+                return None
+            return [VisualIntent(title=_join(c for _, c in fields), visual_type="table",
+                                 concepts=_unique(c for _, c in fields))]
+
+        if not measures:
+            return None
+
+        # "top 5 products by amount" / "top 5 products"
+        if top_n is not None:
+            top_dims = [c for kind, c in before_by if kind != "measure"] or \
+                [c for kind, c in after_by if kind != "measure"]
+            if len(top_dims) != 1 or len(measures) != 1 or "TIME" in flags or "SHARE" in flags:
+                return None
+            return [VisualIntent(
+                title=f"Top {top_n} {_title_case(top_dims[0])} by {_title_case(measures[0])}",
+                visual_type="bar", concepts=[top_dims[0], measures[0]], top_n=top_n
+            )]
+
+        # "amount over time" / "monthly amount"
+        if "TIME" in flags:
+            if seen_by or dims or not self.date_concept:
+                return None
+            return [VisualIntent(
+                title=f"{_join(measures)} over Time", visual_type="line",
+                concepts=[self.date_concept] + measures
+            )]
+
+        # "amount by country", "share of amount by product", "amount by month"
+        if seen_by:
+            by_dims = [(kind, c) for kind, c in after_by if kind != "measure"]
+            if not by_dims or any(kind != "measure" for kind, _ in before_by) \
+                    or any(kind == "measure" for kind, _ in after_by):
+                return None
+            intents = []
+            for kind, dim in by_dims:
+                if "SHARE" in flags:
+                    visual_type = "pie"
+                elif kind == "date" or dim in DATE_TERMS:
+                    visual_type = "line"
+                else:
+                    visual_type = "bar"
+                intents.append(VisualIntent(
+                    title=f"{_join(measures)} by {_title_case(dim)}",
+                    visual_type=visual_type, concepts=[dim] + measures
+                ))
+            return intents
+
+        # "total amount and boxes shipped"
+        if dims or flags - {"AND"}:
+            return None
+        return [VisualIntent(
+            title=_join(measures), visual_type="card", concepts=measures[:MAX_CARD_CONCEPTS]
+        )]
+
+
+def _pick_kind(term: str, kinds: set) -> str:
+    if kinds == {"measure"}:
+        return "measure"
+    if "date" in kinds or term in DATE_TERMS:
+        return "date"
+    return "dimension"
+
+
+def _plurals(term: str) -> list:
+    if term.endswith("s"):
+        return []
+    if term.endswith("y") and term[-2:-1] not in "aeiou":
+        return [term[:-1] + "ies"]
+    if term.endswith(("x", "ch", "sh")):
+        return [term + "es"]
+    return [term + "s"]
+
+
+def _unique(items) -> list:
+    return list(dict.fromkeys(items))
+
+
+def _title_case(text: str) -> str:
+    return " ".join(w if w in ("by", "of", "and", "over") else w.capitalize() for w in text.split())
+
+
+def _join(concepts) -> str:
+    return " and ".join(_title_case(c) for c in concepts)
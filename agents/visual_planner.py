@@ -1,15 +1,206 @@
 import json
 from typing import List, Tuple
 from llm.clients import planner_client
-from config.settings import DASHBOARD_MODEL
+from llm.cache import ResponseCache, SQLiteCache, make_cache_key
+from config.settings import DASHBOARD_MODEL, LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES
 from core.models import VisualIntent
+from llm.json_stream import PlanStreamParser
+from core.log import get_logger
 
-def agent_plan_visuals(user_query: str, available_concepts: List[str]) -> Tuple[List[VisualIntent], str]:
+log = get_logger("planner")
+
+# Bump whenever the prompt below changes, so stale cached plans are not reused
+PROMPT_VERSION = "1"
+
+_default_cache = None
+
+
+def default_response_cache() -> ResponseCache:
+    """Process-wide on-disk planner cache (created on first use)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SQLiteCache(
+            LLM_CACHE_PATH, max_entries=LLM_CACHE_MAX_ENTRIES, ttl=LLM_CACHE_TTL
+        )
+    return _default_cache
+
+
+def agent_plan_visuals(
+    user_query: str,
+    available_concepts: List[str],
+    schema_summary: str = "",
+    cache: ResponseCache = None
+) -> Tuple[List[VisualIntent], str]:
     """
     Step 4: Abstract Visual Planning.
     Produces VisualIntent objects. It is forbidden from seeing table names.
+
+    `available_concepts` are the fields worth planning with (see
+    compiler/concept_retrieval.py); `schema_summary` briefly describes
+    the ones left out on large models.
+
+    Responses are cached by (normalized query, concepts, model, prompt
+    version); pass `cache` to override the default on-disk cache.
     """
+    cache = cache if cache is not None else default_response_cache()
+    cache_key = _cache_key(user_query, available_concepts, schema_summary)
+
+    content = cache.get(cache_key)
+    if content is not None:
+        log.info("Cache hit, skipping LLM call")
+        return _parse_plan(content)
+
+    prompt = _build_prompt(user_query, available_concepts, schema_summary)
+
     client = planner_client()
+    response = client.chat.completions.create(
+        model=DASHBOARD_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"}
+    )
+    content = response.choices[0].message.content
+
+    intents, title = _parse_plan(content)
+    if intents:
+        # Only well-formed plans are worth replaying
+        cache.put(cache_key, content)
+    return intents, title
+
+
+class PlanStream:
+    """
+    A plan that arrives chart by chart. Iterating yields each VisualIntent
+    as soon as the LLM closes its JSON object; `title` is final once
+    iteration has finished. Iterating again replays the same intents.
+
+    If the stream fails or ends before the JSON object is complete,
+    `fallback()` -> (intents, title) supplies the plan instead; only its
+    charts not yielded yet are yielded.
+    """
+
+    def __init__(self, deltas, on_complete=None, fallback=None):
+        self._deltas = deltas
+        self._on_complete = on_complete
+        self._fallback = fallback
+        self._consumed = False
+        self.intents: List[VisualIntent] = []
+        self.title = "Dashboard"
+
+    @classmethod
+    def completed(cls, intents: List[VisualIntent], title: str) -> "PlanStream":
+        """Wraps an already complete plan (cached or non-streaming)."""
+        plan = cls(())
+        plan.intents, plan.title, plan._consumed = list(intents), title, True
+        return plan
+
+    def __iter__(self):
+        if self._consumed:
+            yield from self.intents
+            return
+        self._consumed = True
+
+        parser = PlanStreamParser()
+        try:
+            deltas = iter(self._deltas)
+            for delta in deltas:
+                for chart in parser.feed(delta):
+                    try:
+                        intent = VisualIntent(**chart)
+                    except Exception as e:
+                        log.error("Skipping malformed chart %s: %s", chart, e)
+                        continue
+                    self.intents.append(intent)
+                    yield intent
+                if parser.done:
+                    # Read the rest (closing fence, usage chunk) so the stream
+                    # ends normally: connections are released and recorders
+                    # (llm/replay.py) see a complete response
+                    for _ in deltas:
+                        pass
+                    break
+        except Exception as e:
+            if self._fallback is None or parser.done:
+                raise
+            log.warning("Planner stream failed: %s", e)
+
+        self.title = parser.title or self.title
+        if parser.done:
+            if self._on_complete:
+                self._on_complete(parser.document, self.intents)
+            return
+        if self._fallback is None:
+            log.error("Planner stream ended before the JSON object was complete")
+            return
+
+        log.warning("Incomplete planner stream, falling back to a JSON-mode completion")
+        intents, self.title = self._fallback()
+        for intent in intents:
+            if intent not in self.intents:
+                self.intents.append(intent)
+                yield intent
+
+
+def agent_plan_visuals_stream(
+    user_query: str,
+    available_concepts: List[str],
+    schema_summary: str = "",
+    cache: ResponseCache = None
+) -> PlanStream:
+    """
+    Streaming variant of agent_plan_visuals: same prompt and cache, but
+    the completion is requested with stream=True and parsed incrementally
+    (llm/json_stream.py), so binding starts with the first chart instead
+    of after the whole response. A failed or truncated stream falls back
+    to agent_plan_visuals (JSON mode).
+    """
+    cache = cache if cache is not None else default_response_cache()
+    cache_key = _cache_key(user_query, available_concepts, schema_summary)
+
+    content = cache.get(cache_key)
+    if content is not None:
+        log.info("Cache hit, skipping LLM call")
+        return PlanStream.completed(*_parse_plan(content))
+
+    prompt = _build_prompt(user_query, available_concepts, schema_summary)
+
+    def deltas():
+        client = planner_client()
+        # JSON mode is not combined with streaming; the parser skips
+        # anything around the JSON object instead (and the JSON-mode call
+        # is the fallback when it never completes)
+        stream = client.chat.completions.create(
+            model=DASHBOARD_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def on_complete(content, intents):
+        if intents:
+            # Only well-formed plans are worth replaying
+            cache.put(cache_key, content)
+
+    def fallback():
+        return agent_plan_visuals(user_query, available_concepts, schema_summary, cache=cache)
+
+    return PlanStream(deltas(), on_complete, fallback)
+
+
+def _cache_key(user_query: str, available_concepts: List[str], schema_summary: str) -> str:
+    return make_cache_key(
+        user_query, available_concepts + ([schema_summary] if schema_summary else []),
+        DASHBOARD_MODEL, PROMPT_VERSION
+    )
+
+
+def _build_prompt(user_query: str, available_concepts: List[str], schema_summary: str) -> str:
+    # Large models: what the concept list above leaves out
+    summary_line = (
+        f"\n    Other fields (summarized; usable by their exact names): {schema_summary}"
+        if schema_summary else ""
+    )
 
     # Enhanced prompt with specific visual selection rules
     prompt = f"""
@@ -17,7 +208,7 @@ def agent_plan_visuals(user_query: str, available_concepts: List[str]) -> Tuple[
     Analyze the user query and plan the visuals using ONLY the provided concepts.
     
     User Query: "{user_query}"
-    Available Concepts: {available_concepts}
+    Available Concepts: {available_concepts}{summary_line}
     
     ### VISUAL SELECTION RULES:
     1. **Single Value / KPI**: If the user asks for single aggregates (e.g., "total sales", "count of orders"), GROUP them into a SINGLE "card" visual with multiple concepts. Do NOT create multiple card visuals. Maximum 5 concepts per card.
@@ -39,19 +230,16 @@ def agent_plan_visuals(user_query: str, available_concepts: List[str]) -> Tuple[
       "top_n": null
     }}
     """
+    return prompt
 
-    response = client.chat.completions.create(
-        model=DASHBOARD_MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        response_format={"type": "json_object"}
-    )
-    
+
+def _parse_plan(content: str) -> Tuple[List[VisualIntent], str]:
     try:
-        raw_data = json.loads(response.choices[0].message.content)
+        raw_data = json.loads(content)
         title = raw_data.get("dashboard_title", "Dashboard")
         # Parse into Pydantic models for strict validation
         intents = [VisualIntent(**chart) for chart in raw_data.get("charts", [])]
         return intents, title
     except Exception as e:
-        print(f"[PLANNER ERROR] Failed to parse LLM response: {e}")
+        log.error("Failed to parse LLM response: %s", e)
         return [], "Dashboard"
\ No newline at end of file
@@ -1,7 +1,12 @@
+import hashlib
 import json
 import os
-import uuid
+from typing import List
 from core.models import BoundVisual, PhysicalBinding
+from core.log import get_logger
+from backend.visual_templates import get_template_engine
+
+log = get_logger("writer")
 
 # -------------------------------------------------------------------------
 # 1. THE VISUAL REGISTRY (Configuration)
@@ -71,8 +76,22 @@ class FieldFactory:
             }
         }
 
+    @staticmethod
+    def create_measure_expression(binding: PhysicalBinding, alias: str = None):
+        """Reference to an explicit DAX measure defined in the model."""
+        return {
+            "Measure": {
+                "Expression": {"SourceRef": {"Entity": binding.table}} if not alias else {"SourceRef": {"Source": alias}},
+                "Property": binding.column
+            }
+        }
+
     @staticmethod
     def create_aggregation_expression(binding: PhysicalBinding, alias: str = None):
+        if binding.explicit_measure:
+            # Model measures are evaluated as-is: no implicit Aggregation wrapper
+            return FieldFactory.create_measure_expression(binding, alias), None
+
         col_expr = FieldFactory.create_base_expression(binding, alias)
         agg_map = {"sum": 0, "avg": 1, "min": 2, "max": 3, "count": 4}
         func_id = agg_map.get(binding.aggregation, 0)
@@ -104,7 +123,9 @@ def build_top_n_filter(dim_binding: PhysicalBinding, measure_binding: PhysicalBi
     dim_expr_entity = FieldFactory.create_base_expression(dim_binding)
 
     return {
-        "name": uuid.uuid4().hex[:20],
+        "name": hashlib.sha1(
+            f"{t_name}.{dim_binding.column}|{measure_binding.table}.{measure_binding.column}|{n}".encode("utf-8")
+        ).hexdigest()[:20],
         "type": "TopN",
         "field": dim_expr_entity,
         "filter": {
@@ -152,11 +173,98 @@ def build_top_n_filter(dim_binding: PhysicalBinding, measure_binding: PhysicalBi
 # 4. MAIN WRITER FUNCTION
 # -------------------------------------------------------------------------
 def materialize_visual(bound: BoundVisual, output_dir: str, index: int):
-    visual_id = uuid.uuid4().hex[:6]
-    visual_name = f"GenAI_Visual_{index}_{visual_id}"
+    visual_name = visual_identity(bound)
+    folder_path = write_visual_file(visual_name, render_visual(bound, index, visual_name), output_dir)
+    log.info("Generated %s at %s", bound.visual_type, folder_path)
+
+
+def materialize_visuals(visuals: List[BoundVisual], output_dir: str, max_workers: int = None) -> List[str]:
+    """
+    Batch writer: brings `output_dir` in line with `visuals` through
+    backend/report_sync.sync_visuals (payloads built first, unchanged
+    visuals kept, the folder swapped in only once every write succeeded).
+    Returns the visual folder paths in input order.
+    """
+    # report_sync builds on this module's renderer
+    from backend.report_sync import sync_visuals
+
+    sync_visuals(visuals, output_dir, max_workers=max_workers)
+    return [os.path.join(output_dir, name) for name in visual_identities(visuals)]
+
+
+def write_visual_file(visual_name: str, content: str, output_dir: str) -> str:
+    """Writes <output_dir>/<visual_name>/visual.json via temp file + rename."""
     folder_path = os.path.join(output_dir, visual_name)
     os.makedirs(folder_path, exist_ok=True)
 
+    file_path = os.path.join(folder_path, "visual.json")
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, file_path)
+
+    return folder_path
+
+
+def visual_identity(bound: BoundVisual, occurrence: int = 0) -> str:
+    """
+    Deterministic visual name derived from what the visual shows
+    (type + field bindings). Title and position are deliberately left
+    out so that moving or renaming a chart rewrites it in place.
+    `occurrence` disambiguates identical visuals on the same page.
+    """
+    key = "|".join(
+        [bound.visual_type, str(occurrence)] + [
+            f"{b.kind}:{b.table}.{b.column}:{b.aggregation}:{b.explicit_measure}"
+            for b in bound.bindings
+        ]
+    )
+    return f"GenAI_Visual_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}"
+
+
+def visual_identities(visuals: List[BoundVisual]) -> List[str]:
+    """Identities for a whole page, unique even for duplicate visuals."""
+    seen = {}
+    names = []
+    for bound in visuals:
+        base = visual_identity(bound)
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        names.append(base if occurrence == 0 else visual_identity(bound, occurrence))
+    return names
+
+
+def serialize_visual(visual_container: dict) -> str:
+    """Canonical visual.json text (stable across runs for equal content)."""
+    return json.dumps(visual_container, indent=2)
+
+
+def render_visual(bound: BoundVisual, index: int, visual_name: str = None, compact: bool = None) -> str:
+    """
+    visual.json text for one bound visual (no I/O): the per-type template
+    (backend/visual_templates.py) with the dynamic slots spliced in.
+    Byte-identical to serialize_visual(build_visual_container(...)) unless
+    `compact` (default: $GENAI_COMPACT_VISUALS) asks for minified JSON.
+    """
+    return get_template_engine().render(
+        bound.visual_type, build_visual_slots(bound, index, visual_name), compact=compact
+    )
+
+
+def build_visual_container(bound: BoundVisual, index: int, visual_name: str = None) -> dict:
+    """
+    Builds the full visual.json payload for one bound visual (no I/O).
+    """
+    return json.loads(render_visual(bound, index, visual_name, compact=True))
+
+
+def build_visual_slots(bound: BoundVisual, index: int, visual_name: str = None) -> dict:
+    """
+    The per-visual part of visual.json: name, position, query state,
+    sort / TopN filter and title. Everything else comes from the template.
+    """
+    visual_name = visual_name or visual_identity(bound)
+
     # A. Config
     config = VISUAL_REGISTRY.get(bound.visual_type, VISUAL_REGISTRY["table"])
     pbi_type = config["pbi_type"]
@@ -176,13 +284,16 @@ def materialize_visual(bound: BoundVisual, output_dir: str, index: int):
              
         # Allow multiple measures (up to 5 for now)
         if len(measures) > 5:
-             print("[WRITER] Truncating card measures to 5.")
+             log.warning("Truncating card measures to 5.")
              measures = measures[:5]
 
     # Chart Failsafe (Non-Card)
-    elif bound.visual_type != "table" and not dims and len(measures) >= 2:
-        print("[WRITER] Converting first measure to dimension for chart safety.")
-        forced_dim = measures.pop(0)
+    elif bound.visual_type != "table" and not dims and len(measures) >= 2 \
+            and any(not m.explicit_measure for m in measures):
+        log.warning("Converting first measure to dimension for chart safety.")
+        # Explicit DAX measures cannot be grouped by, only column-backed ones
+        forced_dim = next(m for m in measures if not m.explicit_measure)
+        measures.remove(forced_dim)
         forced_dim.kind = "dimension"
         forced_dim.aggregation = None
         dims = [forced_dim]
@@ -203,8 +314,11 @@ def materialize_visual(bound: BoundVisual, output_dir: str, index: int):
             
             if b.kind == "measure":
                 field_expr, _ = FieldFactory.create_aggregation_expression(b)
-                func = b.aggregation.capitalize() if b.aggregation else "Sum"
-                q_ref = f"{func}({b.table}.{b.column})"
+                if b.explicit_measure:
+                    q_ref = f"{b.table}.{b.column}"
+                else:
+                    func = b.aggregation.capitalize() if b.aggregation else "Sum"
+                    q_ref = f"{func}({b.table}.{b.column})"
                 
                 query_state[role_name]["projections"].append({
                     "field": field_expr,
@@ -268,146 +382,22 @@ def materialize_visual(bound: BoundVisual, output_dir: str, index: int):
             "isDefaultSort": True
         }
 
-    # E. Construct Final JSON
-    
+    # E. Dynamic template slots
+
     # Defaults in case layout agent failed (fallback)
-    pos_x = 100
-    pos_y = 100
-    width = 400
-    height = 300
-    tab_order = index
-    
-    if bound.layout:
-        pos_x = bound.layout.x
-        pos_y = bound.layout.y
-        width = bound.layout.width
-        height = bound.layout.height
-        tab_order = bound.layout.tabOrder
-
-    visual_container = {
-        "$schema": "https://developer.microsoft.com/json-schemas/fabric/item/report/definition/visualContainer/2.4.0/schema.json",
+    layout = bound.layout
+    return {
         "name": visual_name,
-        "position": {
-            "x": pos_x, 
-            "y": pos_y, 
-            "z": 0,
-            "width": width, 
-            "height": height, 
-            "tabOrder": tab_order
-        },
-        "visual": {
-            "visualType": pbi_type,
-            "query": {
-                "queryState": query_state
-            },
-            "visualContainerObjects": {
-                # Title logic
-            },
-            "drillFilterOtherVisuals": True
-        }
+        "x": layout.x if layout else 100,
+        "y": layout.y if layout else 100,
+        "width": layout.width if layout else 400,
+        "height": layout.height if layout else 300,
+        "tabOrder": layout.tabOrder if layout else index,
+        "visualType": pbi_type,
+        "queryState": query_state,
+        "sortDefinition": sort_def,
+        "filterConfig": filter_config,
+        # Standard visuals show a title literal, textboxes the title as text
+        "titleLiteral": f"'{bound.title}'",
+        "title": bound.title
     }
-
-    # Inject objects for Card (from template) or Title for others
-    # Inject objects for Card (from template) or Title for others
-    if bound.visual_type == "card":
-        # New Multi-KPI Card Template Logic
-        visual_container["visual"]["objects"] = {
-             "cardCalloutArea": [{
-                 "properties": {
-                     "paddingUniform": {"expr": {"Literal": {"Value": "0L"}}}
-                 },
-                 "selector": {"id": "default"}
-             }],
-             "layout": [
-                 {
-                     "properties": {
-                         "alignment": {"expr": {"Literal": {"Value": "'top'"}}}
-                     }
-                 },
-                 {
-                     "properties": {
-                         "paddingUniform": {"expr": {"Literal": {"Value": "12L"}}}
-                     },
-                     "selector": {"id": "default"}
-                 }
-             ],
-             "value": [{
-                  "properties": {
-                      "horizontalAlignment": {"expr": {"Literal": {"Value": "'center'"}}}
-                  },
-                  "selector": {"id": "default"}
-             }],
-             # Padding logic: Applying default padding to all items
-             "padding": [{
-                 "properties": {
-                     "paddingIndividual": {"expr": {"Literal": {"Value": "true"}}},
-                     "leftMargin": {"expr": {"Literal": {"Value": "0L"}}},
-                     "rightMargin": {"expr": {"Literal": {"Value": "0L"}}}
-                 },
-                 "selector": {"id": "default"}
-             }],
-             "shapeCustomRectangle": [{
-                 "properties": {
-                     "rectangleRoundedCurveCustomStyle": {"expr": {"Literal": {"Value": "false"}}}
-                 },
-                 "selector": {"id": "default"}
-             }]
-        }
-        
-        visual_container["visual"]["visualContainerObjects"] = {
-            "padding": [{
-                "properties": {
-                    "top": {"expr": {"Literal": {"Value": "5D"}}},
-                    "left": {"expr": {"Literal": {"Value": "20D"}}},
-                    "right": {"expr": {"Literal": {"Value": "20D"}}}
-                }
-            }]
-        }
-
-    elif bound.visual_type == "textbox":
-        # Use provided template for Textbox
-        visual_container["visual"]["objects"] = {
-             "general": [
-                {
-                  "properties": {
-                    "paragraphs": [
-                      {
-                        "textRuns": [
-                          {
-                            "value": bound.title, # Dynamic Title
-                            "textStyle": {
-                              "fontWeight": "bold",
-                              "fontFamily": "Segoe UI Semibold",
-                              "fontSize": "16pt"
-                            }
-                          }
-                        ],
-                        "horizontalTextAlignment": "center"
-                      }
-                    ]
-                  }
-                }
-              ]
-        }
-        # Textboxes don't have standard "title" visualContainerObject, they use "objects" body
-        
-    else:
-        # Standard Title
-        visual_container["visual"]["visualContainerObjects"] = {
-            "title": [{"properties": {
-                "text": {"expr": {"Literal": {"Value": f"'{bound.title}'"}}},
-                "show": {"expr": {"Literal": {"Value": "true"}}},
-                "alignment": {"expr": {"Literal": {"Value": "'center'"}}}
-            }}]
-        }
-
-    if sort_def:
-        visual_container["visual"]["query"]["sortDefinition"] = sort_def
-    
-    if filter_config:
-        visual_container["filterConfig"] = filter_config
-
-    with open(os.path.join(folder_path, "visual.json"), "w", encoding="utf-8") as f:
-        json.dump(visual_container, f, indent=2)
-        
-    print(f"[WRITER] Generated {pbi_type} at {folder_path}")
\ No newline at end of file
@@ -0,0 +1,127 @@
+# backend/report_pages.py
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from backend.report_sync import sync_visuals
+from core.models import BoundVisual
+
+PAGE_SCHEMA = "https://developer.microsoft.com/json-schemas/fabric/item/report/definition/page/2.0.0/schema.json"
+PAGES_SCHEMA = "https://developer.microsoft.com/json-schemas/fabric/item/report/definition/pagesMetadata/1.0.0/schema.json"
+
+
+# Page folder names callers may choose: what page_slug() produces
+PAGE_NAME = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+
+
+def is_page_name(name) -> bool:
+    """True for a plain slug ('sales-by-region'): no separators, dots or absolute paths."""
+    return isinstance(name, str) and bool(PAGE_NAME.match(name))
+
+
+def page_slug(text: str, max_length: int = 40) -> str:
+    """'Sales by Region!' -> 'sales-by-region' (valid PBIR page folder name)."""
+    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    return slug[:max_length].rstrip("-") or "page"
+
+
+def ensure_page(pages_dir: str, page_name: str, display_name: str, width: int = 1280, height: int = 720) -> str:
+    """
+    Creates (or refreshes) pages/<page_name>/page.json.
+    Returns the page's visuals folder.
+    """
+    page_dir = os.path.join(pages_dir, page_name)
+    os.makedirs(os.path.join(page_dir, "visuals"), exist_ok=True)
+
+    _write_json(os.path.join(page_dir, "page.json"), {
+        "$schema": PAGE_SCHEMA,
+        "name": page_name,
+        "displayName": display_name,
+        "displayOption": "FitToPage",
+        "height": height,
+        "width": width
+    })
+    return os.path.join(page_dir, "visuals")
+
+
+def register_pages(pages_dir: str, page_names: List[str], active_page: str = None):
+    """
+    Adds `page_names` to pages.json (keeping existing order) and
+    optionally switches the active page.
+    """
+    index_path = os.path.join(pages_dir, "pages.json")
+    index = {"$schema": PAGES_SCHEMA, "pageOrder": []}
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+    order = index.setdefault("pageOrder", [])
+    for name in page_names:
+        if name not in order:
+            order.append(name)
+
+    if active_page or "activePageName" not in index:
+        index["activePageName"] = active_page or (order[0] if order else None)
+
+    _write_json(index_path, index)
+
+
+def unregister_pages(pages_dir: str, page_names: List[str]):
+    """Removes pages from pages.json and deletes their folders."""
+    index_path = os.path.join(pages_dir, "pages.json")
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        order = index.get("pageOrder", [])
+        index["pageOrder"] = [name for name in order if name not in page_names]
+        if index.get("activePageName") in page_names:
+            index["activePageName"] = index["pageOrder"][0] if index["pageOrder"] else None
+        _write_json(index_path, index)
+
+    for name in page_names:
+        shutil.rmtree(os.path.join(pages_dir, name), ignore_errors=True)
+
+
+def continuation_name(page_name: str, number: int) -> str:
+    """Folder of page `number` (1-based) of a multi-page dashboard."""
+    return page_name if number == 1 else f"{page_name}-p{number}"
+
+
+def sync_pages(
+    pages_dir: str,
+    page_name: str,
+    pages: List[Tuple[str, List[BoundVisual]]],
+    max_workers: int = None
+) -> dict:
+    """
+    Writes a (possibly multi-page) dashboard: [(display_name, visuals)]
+    becomes page_name, page_name-p2, ... Pages are synced in parallel.
+    Returns {"pages": written page names, "stale": continuation pages
+    left over from a longer previous run}. pages.json is shared between
+    dashboards, so registering / unregistering is up to the caller.
+    """
+    names = [continuation_name(page_name, i) for i in range(1, len(pages) + 1)]
+
+    def _write(item):
+        name, (display_name, visuals) = item
+        sync_visuals(visuals, ensure_page(pages_dir, name, display_name))
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(1, len(pages))) as pool:
+        list(pool.map(_write, zip(names, pages)))
+
+    stale = []
+    number = len(pages) + 1
+    while os.path.isdir(os.path.join(pages_dir, continuation_name(page_name, number))):
+        stale.append(continuation_name(page_name, number))
+        number += 1
+
+    return {"pages": names, "stale": stale}
+
+
+def _write_json(path: str, payload: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,134 @@
+# backend/report_sync.py
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from core.models import BoundVisual
+from core.log import get_logger
+from backend.pbip_writer import (
+    render_visual, visual_identities, write_visual_file
+)
+
+log = get_logger("writer")
+
+
+def diff_visuals(payloads: Dict[str, str], output_dir: str) -> dict:
+    """
+    Compares the desired page ({visual_name: visual.json text}) with
+    what is on disk. Returns lists of added/updated/deleted/unchanged names.
+    """
+    existing = set()
+    if os.path.isdir(output_dir):
+        existing = {
+            name for name in os.listdir(output_dir)
+            if os.path.isdir(os.path.join(output_dir, name))
+        }
+
+    diff = {"added": [], "updated": [], "deleted": sorted(existing - set(payloads)), "unchanged": []}
+
+    for name, content in payloads.items():
+        if name not in existing:
+            diff["added"].append(name)
+            continue
+        try:
+            with open(os.path.join(output_dir, name, "visual.json"), "r", encoding="utf-8") as f:
+                current = f.read()
+        except OSError:
+            current = None
+        diff["updated" if current != content else "unchanged"].append(name)
+
+    return diff
+
+
+def sync_visuals(visuals: List[BoundVisual], output_dir: str, max_workers: int = None) -> dict:
+    """
+    Step 6 (incremental): brings `output_dir` in line with `visuals`.
+
+    Visual folders are named by content identity, so re-running a query
+    only rewrites the visual.json files that actually changed. The new
+    folder is staged next to `output_dir` (unchanged visuals and any
+    loose files are hard links to the current ones) and swapped in once
+    every write has succeeded: a failure leaves the previous page
+    untouched.
+
+    The swap is two renames (current -> retired, staged -> current), not
+    one: for the instant between them `output_dir` does not exist, and a
+    reader listing it then sees no visuals folder at all.
+    """
+    # Build every payload before touching the folder
+    names = visual_identities(visuals)
+    payloads = {
+        name: render_visual(bound, i, name)
+        for i, (bound, name) in enumerate(zip(visuals, names), 1)
+    }
+
+    diff = diff_visuals(payloads, output_dir)
+    if not (diff["added"] or diff["updated"] or diff["deleted"]) and os.path.isdir(output_dir):
+        log.info("Synced %s: =%d (no changes)", output_dir, len(diff["unchanged"]))
+        return diff
+
+    parent, base = os.path.split(os.path.abspath(output_dir))
+    token = uuid.uuid4().hex[:8]
+    staging_dir = os.path.join(parent, f".{base}-{token}")
+    retired_dir = os.path.join(parent, f".{base}-{token}-old")
+    try:
+        os.makedirs(staging_dir)
+        for name in diff["unchanged"] + _loose_files(output_dir):
+            _carry_over(os.path.join(output_dir, name), os.path.join(staging_dir, name))
+
+        to_write = diff["added"] + diff["updated"]
+        if to_write:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                list(pool.map(lambda name: write_visual_file(name, payloads[name], staging_dir), to_write))
+
+        # Swap: the old folder is only removed once the new one is in place
+        if os.path.isdir(output_dir):
+            os.replace(output_dir, retired_dir)
+        try:
+            os.replace(staging_dir, output_dir)
+        except OSError:
+            if os.path.isdir(retired_dir):
+                os.replace(retired_dir, output_dir)
+            raise
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    shutil.rmtree(retired_dir, ignore_errors=True)
+
+    log.info(
+        "Synced %s: +%d ~%d -%d =%d", output_dir,
+        len(diff["added"]), len(diff["updated"]), len(diff["deleted"]), len(diff["unchanged"])
+    )
+    return diff
+
+
+def _loose_files(output_dir: str) -> List[str]:
+    """Non-visual entries of `output_dir` (diff_visuals only looks at folders)."""
+    if not os.path.isdir(output_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(output_dir)
+        if not os.path.isdir(os.path.join(output_dir, name))
+    )
+
+
+def _carry_over(current: str, staged: str):
+    """Carries an unchanged visual folder (or a loose file) over without rewriting it."""
+    if not os.path.isdir(current):
+        _link_or_copy(current, staged)
+        return
+    os.makedirs(staged)
+    for file in os.listdir(current):
+        source, target = os.path.join(current, file), os.path.join(staged, file)
+        if not os.path.isfile(source):
+            shutil.copytree(source, target)
+            continue
+        _link_or_copy(source, target)
+
+
+def _link_or_copy(source: str, target: str):
+    try:
+        os.link(source, target)
+    except OSError:
+        # No hard links on this filesystem
+        shutil.copy2(source, target)
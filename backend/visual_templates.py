@@ -0,0 +1,134 @@
+# backend/visual_templates.py
+import json
+import os
+import re
+import threading
+from typing import Dict, List
+from config.templates import TEMPLATE_MAP
+
+DEFAULT_TEMPLATE = "table"
+
+# Indented encodings of dynamic values kept per template (batches repeat
+# the same fields, sorts and filters across many visuals)
+VALUE_CACHE_SIZE = 4096
+
+# Minified visual.json output (smaller files, not diff friendly)
+COMPACT_VISUALS = os.getenv("GENAI_COMPACT_VISUALS", "").lower() in {"1", "true", "yes"}
+
+# -------------------------------
+# Placeholders inside template files
+#   "{{slot}}"            -> replaced by the JSON value of `slot`
+#   "{{member?}}": null   -> replaced by `"member": value`, or dropped
+#                            (with its separator) when the value is empty
+# -------------------------------
+_PLACEHOLDER = re.compile(
+    r'(?P<sep>,\s*)"\{\{(?P<member>\w+)\?\}\}":\s?null'
+    r'|"\{\{(?P<slot>\w+)\}\}"'
+)
+
+
+class VisualTemplate:
+    """
+    One visual.json template, serialized once and split around its
+    placeholders. render() only serializes the dynamic values and joins
+    them with the pre-serialized constant text, giving exactly what
+    json.dumps() of the fully built container would.
+    """
+
+    def __init__(self, template: dict, compact: bool = False):
+        self.compact = compact
+        if compact:
+            self._encoder = json.JSONEncoder(separators=(",", ":"))
+            text = json.dumps(template, separators=(",", ":"))
+        else:
+            self._encoder = json.JSONEncoder(indent=2)
+            text = json.dumps(template, indent=2)
+        self._key_sep = ":" if compact else ": "
+        self._compact_encoder = json.JSONEncoder(separators=(",", ":"))
+        self._cache = {}
+
+        # literals[i] precedes slots[i]; literals has one extra tail entry
+        self.literals: List[str] = []
+        self.slots: List[tuple] = []
+        pos = 0
+        for match in _PLACEHOLDER.finditer(text):
+            self.literals.append(text[pos:match.start()])
+            line_start = text.rfind("\n", 0, match.start()) + 1
+            indent = ""
+            if not compact:
+                line = text[line_start:]
+                indent = line[:len(line) - len(line.lstrip(" "))]
+            if match.group("member"):
+                self.slots.append((match.group("member"), True, match.group("sep"), indent))
+            else:
+                self.slots.append((match.group("slot"), False, "", indent))
+            pos = match.end()
+        self.literals.append(text[pos:])
+
+    @classmethod
+    def load(cls, path: str, compact: bool = False) -> "VisualTemplate":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), compact=compact)
+
+    @property
+    def slot_names(self) -> List[str]:
+        return [slot[0] for slot in self.slots]
+
+    def _value(self, value, indent: str) -> str:
+        if self.compact or not isinstance(value, (dict, list)) or not value:
+            return self._encoder.encode(value)
+
+        # Indented encoding is pure Python and slow; the compact one (C) is a
+        # cheap cache key for it
+        key = (self._compact_encoder.encode(value), indent)
+        text = self._cache.get(key)
+        if text is None:
+            # Nested lines continue at the placeholder's depth
+            text = self._encoder.encode(value).replace("\n", "\n" + indent)
+            if len(self._cache) >= VALUE_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = text
+        return text
+
+    def render(self, values: dict) -> str:
+        parts = []
+        for literal, (name, member, sep, indent) in zip(self.literals, self.slots):
+            parts.append(literal)
+            value = values.get(name)
+            if not member:
+                parts.append(self._value(value, indent))
+            elif value:
+                parts.append(f'{sep}"{name}"{self._key_sep}{self._value(value, indent)}')
+        parts.append(self.literals[-1])
+        return "".join(parts)
+
+
+class TemplateEngine:
+    """Loads and compiles each template file once, per output mode."""
+
+    def __init__(self, template_map: Dict[str, str] = None):
+        self.template_map = template_map or TEMPLATE_MAP
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def template(self, visual_type: str, compact: bool = False) -> VisualTemplate:
+        path = self.template_map.get(visual_type) or self.template_map[DEFAULT_TEMPLATE]
+        key = (path, compact)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(key)
+                if compiled is None:
+                    compiled = self._compiled[key] = VisualTemplate.load(path, compact=compact)
+        return compiled
+
+    def render(self, visual_type: str, values: dict, compact: bool = None) -> str:
+        compact = COMPACT_VISUALS if compact is None else compact
+        return self.template(visual_type, compact).render(values)
+
+
+_engine = TemplateEngine()
+
+
+def get_template_engine() -> TemplateEngine:
+    return _engine
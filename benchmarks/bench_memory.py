@@ -0,0 +1,93 @@
+# benchmarks/bench_memory.py
+"""
+Retained memory of the dict-based semantic index + linguistic metadata
+vs the compact SemanticStore, on synthetic parsed TMDL tables.
+
+    python -m benchmarks.bench_memory --columns 20000
+    python -m benchmarks.bench_memory --json bench_memory.json
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from discovery.indexer import extract_semantic_index
+from discovery.linguistic import generate_linguistic_metadata
+from discovery.semantic_store import SemanticStore
+from benchmarks.bench_resolver import WORDS
+
+SUMMARIZE = ["none", "none", "sum", "count", "average"]
+DATATYPES = ["string", "int64", "double", "dateTime", "decimal", "boolean"]
+
+
+def synthetic_tmdl_tables(columns: int, columns_per_table: int = 50, seed: int = 0) -> dict:
+    """Parsed-TMDL shaped tables (load_tmdl_files output) with `columns` columns."""
+    rng = random.Random(seed)
+    tables = {}
+    for t in range(max(1, columns // columns_per_table)):
+        cols = {
+            " ".join(rng.sample(WORDS, rng.randint(1, 3))).title() + f" {c}": {
+                "dataType": rng.choice(DATATYPES),
+                "summarizeBy": rng.choice(SUMMARIZE)
+            }
+            for c in range(columns_per_table)
+        }
+        measures = {
+            f"Total {rng.choice(WORDS).title()} {m}": {"expression": "SUM('x'[y])", "formatString": "0"}
+            for m in range(2)
+        }
+        tables[f"{rng.choice(WORDS).title()}_{t}"] = {"columns": cols, "measures": measures}
+    return tables
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {
+        "retained_kb": round(current / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "build_ms": round(elapsed * 1000, 1)
+    }
+
+
+def run(columns: int, seed: int = 0) -> dict:
+    tables = synthetic_tmdl_tables(columns, seed=seed)
+
+    def dicts():
+        index = extract_semantic_index(tables)
+        return index, generate_linguistic_metadata(index)
+
+    _, dict_stats = _measure(dicts)
+    store, store_stats = _measure(lambda: SemanticStore.from_tables(tables))
+
+    return {
+        "columns": columns,
+        "entities": len(store.entity_ids),
+        "dicts": dict_stats,
+        "store": store_stats,
+        "memory_ratio": round(dict_stats["retained_kb"] / max(store_stats["retained_kb"], 1e-3), 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--columns", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.columns, args.seed)
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
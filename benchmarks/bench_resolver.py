@@ -0,0 +1,97 @@
+# benchmarks/bench_resolver.py
+"""
+Exact vs vector resolver backends on a synthetic semantic model.
+
+    python -m benchmarks.bench_resolver --columns 10000 --concepts 200
+    python -m benchmarks.bench_resolver --json bench_resolver.json
+"""
+import argparse
+import json
+import random
+import time
+from compiler.resolver import ConceptResolver, NUMERIC_CONCEPTS
+from discovery.linguistic import generate_linguistic_metadata
+
+WORDS = [
+    "sales", "amount", "cost", "price", "quantity", "discount", "margin", "revenue",
+    "product", "country", "region", "customer", "date", "order", "ship", "store",
+    "category", "segment", "person", "city", "channel", "supplier", "brand", "code",
+    "status", "type", "name", "id", "year", "month", "week", "target", "budget"
+]
+NUMERIC_DATATYPES = ["int64", "double", "decimal"]
+TEXT_DATATYPES = ["string", "dateTime", "boolean"]
+
+
+def synthetic_semantic_index(columns: int, columns_per_table: int = 50, seed: int = 0) -> dict:
+    """Semantic index shaped like discovery.indexer output, `columns` columns in total."""
+    rng = random.Random(seed)
+    tables = {}
+    for t in range(max(1, columns // columns_per_table)):
+        table_name = f"{rng.choice(WORDS).title()}_{t}"
+        cols, measures = {}, {}
+        for c in range(columns_per_table):
+            col_name = "_".join(rng.sample(WORDS, rng.randint(1, 3))).title() + f"_{c}"
+            numeric = rng.random() < 0.4
+            cols[col_name] = {
+                "dataType": rng.choice(NUMERIC_DATATYPES if numeric else TEXT_DATATYPES)
+            }
+            if numeric:
+                measures[col_name] = {"aggregation": "sum"}
+        tables[table_name] = {"columns": cols, "measures": measures, "explicit_measures": {}}
+    return {"tables": tables}
+
+
+def synthetic_concepts(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    concepts = list(NUMERIC_CONCEPTS)
+    while len(concepts) < count:
+        concepts.append(" ".join(rng.sample(WORDS, rng.randint(1, 2))))
+    return concepts[:count]
+
+
+def run(columns: int, concepts: int, seed: int = 0) -> dict:
+    linguistic = generate_linguistic_metadata(synthetic_semantic_index(columns, seed=seed))
+    queries = synthetic_concepts(concepts, seed=seed + 1)
+
+    report = {"columns": columns, "entities": len(linguistic["entities"]), "concepts": len(queries)}
+    results = {}
+    for backend in ConceptResolver.BACKENDS:
+        start = time.perf_counter()
+        resolver = ConceptResolver(linguistic, backend=backend)
+        if backend == "vector":
+            resolver._vector_scorer()
+        built = time.perf_counter()
+        results[backend] = resolver.resolve_concepts(queries)
+        done = time.perf_counter()
+        report[backend] = {
+            "build_ms": round((built - start) * 1000, 1),
+            "resolve_ms": round((done - built) * 1000, 1),
+            "per_concept_ms": round((done - built) * 1000 / len(queries), 3)
+        }
+
+    def key(result):
+        return None if isinstance(result, Exception) else (result["entity"], result["column"])
+
+    agree = sum(key(results["exact"][q]) == key(results["vector"][q]) for q in queries)
+    report["agreement"] = round(agree / len(queries), 3)
+    report["speedup"] = round(report["exact"]["resolve_ms"] / max(report["vector"]["resolve_ms"], 1e-3), 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--columns", type=int, default=10000)
+    parser.add_argument("--concepts", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.columns, args.concepts, args.seed)
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
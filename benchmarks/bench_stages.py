@@ -0,0 +1,268 @@
+# benchmarks/bench_stages.py
+"""
+Per-stage throughput and peak memory of the offline pipeline on
+synthetic TMDL models (benchmarks/synthetic_tmdl.py) of growing size:
+
+    load_tmdl_files -> extract_semantic_index -> generate_linguistic_metadata
+    -> VisualBinder (index build) -> resolve_concept -> VisualBinder.bind
+    -> LayoutPlanner.plan_layout -> materialize_visual
+
+Each stage is timed (best of --repeat) without tracing, then run once
+more under tracemalloc for its peak. `scaling` is the log-log slope of
+stage time against model columns: ~1 is linear, ~0 is size-independent
+(the planning/writing stages should be). With --baseline, stages slower
+than `tolerance` x the baseline are listed and the exit code is 1.
+
+    python -m benchmarks.bench_stages --sizes 10,1000,10000,50000
+    python -m benchmarks.bench_stages --json stages.json --baseline main.json
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from discovery.tmdl_parser import load_tmdl_files
+from discovery.indexer import extract_semantic_index
+from discovery.linguistic import generate_linguistic_metadata
+from compiler.binder import VisualBinder
+from compiler.resolver import ConceptResolver
+from agents.layout_planner import LayoutPlanner
+from backend.pbip_writer import materialize_visual
+from core.models import VisualIntent
+from core.log import get_logger
+from benchmarks.synthetic_tmdl import write_synthetic_model
+
+log = get_logger("bench")
+
+DEFAULT_SIZES = [10, 1000, 10000]
+DEFAULT_VISUALS = 24
+DEFAULT_TOLERANCE = 1.5
+# Stages faster than this are too noisy to flag as regressions
+MIN_REGRESSION_SECONDS = 0.01
+
+CHART_TYPES = ["bar", "column", "line", "pie", "table"]
+
+
+def synthetic_intents(tables: dict, visuals: int, seed: int = 0) -> list:
+    """Planner-shaped intents over the model's own columns (named as the LLM would)."""
+    rng = random.Random(seed)
+    dims, measures = [], []
+    for table in tables.values():
+        for name, column in table["columns"].items():
+            if column.get("summarizeBy", "none") != "none":
+                measures.append(name.lower())
+            elif column.get("dataType") == "string":
+                dims.append(name.lower())
+    dims, measures = sorted(set(dims)), sorted(set(measures))
+
+    intents = []
+    for i in range(visuals):
+        measure = rng.choice(measures) if measures else None
+        if not measure or (dims and i % 6 == 5):
+            concepts = [rng.choice(dims)] if dims else []
+            visual_type = "table"
+        elif i % 6 == 0 or not dims:
+            concepts, visual_type = [measure], "card"
+        else:
+            concepts, visual_type = [rng.choice(dims), measure], rng.choice(CHART_TYPES)
+        if concepts:
+            intents.append(VisualIntent(title=f"Visual {i}", visual_type=visual_type, concepts=concepts))
+    return intents
+
+
+def _timed(stage, repeat: int):
+    """(result, best seconds, peak bytes) of stage()."""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = stage()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        stage()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def _stage(items: int, unit: str, seconds: float, peak: int) -> dict:
+    return {
+        "items": items,
+        "unit": unit,
+        "seconds": round(seconds, 6),
+        "per_second": round(items / seconds, 1) if seconds > 0 else None,
+        "peak_kb": round(peak / 1024, 1)
+    }
+
+
+def run_size(columns: int, workdir: str, visuals: int = DEFAULT_VISUALS, repeat: int = 1,
+             seed: int = 0, columns_per_table: int = 40) -> dict:
+    """Generates one synthetic model under `workdir` and times every stage on it."""
+    model = write_synthetic_model(
+        os.path.join(workdir, f"model-{columns}"), columns, columns_per_table=columns_per_table, seed=seed
+    )
+    report = {k: model[k] for k in ("tables", "columns", "measures")}
+    report["tmdl_kb"] = round(model["bytes"] / 1024, 1)
+    stages = report["stages"] = {}
+
+    tables, seconds, peak = _timed(lambda: load_tmdl_files(model["tables_path"]), repeat)
+    stages["load_tmdl_files"] = _stage(columns, "columns", seconds, peak)
+
+    index, seconds, peak = _timed(lambda: extract_semantic_index(tables), repeat)
+    stages["extract_semantic_index"] = _stage(columns, "columns", seconds, peak)
+
+    linguistic, seconds, peak = _timed(lambda: generate_linguistic_metadata(index), repeat)
+    stages["generate_linguistic_metadata"] = _stage(columns, "columns", seconds, peak)
+    report["entities"] = len(linguistic["entities"])
+
+    binder, seconds, peak = _timed(lambda: VisualBinder(linguistic), repeat)
+    stages["binder_build"] = _stage(columns, "columns", seconds, peak)
+
+    # Fresh resolvers over the shared index: nothing memoized between repeats
+    intents = synthetic_intents(tables, visuals, seed=seed)
+    concepts = list(dict.fromkeys(c for intent in intents for c in intent.concepts))
+
+    def resolve():
+        resolver = ConceptResolver(linguistic, index=binder.resolver.index)
+        return [resolver.resolve(concept) for concept in concepts]
+
+    _, seconds, peak = _timed(resolve, repeat)
+    stages["resolve_concept"] = _stage(len(concepts), "concepts", seconds, peak)
+
+    def bind():
+        binder.resolver = ConceptResolver(linguistic, index=binder.resolver.index)
+        return [binder.bind(intent) for intent in intents]
+
+    bound, seconds, peak = _timed(bind, repeat)
+    stages["bind"] = _stage(len(bound), "visuals", seconds, peak)
+
+    layout = LayoutPlanner()
+    pages = layout.paginate(bound)
+
+    def plan():
+        return [
+            layout.plan_layout([v.model_copy() for v in page], dashboard_title=f"Page {i}")
+            for i, page in enumerate(pages, 1)
+        ]
+
+    planned, seconds, peak = _timed(plan, repeat)
+    stages["plan_layout"] = _stage(len(bound), "visuals", seconds, peak)
+
+    output_dir = os.path.join(workdir, f"visuals-{columns}")
+    written = [visual for page in planned for visual in page]
+
+    def materialize():
+        for i, visual in enumerate(written):
+            materialize_visual(visual, output_dir, i)
+        return len(written)
+
+    _, seconds, peak = _timed(materialize, repeat)
+    stages["materialize_visual"] = _stage(len(written), "visuals", seconds, peak)
+    return report
+
+
+def scaling(results: list) -> dict:
+    """Least-squares slope of log(seconds) over log(columns), per stage."""
+    slopes = {}
+    for stage in results[0]["stages"] if results else ():
+        points = [
+            (math.log(r["columns"]), math.log(r["stages"][stage]["seconds"]))
+            for r in results if r["stages"][stage]["seconds"] > 0
+        ]
+        if len(points) < 2:
+            continue
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        spread = sum((x - mean_x) ** 2 for x, _ in points)
+        if spread:
+            slopes[stage] = round(sum((x - mean_x) * (y - mean_y) for x, y in points) / spread, 2)
+    return slopes
+
+
+def compare(report: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """Stages of `report` more than `tolerance` x slower than in `baseline` (same model size)."""
+    previous = {r["columns"]: r["stages"] for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        for stage, stats in result["stages"].items():
+            before = previous.get(result["columns"], {}).get(stage)
+            if not before or stats["seconds"] < MIN_REGRESSION_SECONDS:
+                continue
+            ratio = stats["seconds"] / max(before["seconds"], 1e-9)
+            if ratio > tolerance:
+                regressions.append({
+                    "columns": result["columns"], "stage": stage,
+                    "baseline_seconds": before["seconds"], "seconds": stats["seconds"],
+                    "ratio": round(ratio, 2)
+                })
+    return regressions
+
+
+def run(sizes=None, visuals: int = DEFAULT_VISUALS, repeat: int = 1, seed: int = 0,
+        columns_per_table: int = 40, workdir: str = None) -> dict:
+    sizes = sorted(sizes or DEFAULT_SIZES)
+    root = workdir or tempfile.mkdtemp(prefix="genai-bench-")
+    try:
+        results = []
+        for columns in sizes:
+            log.info("Benchmarking stages at %d columns", columns)
+            results.append(run_size(columns, root, visuals, repeat, seed, columns_per_table))
+    finally:
+        if workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "visuals": visuals,
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+        "scaling": scaling(results)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated model sizes in columns")
+    parser.add_argument("--visuals", type=int, default=DEFAULT_VISUALS)
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per stage (best is kept)")
+    parser.add_argument("--columns-per-table", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="keep the generated models and visuals here")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--baseline", help="earlier --json report to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    report = run(
+        [int(s) for s in args.sizes.split(",") if s.strip()], args.visuals, max(1, args.repeat),
+        args.seed, args.columns_per_table, args.workdir
+    )
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/bench_writer.py
+"""
+Per-visual visual.json cost: rebuilding the nested container dict and
+json.dumps()-ing all of it vs the compiled templates, which only
+serialize the dynamic slots.
+
+    python -m benchmarks.bench_writer --visuals 5000
+    python -m benchmarks.bench_writer --json bench_writer.json
+"""
+import argparse
+import json
+import random
+import time
+from core.models import BoundVisual, PhysicalBinding, VisualLayout
+from backend.pbip_writer import build_visual_slots, render_visual
+from backend.visual_templates import get_template_engine
+
+TYPES = ["table", "bar", "column", "line", "pie", "card"]
+
+
+def synthetic_bound_visuals(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    visuals = []
+    for i in range(count):
+        dims = [
+            PhysicalBinding(concept_name="d", table="Dim Geography", column=rng.choice(["Country", "Region", "City"]), kind="dimension")
+        ]
+        measures = [
+            PhysicalBinding(
+                concept_name=f"m{k}", table="Sales", column=rng.choice(["Amount", "Units", "Cost"]),
+                kind="measure", aggregation=rng.choice(["sum", "avg", "count"])
+            )
+            for k in range(rng.randint(1, 3))
+        ]
+        visuals.append(BoundVisual(
+            visual_name=f"v{i}",
+            visual_type=rng.choice(TYPES),
+            bindings=dims + measures,
+            title=f"Visual {i}",
+            top_n=rng.choice([None, 10]),
+            layout=VisualLayout(x=20, y=70 + i % 5 * 120, width=600, height=300, tabOrder=i)
+        ))
+    return visuals
+
+
+def _fill(node, values):
+    """The old approach: a fresh nested container dict per visual."""
+    if isinstance(node, dict):
+        out = {}
+        for key, value in node.items():
+            if key.startswith("{{") and key.endswith("?}}"):
+                name = key[2:-3]
+                if values.get(name):
+                    out[name] = values[name]
+            else:
+                out[key] = _fill(value, values)
+        return out
+    if isinstance(node, list):
+        return [_fill(item, values) for item in node]
+    if isinstance(node, str) and node.startswith("{{") and node.endswith("}}"):
+        return values.get(node[2:-2])
+    return node
+
+
+def _timed(fn, visuals) -> float:
+    start = time.perf_counter()
+    for i, bound in enumerate(visuals, 1):
+        fn(bound, i)
+    return time.perf_counter() - start
+
+
+def run(count: int, seed: int = 0) -> dict:
+    visuals = synthetic_bound_visuals(count, seed)
+    engine = get_template_engine()
+    raw = {}
+    for bound in visuals:
+        path = engine.template_map.get(bound.visual_type)
+        if path not in raw:
+            with open(path, "r", encoding="utf-8") as f:
+                raw[path] = json.load(f)
+    # Slots are shared by both paths; time them separately
+    slots = {id(bound): build_visual_slots(bound.model_copy(deep=True), i, bound.visual_name)
+             for i, bound in enumerate(visuals, 1)}
+
+    def rebuild(bound, i):
+        template = raw[engine.template_map[bound.visual_type]]
+        return json.dumps(_fill(template, slots[id(bound)]), indent=2)
+
+    def compiled(bound, i):
+        return engine.render(bound.visual_type, slots[id(bound)], compact=False)
+
+    def minified(bound, i):
+        return engine.render(bound.visual_type, slots[id(bound)], compact=True)
+
+    # Warm up (template compilation happens once)
+    for fn in (rebuild, compiled, minified):
+        fn(visuals[0], 1)
+    for i, bound in enumerate(visuals[:200], 1):
+        assert rebuild(bound, i) == compiled(bound, i)
+
+    copies = [bound.model_copy(deep=True) for bound in visuals]
+    end_to_end = _timed(lambda bound, i: render_visual(bound, i, bound.visual_name), copies)
+    timings = {
+        "rebuild_dict_us": _timed(rebuild, visuals),
+        "template_us": _timed(compiled, visuals),
+        "template_compact_us": _timed(minified, visuals),
+        "render_visual_us": end_to_end
+    }
+    report = {"visuals": count}
+    report.update({key: round(value / count * 1e6, 2) for key, value in timings.items()})
+    report["speedup"] = round(timings["rebuild_dict_us"] / max(timings["template_us"], 1e-9), 2)
+    report["compact_bytes_ratio"] = round(
+        sum(len(compiled(b, i)) for i, b in enumerate(visuals[:200], 1))
+        / sum(len(minified(b, i)) for i, b in enumerate(visuals[:200], 1)), 2
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--visuals", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.visuals, args.seed)
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
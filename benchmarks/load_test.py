@@ -0,0 +1,236 @@
+# benchmarks/load_test.py
+"""
+Offline load test: N concurrent pipeline runs (plan, bind, lay out,
+write) against recorded LLM completions (llm/replay.py), reporting
+p50/p95/p99 latency per stage from the trace spans. No API keys and no
+network: the semantic model is parsed in memory and pages are written
+to a temp folder.
+
+Record fixtures once (live keys), then replay anywhere:
+
+    GENAI_LLM_MODE=record python pipeline.py --batch queries.jsonl
+    python -m benchmarks.load_test --queries queries.jsonl --runs 200 --concurrency 16
+    python -m benchmarks.load_test --synthetic-plans --columns 5000 --latency 1.5 --json load.json
+"""
+import argparse
+import ast
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Same layout as a checkout: the default model is the project's own
+os.environ.setdefault("PROJECT_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import SEMANTIC_MODEL_PATH, PLANNER_STREAMING
+from discovery.tmdl_parser import load_tmdl_files
+from discovery.indexer import extract_semantic_index
+from discovery.linguistic import generate_linguistic_metadata
+from agents.visual_planner import agent_plan_visuals, agent_plan_visuals_stream
+from backend.report_pages import sync_pages
+from llm.cache import MemoryLRUCache
+from llm.clients import LLM_FIXTURES, use_client
+from llm.replay import ReplayClient
+from core.tracing import Tracer, set_tracer, trace_span
+from core.log import get_logger
+from pipeline import build_dashboard, load_batch_queries, make_binder, make_fast_path, make_retriever
+
+log = get_logger("bench")
+
+PERCENTILES = (50, 95, 99)
+DEFAULT_QUERIES = [
+    "Overall sales overview with product analysis",
+    "amount by country",
+    "top 5 products by amount",
+    "amount over time",
+    "share of boxes shipped by product",
+    "compare sales people on amount and boxes shipped"
+]
+
+
+def percentile(values: list, q: float) -> float:
+    """Linearly interpolated percentile (q in 0..100) of `values`."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_stats(values_ms: list) -> dict:
+    stats = {"count": len(values_ms)}
+    for q in PERCENTILES:
+        stats[f"p{q}_ms"] = round(percentile(values_ms, q), 3)
+    stats["mean_ms"] = round(sum(values_ms) / len(values_ms), 3)
+    stats["max_ms"] = round(max(values_ms), 3)
+    return stats
+
+
+def synthetic_planner(linguistic: dict):
+    """
+    Stand-in completions for prompts without a recording (--synthetic-plans):
+    a bar, a card and a table over the fields the prompt offers.
+    """
+    fields = {}
+    for entity in linguistic.get("entities", {}).values():
+        binding = entity.get("binding", {})
+        if "column" not in binding:
+            continue
+        for term in entity.get("terms", []) + [binding["column"]]:
+            term = (term.get("term", "") if isinstance(term, dict) else term).lower()
+            fields.setdefault(term, bool(binding.get("measure")))
+
+    def plan(request: dict) -> str:
+        prompt = request["messages"][-1]["content"]
+        query = re.search(r'User Query: "(.*)"', prompt)
+        offered = re.search(r"Available Concepts: (\[.*?\])", prompt)
+        concepts = [c for c in (ast.literal_eval(offered.group(1)) if offered else []) if c in fields]
+        measures = [c for c in concepts if fields[c]]
+        dims = [c for c in concepts if not fields[c]]
+
+        charts = []
+        if measures and dims:
+            charts.append({"title": f"{measures[0]} by {dims[0]}", "visual_type": "bar",
+                           "concepts": [dims[0], measures[0]], "top_n": None})
+        if measures:
+            charts.append({"title": measures[0], "visual_type": "card", "concepts": measures[:1], "top_n": None})
+        if dims:
+            charts.append({"title": "Details", "visual_type": "table", "concepts": dims[:3], "top_n": None})
+        return json.dumps({"dashboard_title": query.group(1) if query else "Dashboard", "charts": charts})
+
+    return plan
+
+
+def load_linguistic(tables_path: str) -> dict:
+    """Parsed in memory: nothing is cached next to the model."""
+    return generate_linguistic_metadata(extract_semantic_index(load_tmdl_files(tables_path)))
+
+
+def run(queries: list, runs: int, concurrency: int, client: ReplayClient, linguistic: dict,
+        streaming: bool = PLANNER_STREAMING, planner_cache: bool = False, pages_dir: str = None) -> dict:
+    """
+    Fires `runs` dashboard builds (queries round-robin) at most
+    `concurrency` at a time and summarizes the spans per stage.
+    """
+    binder = make_binder(linguistic)
+    retriever = make_retriever(linguistic)
+    fast_path = make_fast_path(linguistic)
+    # No cache by default: every LLM-planned run pays for its completion
+    cache = MemoryLRUCache(max_entries=1024 if planner_cache else 0)
+    plan_visuals = agent_plan_visuals_stream if streaming else agent_plan_visuals
+
+    def planner(query, concepts, schema_summary=""):
+        return plan_visuals(query, concepts, schema_summary, cache=cache)
+
+    output = pages_dir or tempfile.mkdtemp(prefix="genai-load-")
+    tracer = Tracer()
+    previous_tracer, previous_client = set_tracer(tracer), use_client(client)
+
+    def _run(i):
+        query = queries[i % len(queries)]
+        try:
+            with trace_span("dashboard", query=query):
+                pages, _ = build_dashboard(
+                    query, linguistic, binder, planner=planner, retriever=retriever, fast_path=fast_path
+                )
+                with trace_span("writing", pages=len(pages)):
+                    sync_pages(output, f"load-{i}", pages)
+            return None
+        except Exception as e:
+            log.error("Run %d ('%s') failed: %s", i, query, e)
+            return f"{type(e).__name__}: {e}"
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            errors = list(pool.map(_run, range(runs)))
+    finally:
+        wall = time.perf_counter() - started
+        set_tracer(previous_tracer)
+        use_client(previous_client)
+        if pages_dir is None:
+            shutil.rmtree(output, ignore_errors=True)
+
+    durations, first_visual = {}, []
+    for span in tracer.spans:
+        durations.setdefault(span.name, []).append(span.duration * 1000)
+        if "first_visual_ms" in span.attributes:
+            first_visual.append(span.attributes["first_visual_ms"])
+
+    report = {
+        "runs": runs,
+        "concurrency": concurrency,
+        "queries": len(queries),
+        "streaming": streaming,
+        "wall_seconds": round(wall, 3),
+        "runs_per_second": round(runs / wall, 2) if wall > 0 else None,
+        "errors": sum(e is not None for e in errors),
+        "llm": dict(client.stats),
+        "stages": {name: latency_stats(values) for name, values in durations.items()}
+    }
+    if first_visual:
+        report["first_visual"] = latency_stats(first_visual)
+    failures = sorted({e for e in errors if e})
+    if failures:
+        report["failures"] = failures[:10]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", help="CSV or JSONL file of queries (as for pipeline.py --batch)")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--fixtures", default=LLM_FIXTURES, help="recorded completions folder")
+    parser.add_argument("--latency", type=float, help="seconds per completion (default: as recorded)")
+    parser.add_argument("--speed", type=float, default=1.0, help="multiplies every replay delay")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- fraction of random latency noise")
+    parser.add_argument("--synthetic-plans", action="store_true",
+                        help="answer prompts without a recording with a generated plan")
+    parser.add_argument("--tables", default=SEMANTIC_MODEL_PATH, help="TMDL tables folder")
+    parser.add_argument("--columns", type=int, help="use a synthetic model of this size instead")
+    parser.add_argument("--no-stream", action="store_true", help="non-streaming planner calls")
+    parser.add_argument("--planner-cache", action="store_true", help="reuse plans across runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    queries = [q["query"] for q in load_batch_queries(args.queries)] if args.queries else DEFAULT_QUERIES
+
+    workdir = None
+    tables = args.tables
+    if args.columns:
+        from benchmarks.synthetic_tmdl import write_synthetic_model
+        workdir = tempfile.mkdtemp(prefix="genai-load-model-")
+        tables = write_synthetic_model(workdir, args.columns, seed=args.seed)["tables_path"]
+
+    try:
+        linguistic = load_linguistic(tables)
+        client = ReplayClient(
+            args.fixtures, latency=args.latency, speed=args.speed, jitter=args.jitter,
+            fallback=synthetic_planner(linguistic) if args.synthetic_plans else None, seed=args.seed
+        )
+        report = run(
+            queries, args.runs, args.concurrency, client, linguistic,
+            streaming=PLANNER_STREAMING and not args.no_stream, planner_cache=args.planner_cache
+        )
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if report["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
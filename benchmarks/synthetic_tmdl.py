@@ -0,0 +1,236 @@
+# benchmarks/synthetic_tmdl.py
+"""
+Synthetic semantic models on disk: a PBIP-style `definition/` folder
+(model.tmdl, relationships.tmdl, tables/*.tmdl) of any size, with
+star-schema tables and realistic column names, for the stage benchmarks.
+
+    python -m benchmarks.synthetic_tmdl out/Synthetic.SemanticModel --columns 5000
+"""
+import argparse
+import json
+import os
+import random
+import uuid
+
+# -------------------------------
+# Vocabulary
+# -------------------------------
+FACTS = [
+    "Sales", "Orders", "Returns", "Shipments", "Inventory", "Budget", "Forecast",
+    "Web Traffic", "Payroll", "Invoices", "Payments", "Support Tickets"
+]
+DIMENSIONS = [
+    "Customer", "Product", "Store", "Employee", "Supplier", "Geography",
+    "Promotion", "Channel", "Warehouse", "Account", "Campaign", "Vendor"
+]
+# Repeated table names get a business-unit qualifier, then a number
+QUALIFIERS = ["EMEA", "APAC", "Americas", "Online", "Retail", "Wholesale", "Archive", "Staging"]
+
+ATTRIBUTES = [
+    "Name", "Code", "Category", "Subcategory", "Segment", "City", "Country", "Region",
+    "State", "Postal Code", "Email", "Phone", "Status", "Type", "Group", "Manager",
+    "Brand", "Color", "Size", "Tier", "Language", "Currency", "Description"
+]
+DIMENSION_DATES = ["Start Date", "End Date", "Created Date", "Modified Date"]
+AMOUNTS = [
+    "Amount", "Quantity", "Unit Price", "Cost", "Discount", "Margin", "Revenue", "Tax",
+    "Freight", "Units", "Weight", "Duration", "Hours", "Visits", "Boxes Shipped"
+]
+AMOUNT_PREFIXES = ["", "Net", "Gross", "Target", "Planned", "Actual", "Returned", "Average"]
+FACT_DATES = ["Order Date", "Ship Date", "Due Date", "Invoice Date", "Posting Date"]
+
+FORMATS = {"int64": "0", "double": "#,0.00", "decimal": "\\$#,0.00;(\\$#,0.00);\\$#,0.00"}
+M_TYPES = {"string": "type text", "int64": "Int64.Type", "double": "type number",
+           "decimal": "Currency.Type", "dateTime": "type date", "boolean": "type logical"}
+
+
+def _quote(name: str) -> str:
+    """TMDL object name, quoted when it is not a bare identifier."""
+    if name.replace("_", "").isalnum():
+        return name
+    return "'" + name.replace("'", "''") + "'"
+
+
+def _unique(name: str, taken: set) -> str:
+    candidate, n = name, 2
+    while candidate.lower() in taken:
+        candidate = f"{name} {n}"
+        n += 1
+    taken.add(candidate.lower())
+    return candidate
+
+
+class SyntheticModel:
+    """
+    Deterministic (per seed) star schema: every third table is a fact
+    table with numeric columns, date columns and explicit measures,
+    keyed to earlier dimension tables; the rest are dimensions with
+    text attributes. Sizes are exact: `columns` columns in total.
+    """
+
+    def __init__(self, columns: int, columns_per_table: int = 40, measures_per_fact: int = 4, seed: int = 0):
+        self.columns = max(1, columns)
+        self.columns_per_table = max(1, columns_per_table)
+        self.measures_per_fact = measures_per_fact
+        self.rng = random.Random(seed)
+        # [{"name", "fact", "columns": [(name, dataType, summarizeBy)], "measures": [(name, dax, format)]}]
+        self.tables = []
+        self.relationships = []
+        self._generate()
+
+    def _lineage(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _generate(self):
+        table_names, remaining = set(), self.columns
+        dimensions = []
+        while remaining > 0:
+            count = min(self.columns_per_table, remaining)
+            remaining -= count
+            fact = len(self.tables) % 3 == 2 or self.columns_per_table > self.columns
+            base = self.rng.choice(FACTS if fact else DIMENSIONS)
+            name = base if base.lower() not in table_names else \
+                _unique(f"{base} {self.rng.choice(QUALIFIERS)}", table_names)
+            table_names.add(name.lower())
+            table = {"name": name, "fact": fact, "columns": [], "measures": []}
+            if fact:
+                self._fill_fact(table, count, dimensions)
+            else:
+                self._fill_dimension(table, base, count)
+                dimensions.append(table)
+            self.tables.append(table)
+
+    def _fill_dimension(self, table: dict, entity: str, count: int):
+        taken = set()
+        table["columns"].append((_unique(f"{entity} Key", taken), "int64", "none"))
+        while len(table["columns"]) < count:
+            if self.rng.random() < 0.1:
+                table["columns"].append((_unique(self.rng.choice(DIMENSION_DATES), taken), "dateTime", "none"))
+            elif self.rng.random() < 0.1:
+                table["columns"].append((_unique(f"Is {self.rng.choice(ATTRIBUTES)} Active", taken), "boolean", "none"))
+            else:
+                table["columns"].append((_unique(f"{entity} {self.rng.choice(ATTRIBUTES)}", taken), "string", "none"))
+        table["columns"] = table["columns"][:count]
+
+    def _fill_fact(self, table: dict, count: int, dimensions: list):
+        taken = set()
+        for dim in self.rng.sample(dimensions, min(len(dimensions), 3, max(count - 1, 0))):
+            key = dim["columns"][0][0]
+            column = _unique(key, taken)
+            table["columns"].append((column, "int64", "none"))
+            self.relationships.append((table["name"], column, dim["name"], key))
+        table["columns"].append((_unique(self.rng.choice(FACT_DATES), taken), "dateTime", "none"))
+        while len(table["columns"]) < count:
+            prefix = self.rng.choice(AMOUNT_PREFIXES)
+            name = f"{prefix} {self.rng.choice(AMOUNTS)}".strip()
+            table["columns"].append((_unique(name, taken), self.rng.choice(["int64", "double", "decimal"]), "sum"))
+        table["columns"] = table["columns"][:count]
+
+        numeric = [c for c, _, summarize in table["columns"] if summarize == "sum"]
+        quoted = _quote(table["name"])
+        for column in numeric[:self.measures_per_fact]:
+            dax = self.rng.choice(["SUM", "AVERAGE", "MAX"])
+            measure = _unique(f"{'Total' if dax == 'SUM' else dax.title()} {column}", taken)
+            table["measures"].append((measure, f"{dax}({quoted}[{column}])", "#,0.00"))
+
+    # ------------------------------------------------------------------
+    # TMDL
+    # ------------------------------------------------------------------
+    def table_tmdl(self, table: dict) -> str:
+        name = _quote(table["name"])
+        lines = [f"table {name}", f"\tlineageTag: {self._lineage()}", ""]
+        for measure, dax, fmt in table["measures"]:
+            lines += [
+                f"\tmeasure {_quote(measure)} = {dax}",
+                f"\t\tformatString: {fmt}",
+                f"\t\tlineageTag: {self._lineage()}",
+                ""
+            ]
+        for column, data_type, summarize in table["columns"]:
+            lines.append(f"\tcolumn {_quote(column)}")
+            lines.append(f"\t\tdataType: {data_type}")
+            if data_type in FORMATS:
+                lines.append(f"\t\tformatString: {FORMATS[data_type]}")
+            elif data_type == "dateTime":
+                lines.append("\t\tformatString: Long Date")
+            lines += [
+                f"\t\tlineageTag: {self._lineage()}",
+                f"\t\tsummarizeBy: {summarize}",
+                f"\t\tsourceColumn: {column}",
+                "",
+                "\t\tannotation SummarizationSetBy = Automatic",
+                ""
+            ]
+        types = ", ".join(f'{{"{c}", {M_TYPES[dt]}}}' for c, dt, _ in table["columns"])
+        lines += [
+            f"\tpartition {name} = m",
+            "\t\tmode: import",
+            "\t\tsource =",
+            "\t\t\t\tlet",
+            f'\t\t\t\t    Source = Csv.Document(File.Contents("C:\\data\\{table["name"]}.csv"), [Delimiter=",", Encoding=65001]),',
+            '\t\t\t\t    #"Promoted Headers" = Table.PromoteHeaders(Source, [PromoteAllScalars=true]),',
+            f'\t\t\t\t    #"Changed Type" = Table.TransformColumnTypes(#"Promoted Headers",{{{types}}})',
+            "\t\t\t\tin",
+            '\t\t\t\t    #"Changed Type"',
+            "",
+            "\tannotation PBI_ResultType = Table",
+            ""
+        ]
+        return "\n".join(lines)
+
+    def model_tmdl(self) -> str:
+        lines = ["model Model", "\tculture: en-US", "\tdefaultPowerBIDataSourceVersion: powerBI_V3", ""]
+        lines += [f"ref table {_quote(t['name'])}" for t in self.tables]
+        return "\n".join(lines) + "\n"
+
+    def relationships_tmdl(self) -> str:
+        blocks = [
+            f"relationship {self._lineage()}\n"
+            f"\tfromColumn: {_quote(src)}.{_quote(src_col)}\n"
+            f"\ttoColumn: {_quote(dst)}.{_quote(dst_col)}\n"
+            for src, src_col, dst, dst_col in self.relationships
+        ]
+        return "\n".join(blocks)
+
+    def write(self, root: str) -> dict:
+        """Writes <root>/definition/...; returns paths and counts."""
+        definition = os.path.join(root, "definition")
+        tables_path = os.path.join(definition, "tables")
+        os.makedirs(tables_path, exist_ok=True)
+
+        size = 0
+        files = [("model.tmdl", self.model_tmdl()), ("relationships.tmdl", self.relationships_tmdl())]
+        files += [(os.path.join("tables", f"{t['name']}.tmdl"), self.table_tmdl(t)) for t in self.tables]
+        for path, content in files:
+            with open(os.path.join(definition, path), "w", encoding="utf-8") as f:
+                f.write(content)
+            size += len(content.encode("utf-8"))
+
+        return {
+            "definition": definition,
+            "tables_path": tables_path,
+            "tables": len(self.tables),
+            "columns": sum(len(t["columns"]) for t in self.tables),
+            "measures": sum(len(t["measures"]) for t in self.tables),
+            "relationships": len(self.relationships),
+            "bytes": size
+        }
+
+
+def write_synthetic_model(root: str, columns: int, columns_per_table: int = 40, seed: int = 0) -> dict:
+    return SyntheticModel(columns, columns_per_table=columns_per_table, seed=seed).write(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="semantic model folder to create (definition/ goes inside)")
+    parser.add_argument("--columns", type=int, default=1000)
+    parser.add_argument("--columns-per-table", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps(write_synthetic_model(args.root, args.columns, args.columns_per_table, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
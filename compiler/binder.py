@@ -1,8 +1,12 @@
 # compiler/binder.py
 
+import logging
 from typing import List
 from core.models import VisualIntent, BoundVisual, PhysicalBinding
-from compiler.resolver import resolve_concept
+from compiler.resolver import ConceptResolver
+from core.log import get_logger
+
+log = get_logger("binder")
 
 
 class VisualBinder:
@@ -11,8 +15,18 @@ class VisualBinder:
     Converts Abstract Concepts into Physical Bindings using Linguistic Metadata.
     """
 
-    def __init__(self, linguistic_metadata: dict):
+    def __init__(self, linguistic_metadata: dict, backend: str = "exact", embeddings=None):
         self.linguistic = linguistic_metadata
+        # Built once, memoizes every concept of every visual
+        self.resolver = ConceptResolver(linguistic_metadata, backend=backend, embeddings=embeddings)
+
+    def resolve_intents(self, intents: List[VisualIntent]) -> dict:
+        """
+        Resolves the concepts of a whole dashboard in one batch,
+        so bind() afterwards only hits the resolver's memo.
+        """
+        concepts = [concept for intent in intents for concept in intent.concepts]
+        return self.resolver.resolve_concepts(concepts)
 
     def bind(self, intent: VisualIntent) -> BoundVisual:
         """
@@ -22,13 +36,13 @@ class VisualBinder:
 
         physical_bindings: List[PhysicalBinding] = []
 
-        print(f"\n[BINDER] Binding visual: '{intent.title}'")
+        log.debug("Binding visual: '%s'", intent.title)
 
         for concept in intent.concepts:
             # --------------------------------------------
             # Step 5.1: Semantic Resolution
             # --------------------------------------------
-            res = resolve_concept(concept, self.linguistic)
+            res = self.resolver.resolve(concept)
 
             # --------------------------------------------
             # Step 5.2: Create Physical Binding
@@ -39,13 +53,14 @@ class VisualBinder:
                 column=res["column"],
                 kind="measure" if res.get("measure") else "dimension",
                 data_type=res.get("dataType"),
-                aggregation="sum" if res.get("measure") else None
+                aggregation="sum" if res.get("measure") and not res.get("explicit") else None,
+                explicit_measure=bool(res.get("explicit"))
             )
 
             # --------------------------------------------
             # Step 5.3: HARD INVARIANTS
             # --------------------------------------------
-            if binding.kind == "measure" and not binding.aggregation:
+            if binding.kind == "measure" and not binding.aggregation and not binding.explicit_measure:
                 raise RuntimeError(
                     f"[BINDER ERROR] Measure '{binding.column}' has no aggregation"
                 )
@@ -58,7 +73,8 @@ class VisualBinder:
             # --------------------------------------------
             # Step 5.4: Canonical Debug Output
             # --------------------------------------------
-            print("[BINDER OUTPUT]", binding.model_dump())
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Output: %s", binding.model_dump())
 
             physical_bindings.append(binding)
 
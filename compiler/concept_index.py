@@ -0,0 +1,242 @@
+# compiler/concept_index.py
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from core.log import TRACE, get_logger
+
+log = get_logger("resolver")
+
+
+SUBSTRING_BONUS = 0.25
+DEFAULT_TOP_K = 8
+
+
+def normalize_term(text: str) -> str:
+    """Same normalization the resolver applies to concepts and terms."""
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ConceptIndex:
+    """
+    Prebuilt lookup structure over linguistic metadata.
+
+    Terms are normalized once and deduplicated. A character-trigram
+    posting list ranks candidates for a concept; only the top-K are
+    scored exactly up front, and the rest are kept or pruned with
+    SequenceMatcher's own upper bounds. The winner is identical to a
+    full scan of every entity term.
+
+    Positions are (table rank, sequence): ties go to the table ranked
+    first, then to the term indexed first within it. Ranks follow the
+    metadata's table order and can be set through `table_rank`, so a
+    re-indexed table keeps its place without renumbering anything else.
+    """
+
+    def __init__(self, linguistic_metadata: dict, top_k: int = DEFAULT_TOP_K):
+        self.top_k = top_k
+        # table name -> rank (never reused); an unseen table ranks after
+        # every known one
+        self.table_rank = {}
+
+        # Distinct normalized terms and their character profiles
+        self.terms = []
+        self.term_chars = []
+        self._term_ids = {}
+
+        # term_id -> [(position, weight, entity_id, binding)]
+        self.occurrences = defaultdict(list)
+        # trigram -> set(term_id)
+        self.postings = defaultdict(set)
+        # entity_id -> [(term_id, occurrence)], for incremental updates
+        self._entity_occurrences = {}
+        self._next_position = 0
+
+        self.add_entities(linguistic_metadata.get("entities", {}))
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def add_entities(self, entities: dict) -> list:
+        """
+        Indexes `entities` ({entity_id: entity}) in their tables' rank,
+        after the terms already indexed for the same table. Re-adding an
+        existing entity replaces it. Returns the new [(term_id, occurrence)].
+        """
+        indexed = []
+        for entity_id, entity in entities.items():
+            if entity_id in self._entity_occurrences:
+                self.remove_entities([entity_id])
+
+            binding = entity.get("binding", {})
+            rank = self._rank(binding.get("table"))
+            added = self._entity_occurrences[entity_id] = []
+
+            for term in entity.get("terms", []):
+                term_text = term.get("term") if isinstance(term, dict) else term
+                weight = term.get("weight", 1.0) if isinstance(term, dict) else 1.0
+
+                if not term_text:
+                    continue
+
+                term_id = self._intern(normalize_term(term_text))
+                occurrence = ((rank, self._next_position), weight, entity_id, binding)
+                self.occurrences[term_id].append(occurrence)
+                added.append((term_id, occurrence))
+                self._next_position += 1
+            indexed += added
+        return indexed
+
+    def remove_entities(self, entity_ids) -> list:
+        """
+        Drops every occurrence of `entity_ids`; cost is O(their terms).
+        Returns the removed [(term_id, occurrence)].
+        """
+        removed = []
+        for entity_id in entity_ids:
+            for term_id, occurrence in self._entity_occurrences.pop(entity_id, ()):
+                occs = self.occurrences[term_id]
+                occs.remove(occurrence)
+                if not occs:
+                    # The term stays interned; without occurrences it is never eligible
+                    del self.occurrences[term_id]
+                removed.append((term_id, occurrence))
+        return removed
+
+    def _rank(self, table: str) -> int:
+        rank = self.table_rank.get(table)
+        if rank is None:
+            # Ranks stay below len(table_rank), so this one is unused
+            rank = self.table_rank[table] = len(self.table_rank)
+        return rank
+
+    def _intern(self, term_norm: str) -> int:
+        term_id = self._term_ids.get(term_norm)
+        if term_id is None:
+            term_id = len(self.terms)
+            self._term_ids[term_norm] = term_id
+            self.terms.append(term_norm)
+            self.term_chars.append(Counter(term_norm))
+            for gram in _trigrams(term_norm):
+                self.postings[gram].add(term_id)
+        return term_id
+
+    # ------------------------------------------------------------------
+    # Candidate generation
+    # ------------------------------------------------------------------
+    def candidates(self, concept_norm: str) -> list:
+        """Term ids ordered by shared trigram count (best first)."""
+        overlap = Counter()
+        for gram in _trigrams(concept_norm):
+            for term_id in self.postings.get(gram, ()):
+                overlap[term_id] += 1
+        return [term_id for term_id, _ in overlap.most_common()]
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+    def eligible(self, accept=None) -> dict:
+        """
+        {term_id: occurrences} that pass `accept(binding)` (hard semantic
+        constraints). Reusable across every concept with the same constraint.
+        """
+        trace = log.isEnabledFor(TRACE)
+
+        eligible = {}
+        for term_id, occs in self.occurrences.items():
+            kept = [o for o in occs if accept is None or accept(o[3])]
+            if kept:
+                eligible[term_id] = kept
+            if trace and len(kept) != len(occs):
+                for o in occs:
+                    if o not in kept:
+                        log.log(TRACE, "column='%s' REJECTED by semantic constraint", o[3].get("column"))
+        return eligible
+
+    def best_match(self, concept_norm: str, accept=None, eligible: dict = None):
+        """
+        Returns (position, score, entity_id, binding) for the best
+        eligible occurrence, or None.
+
+        `accept(binding)` filters occurrences (hard semantic constraints);
+        pass a precomputed `eligible` map instead to skip that filtering.
+        Ties are broken by original metadata order, like a linear scan.
+        """
+        # Trial-by-trial trace only when explicitly asked for
+        trace = log.isEnabledFor(TRACE)
+
+        if eligible is None:
+            eligible = self.eligible(accept)
+
+        best = None
+        exact = {}
+
+        def consider(term_id):
+            nonlocal best
+            term_norm = self.terms[term_id]
+            score = SequenceMatcher(None, concept_norm, term_norm).ratio()
+            if concept_norm in term_norm or term_norm in concept_norm:
+                score += SUBSTRING_BONUS
+            exact[term_id] = score
+
+            for position, weight, entity_id, binding in eligible[term_id]:
+                final_score = score * weight
+                if trace:
+                    log.log(
+                        TRACE, "concept='%s' → column='%s' (measure=%s, dataType=%s) score=%.3f",
+                        concept_norm, binding.get("column"), binding.get("measure", False),
+                        binding.get("dataType"), final_score
+                    )
+                if final_score <= 0:
+                    continue
+                if (
+                    best is None
+                    or final_score > best[1]
+                    or (final_score == best[1] and position < best[0])
+                ):
+                    best = (position, final_score, entity_id, binding)
+
+        # 1. Seed with the top-K trigram candidates
+        seeded = 0
+        for term_id in self.candidates(concept_norm):
+            if seeded >= self.top_k:
+                break
+            if term_id in eligible:
+                consider(term_id)
+                seeded += 1
+
+        # 2. Everything else must beat the seed on its upper bound
+        concept_chars = Counter(concept_norm)
+        la = len(concept_norm)
+        for term_id, occs in eligible.items():
+            if term_id in exact:
+                continue
+
+            max_weight = max(o[1] for o in occs)
+            if max_weight <= 0:
+                continue
+
+            term_norm = self.terms[term_id]
+            total = la + len(term_norm)
+            bonus = SUBSTRING_BONUS if (
+                concept_norm in term_norm or term_norm in concept_norm
+            ) else 0.0
+
+            if best is not None:
+                # real_quick_ratio bound
+                bound = (2.0 * min(la, len(term_norm)) / total if total else 1.0)
+                if (bound + bonus) * max_weight < best[1]:
+                    continue
+                # quick_ratio bound
+                matches = sum((concept_chars & self.term_chars[term_id]).values())
+                bound = 2.0 * matches / total if total else 1.0
+                if (bound + bonus) * max_weight < best[1]:
+                    continue
+
+            consider(term_id)
+
+        return best
@@ -0,0 +1,255 @@
+# compiler/concept_retrieval.py
+import bisect
+import math
+import re
+from collections import defaultdict
+from typing import List, Tuple
+from core.log import get_logger
+
+log = get_logger("retrieval")
+
+# -------------------------------
+# Prompt budget
+# -------------------------------
+DEFAULT_MAX_CONCEPTS = 60
+DEFAULT_TOKEN_BUDGET = 1500
+# Rough tokens-per-character of identifier-like text (no tokenizer needed)
+CHARS_PER_TOKEN = 4
+# Share of the budget the summary of unlisted fields may use
+SUMMARY_SHARE = 0.25
+# Broad queries ("overview") match little; top up with measures
+MIN_CONCEPTS = 20
+
+# Matching a query word against a table name counts for less than
+# matching the field itself
+TABLE_WEIGHT = 0.3
+PREFIX_WEIGHT = 0.5
+MIN_PREFIX = 3
+
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "by", "for", "per", "in", "on", "to", "vs",
+    "with", "over", "across", "me", "show", "give", "what", "which", "is",
+    "are", "top", "bottom", "all", "each", "overall", "overview", "analysis",
+    "dashboard", "report", "chart", "charts", "visual", "visuals", "breakdown",
+    "trend", "trends", "compare", "comparison", "list"
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase stemmed words; camelCase and snake_case are split."""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text)
+    return [_stem(w) for w in re.findall(r"[a-z0-9]+", text.lower())]
+
+
+def _term_text(term) -> str:
+    return term.get("term", "") if isinstance(term, dict) else term
+
+
+class ConceptRetriever:
+    """
+    Pre-LLM retrieval: ranks the linguistic entities against a user query
+    so the planner prompt only lists the relevant concepts.
+
+    Each column/measure entity is indexed by the words of its terms
+    (synonyms included) and column name; its table's words count with
+    TABLE_WEIGHT. Query words score their IDF on exact matches and
+    PREFIX_WEIGHT of it on prefix matches ("cust" -> "customer").
+
+    Built once per linguistic metadata set; select() is O(query words
+    x matching postings) and independent of the model size otherwise:
+    the broad-query top-up order and the per-table field lists behind
+    the summary are precomputed here.
+    """
+
+    def __init__(self, linguistic_metadata: dict, max_concepts: int = DEFAULT_MAX_CONCEPTS,
+                 token_budget: int = DEFAULT_TOKEN_BUDGET):
+        self.max_concepts = max_concepts
+        self.token_budget = token_budget
+
+        # Everything the planner could be shown, in metadata order
+        self.all_concepts = []
+        # Field entities only (tables are summarized, never ranked)
+        self.concepts = []
+        self.tables = []
+        self.measures = []
+        # table -> its field positions, in metadata order
+        self.table_fields = defaultdict(list)
+        # word -> {field position: weight}
+        self.postings = defaultdict(dict)
+
+        for entity in linguistic_metadata.get("entities", {}).values():
+            terms = [_term_text(t) for t in entity.get("terms", [])]
+            if not terms:
+                continue
+            self.all_concepts.append(terms[0])
+
+            binding = entity.get("binding", {})
+            if entity.get("kind") == "table" or "column" not in binding:
+                continue
+
+            # The column's own name: unambiguous and an exact resolver match
+            # (terms[0] may be a shared synonym like "amount")
+            position = len(self.concepts)
+            self.concepts.append(binding["column"].lower())
+            self.tables.append(binding.get("table"))
+            self.table_fields[binding.get("table")].append(position)
+            if binding.get("measure"):
+                self.measures.append(position)
+
+            for word in tokenize(binding.get("table", "")):
+                self.postings[word].setdefault(position, TABLE_WEIGHT)
+            for text in terms + [binding.get("column", "")]:
+                for word in tokenize(text):
+                    self.postings[word][position] = 1.0
+
+        # Broad-query top-up: measures, then the other fields, in model order
+        measures = set(self.measures)
+        self.fallback = self.measures + [p for p in range(len(self.concepts)) if p not in measures]
+
+        self.vocabulary = sorted(self.postings)
+        total = max(len(self.concepts), 1)
+        self.idf = {
+            word: math.log(1.0 + total / len(fields)) for word, fields in self.postings.items()
+        }
+
+    # ------------------------------------------------------------------
+    # Ranking
+    # ------------------------------------------------------------------
+    def rank(self, query: str) -> List[Tuple[int, float]]:
+        """[(field position, score)] for fields sharing a word with the query, best first."""
+        scores = defaultdict(float)
+        for word in dict.fromkeys(tokenize(query)):
+            if word in STOPWORDS:
+                continue
+            for match, factor in self._expand(word):
+                idf = self.idf[match] * factor
+                for position, weight in self.postings[match].items():
+                    scores[position] += idf * weight
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def _expand(self, word: str):
+        """The word itself plus vocabulary words it is a prefix of."""
+        if word in self.postings:
+            yield word, 1.0
+        if len(word) < MIN_PREFIX:
+            return
+        i = bisect.bisect_right(self.vocabulary, word)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(word):
+            yield self.vocabulary[i], PREFIX_WEIGHT
+            i += 1
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+    def select(self, query: str) -> Tuple[List[str], str]:
+        """
+        (concepts, summary) for the planner prompt: at most max_concepts
+        concepts and roughly token_budget tokens in total. Small models
+        are passed through unchanged (summary "").
+        """
+        if (
+            len(self.all_concepts) <= self.max_concepts
+            and self._tokens(self.all_concepts) <= self.token_budget
+        ):
+            return list(self.all_concepts), ""
+
+        ranked = [position for position, _ in self.rank(query)]
+        picked = set(ranked)
+        # Broad queries: top up with measures, then anything, in model order
+        if len(ranked) < MIN_CONCEPTS:
+            for position in self.fallback:
+                if len(ranked) >= MIN_CONCEPTS:
+                    break
+                if position not in picked:
+                    ranked.append(position)
+                    picked.add(position)
+
+        concept_budget = int(self.token_budget * (1 - SUMMARY_SHARE))
+        chosen, seen, used = [], set(), 0
+        for position in ranked:
+            concept = self.concepts[position]
+            if concept in seen:
+                continue
+            cost = self._tokens([concept])
+            if len(chosen) >= self.max_concepts or used + cost > concept_budget:
+                break
+            chosen.append(position)
+            seen.add(concept)
+            used += cost
+
+        summary = self._summary(set(chosen), ranked, self.token_budget - used)
+        log.debug(
+            "Selected %d/%d concepts (~%d tokens) for '%s'",
+            len(chosen), len(self.concepts), used + estimate_tokens(summary), query
+        )
+        return [self.concepts[p] for p in chosen], summary
+
+    def _summary(self, chosen: set, ranked: List[int], budget: int) -> str:
+        """'Also available (N more fields): Table (count: examples), ...' within `budget` tokens."""
+        total = len(self.concepts) - len(chosen)
+        if not total:
+            return ""
+
+        # Best-ranked leftovers first, so examples are the relevant ones
+        ranked_left = defaultdict(list)
+        for position in ranked:
+            if position not in chosen:
+                ranked_left[self.tables[position]].append(position)
+        chosen_in = defaultdict(int)
+        for position in chosen:
+            chosen_in[self.tables[position]] += 1
+        tables_left = len(self.table_fields) - sum(
+            1 for table, n in chosen_in.items() if n == len(self.table_fields[table])
+        )
+
+        summary = f"Also available ({total} more fields, by table):"
+        # Tables in order of their best-ranked leftover field, then model order
+        k = 0
+        for table in _chain_unique(ranked_left, self.table_fields):
+            left = len(self.table_fields[table]) - chosen_in[table]
+            if not left:
+                continue
+            examples = self._examples(table, ranked_left.get(table, []), chosen)
+            part = f" {table} ({left}: {', '.join(examples)}{', ...' if left > 3 else ''});"
+            if estimate_tokens(summary + part) > budget:
+                summary += f" ... {tables_left - k} more tables."
+                break
+            summary += part
+            k += 1
+        return summary
+
+    def _examples(self, table: str, ranked_left: List[int], chosen: set) -> List[str]:
+        """Up to three unchosen fields of `table`: best-ranked first, then model order."""
+        picked = ranked_left[:3]
+        for position in self.table_fields[table]:
+            if len(picked) >= 3:
+                break
+            if position not in chosen and position not in picked:
+                picked.append(position)
+        return [self.concepts[p] for p in picked]
+
+    @staticmethod
+    def _tokens(concepts: List[str]) -> int:
+        # Rendered as a Python list literal in the prompt: "'name', "
+        return sum(estimate_tokens(f"'{c}', ") for c in concepts)
+
+
+def _chain_unique(first, rest):
+    seen = set()
+    for items in (first, rest):
+        for item in items:
+            if item not in seen:
+                seen.add(item)
+                yield item
@@ -0,0 +1,322 @@
+# compiler/embedding_index.py
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, List
+from core.log import get_logger
+
+log = get_logger("embeddings")
+
+DEFAULT_TOP_K = 5
+# Cosine similarity needed before an embedding hit is trusted
+EMBEDDING_THRESHOLD = 0.6
+
+
+def embeddings_path_for(linguistic_path: str) -> str:
+    """semantic/linguistic_metadata.json -> semantic/linguistic_metadata.embeddings.npy"""
+    return f"{os.path.splitext(linguistic_path)[0]}.embeddings.npy"
+
+
+def load_local_encoder(model_path: str) -> Callable[[List[str]], object]:
+    """
+    CPU sentence encoder loaded from a local directory (no network).
+    Requires `sentence-transformers`; imported only here.
+    """
+    if not model_path or not os.path.isdir(model_path):
+        raise FileNotFoundError(f"Embedding model not found: {model_path}")
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError(
+            "The embedding resolver requires sentence-transformers (pip install sentence-transformers)"
+        ) from e
+
+    model = SentenceTransformer(model_path, device="cpu", local_files_only=True)
+    log.info("Loaded embedding model from %s", model_path)
+
+    def encode(texts: List[str]):
+        return model.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+
+    return encode
+
+
+class EmbeddingIndex:
+    """
+    Cosine-similarity lookup over every entity term.
+
+    Term vectors are computed once and stored next to the linguistic
+    metadata as a .npy file (plus a small .json manifest); later runs
+    memory-map it instead of re-encoding. Nothing - numpy, the model or
+    the vectors - is loaded until the first search().
+
+    `encoder` maps a list of strings to an (n, dim) array; by default the
+    local model at `model_path` is used.
+    """
+
+    def __init__(self, linguistic_metadata: dict, model_path: str = None,
+                 vectors_path: str = None, encoder: Callable = None, top_k: int = DEFAULT_TOP_K):
+        self.model_path = model_path
+        self.vectors_path = vectors_path
+        self.top_k = top_k
+        self._encoder = encoder
+        self._lock = threading.Lock()
+        # (terms, occurrences, vectors or None): always replaced as a whole,
+        # so a search never pairs rows with vectors of another generation
+        self._state = _build_rows(linguistic_metadata) + (None,)
+        # {term text: row}, {entity_id: rows} for update(); built on first use
+        self._rows = None
+        self._entity_rows = None
+
+    @property
+    def terms(self) -> List[str]:
+        return self._state[0]
+
+    @property
+    def occurrences(self) -> list:
+        return self._state[1]
+
+    # ------------------------------------------------------------------
+    # Lazy loading
+    # ------------------------------------------------------------------
+    def _fingerprint(self, terms: List[str]) -> str:
+        digest = hashlib.sha1(str(self.model_path).encode("utf-8"))
+        for term in terms:
+            digest.update(b"\0" + term.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _encode(self, texts: List[str]):
+        import numpy as np
+
+        if self._encoder is None:
+            self._encoder = load_local_encoder(self.model_path)
+        vectors = np.asarray(self._encoder(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def vectors(self):
+        """(terms x dim) unit vectors, memory-mapped when persisted."""
+        return self._loaded()[2]
+
+    def _loaded(self) -> tuple:
+        state = self._state
+        if state[2] is None:
+            with self._lock:
+                state = self._state
+                if state[2] is None:
+                    terms, occurrences, _ = state
+                    state = self._state = (terms, occurrences, self._load_or_build(terms))
+        return state
+
+    def _load_or_build(self, terms: List[str]):
+        import numpy as np
+
+        fingerprint = self._fingerprint(terms)
+        manifest_path = f"{os.path.splitext(self.vectors_path)[0]}.json" if self.vectors_path else None
+
+        stored_terms, stored = [], None
+        if manifest_path and os.path.exists(self.vectors_path) and os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                if manifest.get("fingerprint") == fingerprint:
+                    log.debug("Memory-mapping %d term vectors from %s", len(terms), self.vectors_path)
+                    return np.load(self.vectors_path, mmap_mode="r")
+                if manifest.get("model") == self.model_path and manifest.get("texts"):
+                    # Another term list (patched model): reuse the rows it shares
+                    stored_terms, stored = manifest["texts"], np.load(self.vectors_path, mmap_mode="r")
+            except (OSError, ValueError) as e:
+                log.warning("Ignoring unreadable embeddings %s: %s", self.vectors_path, e)
+
+        vectors, encoded = self._restack(terms, stored_terms, stored)
+        del stored
+        log.info("Encoded %d of %d entity terms", encoded, len(terms))
+        return self._persist(vectors, fingerprint, terms)
+
+    def _restack(self, terms: List[str], old_terms: List[str], old_vectors) -> tuple:
+        """(vectors for `terms`, number encoded): rows of `old_terms` are reused."""
+        import numpy as np
+
+        old_rows = {t: i for i, t in enumerate(old_terms)}
+        missing = [t for t in terms if t not in old_rows]
+        encoded = dict(zip(missing, self._encode(missing))) if missing else {}
+        vectors = np.stack([
+            encoded[t] if t in encoded else old_vectors[old_rows[t]] for t in terms
+        ]).astype(np.float32) if terms else np.zeros((0, 1), dtype=np.float32)
+        return vectors, len(missing)
+
+    def refresh(self, linguistic_metadata: dict):
+        """
+        Re-reads the entity terms after the metadata changed. Vectors of
+        terms that are still present are reused; only new terms are
+        encoded (if vectors were loaded at all). Searches keep using the
+        previous terms and vectors until the new set is complete.
+        """
+        with self._lock:
+            old_terms, _, old_vectors = self._state
+            terms, occurrences = _build_rows(linguistic_metadata)
+            self._rows = self._entity_rows = None
+            if old_vectors is None:
+                self._state = (terms, occurrences, None)
+                return
+
+            vectors, encoded = self._restack(terms, old_terms, old_vectors)
+            log.info("Embeddings refreshed (%d new terms encoded)", encoded)
+            old_vectors = None
+            self._publish(terms, occurrences, vectors)
+
+    def update(self, removed=(), added: dict = None):
+        """
+        Applies an entity patch: drops `removed` entity ids and indexes
+        `added` ({entity_id: entity}; re-added ids are replaced). Only the
+        rows of those entities are rebuilt and only new term texts are
+        encoded; rows left without entities simply never match. Searches
+        keep the previous generation until the patch is published.
+        """
+        import numpy as np
+
+        added = added or {}
+        with self._lock:
+            terms, occurrences, vectors = self._state
+            if self._rows is None:
+                self._index_rows(terms, occurrences)
+            try:
+                # Copies of the row lists (not of the rows) for the new generation
+                terms, occurrences = list(terms), list(occurrences)
+                fresh = set()
+                for entity_id in list(removed) + list(added):
+                    for row in self._entity_rows.pop(entity_id, ()):
+                        occurrences[row] = [o for o in occurrences[row] if o[1] != entity_id]
+                        fresh.add(row)
+
+                new_terms = []
+                for entity_id, entity in added.items():
+                    binding = entity.get("binding", {})
+                    rows = self._entity_rows[entity_id] = set()
+                    for text, weight in _entity_terms(entity):
+                        row = self._rows.get(text)
+                        if row is None:
+                            row = self._rows[text] = len(terms)
+                            terms.append(text)
+                            occurrences.append([])
+                            new_terms.append(text)
+                        elif row not in fresh:
+                            occurrences[row] = list(occurrences[row])
+                        fresh.add(row)
+                        occurrences[row].append((weight, entity_id, binding))
+                        rows.add(row)
+
+                if vectors is None:
+                    self._state = (terms, occurrences, None)
+                    return
+                if new_terms:
+                    vectors = np.concatenate([np.asarray(vectors), self._encode(new_terms)]).astype(np.float32)
+            except Exception:
+                # Rebuilt from the published generation next time
+                self._rows = self._entity_rows = None
+                raise
+
+            # Kept in memory only: the persisted file stays valid for its own
+            # manifest and the next cold start reuses its rows by text
+            log.info("Embeddings patched (%d new terms encoded)", len(new_terms))
+            self._state = (terms, occurrences, vectors)
+
+    def _index_rows(self, terms: List[str], occurrences: list):
+        self._rows = {t: i for i, t in enumerate(terms)}
+        self._entity_rows = {}
+        for row, occs in enumerate(occurrences):
+            for _, entity_id, _ in occs:
+                self._entity_rows.setdefault(entity_id, set()).add(row)
+
+    def _publish(self, terms: List[str], occurrences: list, vectors):
+        # In memory first: the old memory map is released before its file
+        # is replaced, then the new file is mapped
+        self._state = (terms, occurrences, vectors)
+        self._state = (terms, occurrences, self._persist(vectors, self._fingerprint(terms), terms))
+
+    def _persist(self, vectors, fingerprint: str, terms: List[str]):
+        import numpy as np
+
+        manifest_path = f"{os.path.splitext(self.vectors_path)[0]}.json" if self.vectors_path else None
+        if self.vectors_path:
+            os.makedirs(os.path.dirname(self.vectors_path) or ".", exist_ok=True)
+            tmp_path = f"{self.vectors_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, vectors)
+            os.replace(tmp_path, self.vectors_path)
+            with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+                json.dump({
+                    "fingerprint": fingerprint, "model": self.model_path,
+                    "terms": len(terms), "texts": terms
+                }, f)
+            os.replace(f"{manifest_path}.tmp", manifest_path)
+            return np.load(self.vectors_path, mmap_mode="r")
+        return vectors
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def search(self, concept: str, k: int = None, accept=None) -> list:
+        """
+        Top-k [(score, entity_id, binding)] by cosine similarity (times the
+        term weight), best first. `accept(binding)` applies hard constraints.
+        """
+        import numpy as np
+
+        k = k or self.top_k
+        terms, occurrences, vectors = self._loaded()
+        if not len(terms):
+            return []
+
+        query = self._encode([concept.replace("_", " ").strip().lower()])[0]
+        sims = np.asarray(vectors @ query)
+
+        # Partial sort of an over-fetched window; constraints may reject
+        # rows, in which case the full ranking is used
+        fetch = min(len(sims), k * 4)
+        while True:
+            rows = np.argpartition(-sims, fetch - 1)[:fetch] if fetch < len(sims) else np.arange(len(sims))
+            rows = rows[np.argsort(-sims[rows], kind="stable")]
+            hits = _collect(occurrences, rows, sims, accept)
+            if len(hits) >= k or fetch == len(sims):
+                break
+            fetch = len(sims)
+
+        hits.sort(key=lambda h: -h[0])
+        return hits[:k]
+
+
+def _build_rows(linguistic_metadata: dict) -> tuple:
+    """(distinct term texts, per-row [(weight, entity_id, binding)])"""
+    terms, occurrences, rows = [], [], {}
+    for entity_id, entity in linguistic_metadata.get("entities", {}).items():
+        binding = entity.get("binding", {})
+        for text, weight in _entity_terms(entity):
+            row = rows.get(text)
+            if row is None:
+                row = rows[text] = len(terms)
+                terms.append(text)
+                occurrences.append([])
+            occurrences[row].append((weight, entity_id, binding))
+    return terms, occurrences
+
+
+def _entity_terms(entity: dict):
+    """(normalized text, weight) per term of one entity."""
+    for term in entity.get("terms", []):
+        text = term.get("term") if isinstance(term, dict) else term
+        weight = term.get("weight", 1.0) if isinstance(term, dict) else 1.0
+        if text:
+            yield text.replace("_", " ").strip().lower(), weight
+
+
+def _collect(occurrences: list, rows, sims, accept) -> list:
+    hits = []
+    seen = set()
+    for row in rows:
+        for weight, entity_id, binding in occurrences[row]:
+            if entity_id in seen or (accept is not None and not accept(binding)):
+                continue
+            seen.add(entity_id)
+            hits.append((float(sims[row]) * weight, entity_id, binding))
+    return hits
@@ -1,6 +1,11 @@
 # compiler/resolver.py
-import re
-from difflib import SequenceMatcher
+import threading
+from typing import Dict, List
+from compiler.concept_index import ConceptIndex, normalize_term
+from compiler.embedding_index import EMBEDDING_THRESHOLD
+from core.log import get_logger
+
+log = get_logger("resolver")
 
 
 class SemanticResolutionError(Exception):
@@ -17,101 +22,219 @@ NUMERIC_TYPES = {
     "number"
 }
 
+# Lowest string-match score a concept is accepted with; only concepts
+# below it are offered to the embedding fallback
+MIN_MATCH_SCORE = 0.45
+
 NUMERIC_CONCEPTS = {
     "amount", "revenue", "sales", "value", "total", "cost", "price"
 }
 
 
-def resolve_concept(concept: str, linguistic_metadata: dict) -> dict:
-    """
-    Resolves a semantic concept (e.g. 'amount', 'product')
-    into a concrete schema binding using linguistic metadata.
-
-    Enforces HARD semantic constraints:
-    - Numeric concepts must map to numeric MEASURES
-    """
-
-    if not concept:
-        raise SemanticResolutionError("Empty concept provided")
+def _numeric_measure(binding: dict) -> bool:
+    # Explicit DAX measures are numeric by construction
+    return binding.get("measure", False) and (
+        binding.get("explicit", False)
+        or binding.get("dataType") in NUMERIC_TYPES
+    )
 
-    # ----------------------------------
-    # Normalize concept
-    # ----------------------------------
-    concept_norm = re.sub(r"[^a-z0-9]", "", concept.lower())
-    if "." in concept_norm:
-        concept_norm = concept_norm.split(".")[-1]
 
-    print(f"\n[RESOLVER] Resolving concept: '{concept_norm}'")
+def _patch_eligible(eligible: dict, dropped: list, indexed: list, accept=None):
+    """Applies an index delta to a ConceptIndex.eligible() map in place."""
+    for term_id, occurrence in dropped:
+        occs = eligible.get(term_id)
+        if occs and occurrence in occs:
+            occs.remove(occurrence)
+            if not occs:
+                del eligible[term_id]
+    for term_id, occurrence in indexed:
+        if accept is None or accept(occurrence[3]):
+            eligible.setdefault(term_id, []).append(occurrence)
 
-    best_match = None
-    best_score = 0.0
 
-    entities = linguistic_metadata.get("entities", {})
+class ConceptResolver:
+    """
+    Resolves concepts against one linguistic metadata set.
 
-    for entity_id, entity in entities.items():
-        binding = entity.get("binding", {})
-        terms = entity.get("terms", [])
+    Normalized terms and the candidate index are built once; results are
+    memoized per normalized concept, so a concept like 'amount' used by
+    several visuals is scored only once per dashboard (or batch).
 
-        for term in terms:
-            term_text = term.get("term") if isinstance(term, dict) else term
-            weight = term.get("weight", 1.0) if isinstance(term, dict) else 1.0
+    backend="exact"   SequenceMatcher scoring (reference behaviour)
+    backend="vector"  NumPy n-gram scoring over every term at once
+                      (approximate; see compiler/vector_scorer.py)
 
-            if not term_text:
-                continue
+    `embeddings` (an EmbeddingIndex) is consulted for concepts the string
+    scorer can only place fuzzily, e.g. synonyms outside _expand_terms.
 
-            term_norm = re.sub(r"[^a-z0-9]", "", term_text.lower())
+    `lock` guards the index and the memoized state; an IncrementalModel
+    (discovery/watcher.py) swaps in its own so patches and lookups never
+    interleave.
+    """
 
-            # ----------------------------------
-            # Linguistic similarity
-            # ----------------------------------
-            score = SequenceMatcher(None, concept_norm, term_norm).ratio()
+    BACKENDS = ("exact", "vector")
+
+    def __init__(self, linguistic_metadata: dict, index: ConceptIndex = None, backend: str = "exact",
+                 embeddings=None):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown resolver backend '{backend}' (expected one of {self.BACKENDS})")
+
+        self.linguistic = linguistic_metadata
+        self.index = index or ConceptIndex(linguistic_metadata)
+        self.backend = backend
+        self.embeddings = embeddings
+        self._memo = {}
+        self._eligible = {}
+        self._vector = None
+        self.lock = threading.RLock()
+
+    def resolve(self, concept: str) -> dict:
+        """
+        Resolves a semantic concept (e.g. 'amount', 'product')
+        into a concrete schema binding.
+        Raises SemanticResolutionError when nothing scores high enough.
+        """
+        result = self.resolve_concepts([concept])[concept]
+        if isinstance(result, SemanticResolutionError):
+            # Fresh instance: memoized errors may be raised many times
+            raise SemanticResolutionError(str(result))
+        return result
+
+    def resolve_concepts(self, concepts: List[str]) -> Dict[str, object]:
+        """
+        Batch API: deduplicates `concepts`, normalizes each once and scores
+        every distinct one in a single pass over the shared index.
+        Returns {concept: binding dict | SemanticResolutionError}.
+        """
+        results = {}
+        with self.lock:
+            for concept in dict.fromkeys(concepts):
+                if not concept:
+                    results[concept] = SemanticResolutionError("Empty concept provided")
+                    continue
 
-            if concept_norm in term_norm or term_norm in concept_norm:
-                score += 0.25
+                concept_norm = _normalize_concept(concept)
+                if concept_norm not in self._memo:
+                    self._memo[concept_norm] = self._score(concept_norm, concept)
+                results[concept] = self._memo[concept_norm]
+
+        return results
+
+    def _score(self, concept_norm: str, concept: str = None):
+        log.debug("Resolving concept: '%s'", concept_norm)
+
+        # ----------------------------------
+        # HARD semantic constraints
+        # (eligibility is computed once per constraint class)
+        # ----------------------------------
+        numeric = concept_norm in NUMERIC_CONCEPTS
+
+        # ----------------------------------
+        # Best match tracking
+        # ----------------------------------
+        best_match = None
+        best_score = 0.0
+
+        if self.backend == "vector":
+            # Constraint is a boolean mask inside the scorer
+            hit = self._vector_scorer().best_match(concept_norm, numeric)
+        else:
+            if numeric not in self._eligible:
+                self._eligible[numeric] = self.index.eligible(_numeric_measure if numeric else None)
+            hit = self.index.best_match(concept_norm, eligible=self._eligible[numeric])
+        if hit:
+            _, best_score, _, binding = hit
+            best_match = {
+                "entity": binding.get("table"),
+                "column": binding.get("column"),
+                "measure": binding.get("measure", False),
+                "explicit": binding.get("explicit", False),
+                "dataType": binding.get("dataType"),
+                "score": round(best_score, 3)
+            }
+
+        # ----------------------------------
+        # Semantic fallback (embeddings)
+        # ----------------------------------
+        # Only concepts the string match would reject defer to the model:
+        # the two scores are on different scales, so an accepted fuzzy
+        # match is never overridden
+        if self.embeddings is not None and best_score < MIN_MATCH_SCORE:
+            embedded = self._embedding_match(concept or concept_norm, numeric)
+            if embedded:
+                log.debug("Accept '%s' → %s (embedding)", concept_norm, embedded)
+                return embedded
+
+        # ----------------------------------
+        # Final validation
+        # ----------------------------------
+        if not best_match or best_score < MIN_MATCH_SCORE:
+            return SemanticResolutionError(
+                f"Unresolvable or invalid concept: '{concept_norm}' (score={best_score})"
+            )
 
-            final_score = score * weight
+        log.debug("Accept '%s' → %s", concept_norm, best_match)
+        return best_match
+
+    def update_entities(self, removed=(), added: dict = None):
+        """
+        Applies a metadata patch: drops `removed` entity ids, indexes
+        `added` ({entity_id: entity}) and forgets memoized results.
+        `self.linguistic` is expected to be patched by the caller. Ties
+        follow `index.table_rank`, as in a fresh index. Cost is
+        proportional to the entities touched (the vector backend's
+        arrays are rebuilt on its next lookup).
+        """
+        added = added or {}
+        with self.lock:
+            # Re-added entities are replaced: their old occurrences go too
+            dropped = self.index.remove_entities(list(removed) + list(added))
+            indexed = self.index.add_entities(added)
+            for numeric, eligible in self._eligible.items():
+                _patch_eligible(eligible, dropped, indexed, _numeric_measure if numeric else None)
+            self._memo.clear()
+            self._vector = None
+            if self.embeddings is not None:
+                self.embeddings.update(removed, added)
+
+    def _embedding_match(self, concept: str, numeric: bool):
+        hits = self.embeddings.search(concept, k=1, accept=_numeric_measure if numeric else None)
+        if not hits or hits[0][0] < EMBEDDING_THRESHOLD:
+            return None
+        score, _, binding = hits[0]
+        return {
+            "entity": binding.get("table"),
+            "column": binding.get("column"),
+            "measure": binding.get("measure", False),
+            "explicit": binding.get("explicit", False),
+            "dataType": binding.get("dataType"),
+            "score": round(score, 3)
+        }
+
+    def _vector_scorer(self):
+        # Built on first use: numpy is only imported for the vector backend
+        if self._vector is None:
+            from compiler.vector_scorer import VectorScorer
+            self._vector = VectorScorer(self.index, _numeric_measure)
+        return self._vector
+
+
+def _normalize_concept(concept: str) -> str:
+    concept_norm = normalize_term(concept)
+    if "." in concept_norm:
+        concept_norm = concept_norm.split(".")[-1]
+    return concept_norm
 
-            is_measure = binding.get("measure", False)
-            data_type = binding.get("dataType")
 
-            print(
-                f"[RESOLVER TRY] concept='{concept_norm}' "
-                f"→ column='{binding.get('column')}' "
-                f"(measure={is_measure}, dataType={data_type}) "
-                f"score={round(final_score, 3)}"
-            )
+def resolve_concept(concept: str, linguistic_metadata: dict, index: ConceptIndex = None) -> dict:
+    """
+    Resolves a semantic concept (e.g. 'amount', 'product')
+    into a concrete schema binding using linguistic metadata.
 
-            # ----------------------------------
-            # HARD semantic constraints
-            # ----------------------------------
-            if concept_norm in NUMERIC_CONCEPTS:
-                if not is_measure:
-                    print("  └─ REJECTED: numeric concept mapped to dimension")
-                    continue
-                if data_type not in NUMERIC_TYPES:
-                    print("  └─ REJECTED: non-numeric datatype")
-                    continue
+    Enforces HARD semantic constraints:
+    - Numeric concepts must map to numeric MEASURES
 
-            # ----------------------------------
-            # Best match tracking
-            # ----------------------------------
-            if final_score > best_score:
-                best_score = final_score
-                best_match = {
-                    "entity": binding.get("table"),
-                    "column": binding.get("column"),
-                    "measure": is_measure,
-                    "dataType": data_type,
-                    "score": round(final_score, 3)
-                }
-
-    # ----------------------------------
-    # Final validation
-    # ----------------------------------
-    if not best_match or best_score < 0.45:
-        raise SemanticResolutionError(
-            f"Unresolvable or invalid concept: '{concept_norm}' (score={best_score})"
-        )
-
-    print(f"[RESOLVER ACCEPT] '{concept_norm}' → {best_match}")
-    return best_match
\ No newline at end of file
+    One-off convenience wrapper; use ConceptResolver to resolve many
+    concepts against the same metadata.
+    """
+    return ConceptResolver(linguistic_metadata, index).resolve(concept)
@@ -0,0 +1,88 @@
+# compiler/term_automaton.py
+from collections import deque
+from typing import Iterator, List, Tuple
+
+
+class TermAutomaton:
+    """
+    Aho-Corasick automaton over many phrases: one pass over the text
+    finds every occurrence of every phrase, whatever their number.
+
+    add(phrase, payload) for all phrases, then build() once; payloads of
+    phrases added more than once are all reported. Matching is on the
+    exact characters given (normalize phrases and text the same way).
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        # state -> [(phrase length, payload)], fail outputs merged in by build()
+        self._out = [[]]
+        self._built = False
+
+    def add(self, phrase: str, payload):
+        if not phrase:
+            return
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(phrase), payload))
+        self._built = False
+
+    def build(self):
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, object]]:
+        """(start, end, payload) of every phrase occurrence, by end position."""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, payload in out[state]:
+                yield i + 1 - length, i + 1, payload
+
+    def find_words(self, text: str) -> List[Tuple[int, int, object]]:
+        """
+        Non-overlapping whole-word matches, leftmost-longest first
+        (ties keep the payload added first).
+        """
+        matches = [
+            (start, end, payload) for start, end, payload in self.iter_matches(text)
+            if (start == 0 or not text[start - 1].isalnum())
+            and (end == len(text) or not text[end].isalnum())
+        ]
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        selected, covered = [], 0
+        for start, end, payload in matches:
+            if start >= covered:
+                selected.append((start, end, payload))
+                covered = end
+        return selected
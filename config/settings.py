@@ -1,16 +1,22 @@
 # config/settings.py
 from dotenv import load_dotenv
 import os
+# Visual type -> template file; lives import-free in config/templates.py
+from config.templates import TEMPLATE_MAP
 load_dotenv()
 
 PROJECT_ROOT = os.getenv("PROJECT_ROOT")
 
-REPORT_PATH = os.path.join(
+REPORT_PAGES_PATH = os.path.join(
     PROJECT_ROOT,
     "PowerBI",
     "PowerBI-GenAI-Dashboard.Report",
     "definition",
-    "pages",
+    "pages"
+)
+
+REPORT_PATH = os.path.join(
+    REPORT_PAGES_PATH,
     "page-1",
     "visuals"
 )
@@ -29,6 +35,41 @@ LINGUISTIC_METADATA_PATH = os.path.join(
     "linguistic_metadata.json"
 )
 
+SEMANTIC_CACHE_PATH = os.path.join(
+    PROJECT_ROOT,
+    "semantic",
+    "model_cache.json"
+)
+
+LLM_CACHE_PATH = os.path.join(
+    PROJECT_ROOT,
+    "semantic",
+    "llm_cache.sqlite"
+)
+LLM_CACHE_TTL = 7 * 24 * 3600  # seconds
+LLM_CACHE_MAX_ENTRIES = 1000
+
+# Slotted, interned semantic model behind dict views (large models)
+COMPACT_SEMANTIC_MODEL = os.getenv("GENAI_COMPACT_MODEL", "").lower() in {"1", "true", "yes"}
+
+# "exact" (SequenceMatcher) or "vector" (NumPy, needs numpy installed)
+RESOLVER_BACKEND = os.getenv("GENAI_RESOLVER_BACKEND", "exact")
+
+# Local sentence-transformers model directory; unset = embedding resolver off
+EMBEDDING_MODEL_PATH = os.getenv("GENAI_EMBEDDING_MODEL")
+
+# Planner prompt: most relevant concepts sent to the LLM, and a rough
+# token budget for them plus the summary of the rest
+PLANNER_MAX_CONCEPTS = int(os.getenv("GENAI_PLANNER_MAX_CONCEPTS", "60"))
+PLANNER_CONCEPT_TOKENS = int(os.getenv("GENAI_PLANNER_CONCEPT_TOKENS", "1500"))
+
+# Stream the planner completion and bind each chart as soon as it is complete
+# (a failed or truncated stream falls back to the JSON-mode completion)
+PLANNER_STREAMING = os.getenv("GENAI_PLANNER_STREAM", "1").lower() in {"1", "true", "yes"}
+
+# Answer formulaic queries ("amount by country") with rules, no LLM call
+RULE_FAST_PATH = os.getenv("GENAI_RULE_FAST_PATH", "1").lower() in {"1", "true", "yes"}
+
 VISUAL_WIDTH = 450
 VISUAL_HEIGHT = 300
 VISUAL_PADDING = 40
@@ -36,14 +77,5 @@ VISUAL_PADDING = 40
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.dirname(BASE_DIR)  # project root
 
-
-TEMPLATE_MAP = {
-    "bar": os.path.join(BASE_DIR, "template", "column-template.json"),
-    "column": os.path.join(BASE_DIR, "template", "column-template.json"),
-    "line": os.path.join(BASE_DIR, "template", "line-template.json"),
-    "pie": os.path.join(BASE_DIR, "template", "pie-template.json"),
-    "table": os.path.join(BASE_DIR, "template", "table-template.json")
-}
-
 PLANNER_MODEL = "llama-3.3-70b-versatile"
 DASHBOARD_MODEL = "llama-3.3-70b-versatile"
\ No newline at end of file
@@ -0,0 +1,16 @@
+# config/templates.py
+import os
+
+# Import-free on purpose: the writer (backend/visual_templates.py) needs
+# the template paths without PROJECT_ROOT or the rest of config.settings
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "template")
+
+TEMPLATE_MAP = {
+    "bar": os.path.join(TEMPLATE_DIR, "column-template.json"),
+    "column": os.path.join(TEMPLATE_DIR, "column-template.json"),
+    "line": os.path.join(TEMPLATE_DIR, "line-template.json"),
+    "pie": os.path.join(TEMPLATE_DIR, "pie-template.json"),
+    "table": os.path.join(TEMPLATE_DIR, "table-template.json"),
+    "card": os.path.join(TEMPLATE_DIR, "card-template.json"),
+    "textbox": os.path.join(TEMPLATE_DIR, "textbox-template.json")
+}
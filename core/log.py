@@ -0,0 +1,92 @@
+# core/log.py
+import json
+import logging
+import os
+
+# Finer than DEBUG: per-candidate resolver trials and similar firehoses
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+ROOT = "genai"
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Logger for one subsystem, e.g. get_logger("resolver") -> genai.resolver"""
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra={"data": {...}}` is kept structured."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        data = getattr(record, "data", None)
+        if data is not None:
+            entry["data"] = data
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+LEVELS = ("TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+
+def _parse_level(value) -> int:
+    if isinstance(value, int):
+        return value
+    name = str(value).strip().upper()
+    if name.isdigit():
+        return int(name)
+    if name == "TRACE":
+        return TRACE
+    level = logging.getLevelName(name)
+    if not isinstance(level, int):
+        # getLevelName answers "Level X" for unknown names; setLevel would fail later
+        raise ValueError(f"Unknown log level {value!r}; expected one of {', '.join(LEVELS)}")
+    return level
+
+
+def configure_logging(level=None, levels: dict = None, json_path: str = None):
+    """
+    Sets up the `genai` logger tree.
+
+    level      default level ("INFO", "DEBUG", "TRACE", ...) - env GENAI_LOG_LEVEL
+    levels     per-subsystem overrides, e.g. {"resolver": "TRACE"} -
+               env GENAI_LOG_LEVELS="resolver=TRACE,binder=DEBUG"
+    json_path  also write structured JSON lines to this file
+    """
+    level = level or os.getenv("GENAI_LOG_LEVEL", "INFO")
+    if levels is None:
+        levels = {}
+        for item in os.getenv("GENAI_LOG_LEVELS", "").split(","):
+            if "=" in item:
+                name, value = item.split("=", 1)
+                levels[name.strip()] = value.strip()
+
+    root = logging.getLogger(ROOT)
+    root.setLevel(_parse_level(level))
+    root.propagate = False
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(levelname)-7s %(name)s: %(message)s"))
+    root.addHandler(console)
+
+    if json_path:
+        if os.path.dirname(json_path):
+            os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        sink = logging.FileHandler(json_path, encoding="utf-8")
+        sink.setFormatter(JsonFormatter())
+        root.addHandler(sink)
+
+    for name, value in levels.items():
+        get_logger(name).setLevel(_parse_level(value))
+
+    return root
@@ -22,6 +22,8 @@ class PhysicalBinding(BaseModel):
     kind: Literal["dimension", "measure"]
     data_type: Optional[str] = None
     aggregation: Optional[str] = None
+    # True for DAX measures defined in the model (no aggregation wrapper)
+    explicit_measure: bool = False
 
 class BoundVisual(BaseModel):
     """Final Materialization Spec: Fully resolved and validated."""
@@ -0,0 +1,234 @@
+# core/tracing.py
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterable, List, Optional
+from core.log import get_logger
+
+log = get_logger("tracing")
+
+
+class Span:
+    __slots__ = ("name", "start", "duration", "attributes", "thread_id", "parent")
+
+    def __init__(self, name: str, attributes: dict, parent: Optional[str]):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.duration = 0.0
+
+    def to_dict(self, origin: float) -> dict:
+        return {
+            "name": self.name,
+            "parent": self.parent,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "thread": self.thread_id,
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    """
+    Collects timed spans for pipeline stages (and per-visual work).
+
+    Stages listed in `profile` additionally run under cProfile (top
+    functions stored on the span) and, with `trace_memory`, record their
+    tracemalloc peak; with nothing profiled, `trace_memory` measures the
+    outermost spans instead. Export with to_json() or to_chrome_trace()
+    (load the latter in chrome://tracing or Perfetto).
+
+    tracemalloc has one process-wide peak, so only one span measures it at
+    a time (the first to start wins, like cProfile) and its peak includes
+    whatever other threads allocated meanwhile. Peaks are exact only for
+    stages that run alone. Spans in worker threads have no parent unless
+    the work is wrapped with carry_span().
+    """
+
+    def __init__(self, profile: Iterable[str] = (), trace_memory: bool = False, profile_top: int = 15):
+        self.profile = set(profile)
+        self.trace_memory = trace_memory
+        self.profile_top = profile_top
+        self.spans: List[Span] = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiling = False
+        self._measuring = False
+
+    def current(self) -> Optional[str]:
+        """Name of the innermost open span on this thread (or the one carried into it)."""
+        stack = getattr(self._local, "stack", None)
+        return stack[-1].name if stack else getattr(self._local, "carried", None)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        span = Span(name, attributes, self.current())
+        stack.append(span)
+
+        profiler = None
+        measure_memory = False
+        profiled = name in self.profile
+        if profiled:
+            with self._lock:
+                # cProfile cannot nest; the first profiled stage wins
+                if not self._profiling:
+                    self._profiling = True
+                    profiler = cProfile.Profile()
+        if self.trace_memory and (profiled or (not self.profile and span.parent is None)):
+            with self._lock:
+                # reset_peak() is process-wide; same rule as cProfile
+                if not self._measuring:
+                    self._measuring = measure_memory = True
+            if measure_memory:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+        if profiler:
+            profiler.enable()
+
+        try:
+            yield span
+        finally:
+            if profiler:
+                profiler.disable()
+                span.attributes["profile"] = self._top_functions(profiler)
+                with self._lock:
+                    self._profiling = False
+            if measure_memory:
+                span.attributes["peak_memory_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+                with self._lock:
+                    self._measuring = False
+
+            span.duration = time.perf_counter() - span.start
+            stack.pop()
+            with self._lock:
+                self.spans.append(span)
+
+    def _top_functions(self, profiler) -> str:
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(self.profile_top)
+        return out.getvalue()
+
+    # ------------------------------------------------------------------
+    # Reporting / export
+    # ------------------------------------------------------------------
+    def summary(self) -> dict:
+        """Total time and call count per span name (plus the largest memory peak, if measured)."""
+        totals = {}
+        for span in self.spans:
+            entry = totals.setdefault(span.name, {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + span.duration * 1000, 3)
+            peak = span.attributes.get("peak_memory_kb")
+            if peak is not None:
+                entry["peak_memory_kb"] = max(entry.get("peak_memory_kb", 0.0), peak)
+        return totals
+
+    def to_json(self, path: str = None) -> dict:
+        payload = {
+            "spans": [s.to_dict(self.origin) for s in sorted(self.spans, key=lambda s: s.start)],
+            "summary": self.summary()
+        }
+        if path:
+            _write(path, payload)
+        return payload
+
+    def to_chrome_trace(self, path: str = None) -> dict:
+        payload = {
+            "traceEvents": [
+                {
+                    "name": s.name,
+                    "ph": "X",
+                    "ts": round((s.start - self.origin) * 1e6, 1),
+                    "dur": round(s.duration * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": s.thread_id,
+                    "args": {k: v for k, v in s.attributes.items() if k != "profile"}
+                }
+                for s in self.spans
+            ],
+            "displayTimeUnit": "ms"
+        }
+        if path:
+            _write(path, payload)
+        return payload
+
+    def print_summary(self):
+        log.info("Stage timings")
+        for name, entry in sorted(self.summary().items(), key=lambda kv: -kv[1]["total_ms"]):
+            if "peak_memory_kb" in entry:
+                log.info("  %-24s %10.1f ms  (x%d)  peak %.1f KB", name, entry["total_ms"],
+                         entry["count"], entry["peak_memory_kb"])
+            else:
+                log.info("  %-24s %10.1f ms  (x%d)", name, entry["total_ms"], entry["count"])
+
+
+def _write(path: str, payload: dict):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, default=str)
+
+
+# ----------------------------------------------------------------------
+# Process-wide tracer (None = tracing off, spans cost one global lookup)
+# ----------------------------------------------------------------------
+_active: Optional[Tracer] = None
+
+
+def set_tracer(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    global _active
+    previous, _active = _active, tracer
+    return previous
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _active
+
+
+@contextmanager
+def _no_span():
+    yield None
+
+
+def trace_span(name: str, **attributes):
+    """`with trace_span("binding", visual=title):` - a no-op unless a tracer is active."""
+    tracer = _active
+    if tracer is None:
+        return _no_span()
+    return tracer.span(name, **attributes)
+
+
+def carry_span(fn):
+    """
+    Wraps `fn` for a worker thread (pool.map / submit) so spans it opens
+    keep the submitting thread's current span as their parent.
+    """
+    tracer = _active
+    if tracer is None:
+        return fn
+    parent = tracer.current()
+
+    def run(*args, **kwargs):
+        local = tracer._local
+        previous = getattr(local, "carried", None)
+        local.carried = parent
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            local.carried = previous
+
+    return run
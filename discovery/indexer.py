@@ -1,70 +1,103 @@
 # discovery/indexer.py
+import logging
+from core.log import get_logger
 
-def extract_semantic_index(tmdl_tables: dict) -> dict:
+log = get_logger("indexer")
+
+# summarizeBy values that make a column an (implicit) measure
+IMPLICIT_AGGREGATIONS = {"sum", "count", "average", "min", "max"}
+
+def extract_semantic_index(tmdl_tables: dict, relationships: list = None) -> dict:
     """
     Step 1B: Categorizes TMDL artifacts into a semantic ground truth.
     PRESERVES column-level metadata (datatype, summarizeBy).
+    Explicit DAX measures are kept apart from implicit (summarizeBy) ones.
     """
 
     semantic_index = {
         "tables": {},
         "all_dimensions": set(),
-        "all_measures": set()
+        "all_measures": set(),
+        "relationships": relationships or []
     }
 
     for table_name, table_data in tmdl_tables.items():
-        cols = table_data.get("columns", {})
-        dimensions = []
-        measures = {}
-
-        # Preserve full column metadata
-        column_metadata = {}
-
-        for col_name, meta in cols.items():
-            data_type = meta.get("dataType", "unknown")
-            summarize = meta.get("summarizeBy", "none")
+        table_entry = index_table(table_data)
+        semantic_index["tables"][table_name] = table_entry
 
-            column_metadata[col_name] = {
-                "dataType": data_type,
-                "summarizeBy": summarize
-            }
-
-            # Heuristic: Measure vs Dimension
-            if summarize in {"sum", "count", "average", "min", "max"}:
-                measures[col_name] = {
-                    "dataType": data_type,
-                    "summarizeBy": summarize
-                }
-                semantic_index["all_measures"].add(col_name)
-            else:
-                dimensions.append(col_name)
-                semantic_index["all_dimensions"].add(col_name)
-
-        semantic_index["tables"][table_name] = {
-            # FULL metadata retained here
-            "columns": column_metadata,
-            "dimensions": dimensions,
-            "measures": measures
-        }
+        semantic_index["all_dimensions"].update(table_entry["dimensions"])
+        semantic_index["all_measures"].update(table_entry["measures"])
+        semantic_index["all_measures"].update(table_entry["explicit_measures"])
 
     # Clean up sets for JSON compatibility
     semantic_index["all_dimensions"] = sorted(list(semantic_index["all_dimensions"]))
     semantic_index["all_measures"] = sorted(list(semantic_index["all_measures"]))
 
     # ---------------- DEBUG: SEMANTIC INDEX ----------------
-    print("\n[INDEXER DEBUG] Semantic Index Summary")
-    for table, info in semantic_index["tables"].items():
-        print(f"  Table: {table}")
-        for col, meta in info["columns"].items():
-            is_measure = col in info["measures"]
-            print(
-                f"    Column: {col} | "
-                f"dataType={meta['dataType']} | "
-                f"summarizeBy={meta['summarizeBy']} | "
-                f"measure={is_measure}"
-            )
-        print("[INDEXER DEBUG END]\n")
+    log.info(
+        "Indexed %d tables (%d dimensions, %d measures)",
+        len(semantic_index["tables"]),
+        len(semantic_index["all_dimensions"]),
+        len(semantic_index["all_measures"])
+    )
+    if log.isEnabledFor(logging.DEBUG):
+        for table, info in semantic_index["tables"].items():
+            log.debug("Table: %s", table)
+            for col, meta in info["columns"].items():
+                log.debug(
+                    "  Column: %s | dataType=%s | summarizeBy=%s | measure=%s",
+                    col, meta["dataType"], meta["summarizeBy"], col in info["measures"]
+                )
+            for measure_name in info["explicit_measures"]:
+                log.debug("  Measure: %s | explicit=True", measure_name)
     # ------------------------------------------------------
 
 
-    return semantic_index
\ No newline at end of file
+    return semantic_index
+
+
+def index_table(table_data: dict) -> dict:
+    """
+    Semantic index entry for ONE parsed table, so a changed table can be
+    re-indexed without touching the others.
+    """
+    cols = table_data.get("columns", {})
+    dimensions = []
+    measures = {}
+
+    # Preserve full column metadata
+    column_metadata = {}
+
+    for col_name, meta in cols.items():
+        data_type = meta.get("dataType", "unknown")
+        summarize = meta.get("summarizeBy", "none")
+
+        column_metadata[col_name] = {
+            "dataType": data_type,
+            "summarizeBy": summarize
+        }
+
+        # Heuristic: Measure vs Dimension
+        if summarize in IMPLICIT_AGGREGATIONS:
+            measures[col_name] = {
+                "dataType": data_type,
+                "summarizeBy": summarize
+            }
+        else:
+            dimensions.append(col_name)
+
+    # Explicit DAX measures (measure blocks in the TMDL)
+    explicit_measures = {}
+    for measure_name, meta in table_data.get("measures", {}).items():
+        explicit_measures[measure_name] = {
+            "expression": meta.get("expression"),
+            "formatString": meta.get("formatString")
+        }
+
+    return {
+        # FULL metadata retained here
+        "columns": column_metadata,
+        "dimensions": dimensions,
+        "measures": measures,
+        "explicit_measures": explicit_measures
+    }
@@ -1,4 +1,8 @@
 # discovery/linguistic.py
+import logging
+from core.log import get_logger
+
+log = get_logger("linguistic")
 
 def generate_linguistic_metadata(semantic_index: dict) -> dict:
     """
@@ -8,48 +12,17 @@ def generate_linguistic_metadata(semantic_index: dict) -> dict:
     entities = {}
 
     for table_name, table_info in semantic_index["tables"].items():
-        # -------------------------------
-        # Table entity
-        # -------------------------------
-        entities[table_name] = {
-            "kind": "table",
-            "binding": {"table": table_name},
-            "terms": [
-                table_name.lower(),
-                table_name.replace("_", " ").lower()
-            ]
-        }
-
-        # -------------------------------
-        # Column / Measure entities
-        # -------------------------------
-        for col_name, col_meta in table_info["columns"].items():
-            is_measure = col_name in table_info.get("measures", {})
-
-            entity_id = f"{table_name}.{col_name.lower().replace(' ', '_')}"
-
-            entities[entity_id] = {
-                "kind": "measure" if is_measure else "column",
-                "binding": {
-                    "table": table_name,
-                    "column": col_name,
-                    "measure": is_measure,
-                    "dataType": col_meta.get("dataType")
-                },
-                "terms": _expand_terms(col_name, is_measure)
-            }
+        entities.update(table_entities(table_name, table_info))
 
     # ---------------- DEBUG: LINGUISTIC METADATA ----------------
-    print("\n[LINGUISTIC DEBUG] Entities")
-    for entity_id, entity in entities.items():
-        binding = entity["binding"]
-        print(
-            f"  {entity_id} | "
-            f"measure={binding.get('measure')} | "
-            f"dataType={binding.get('dataType')} | "
-            f"terms={entity['terms']}"
-        )
-    print("[LINGUISTIC DEBUG END]\n")
+    log.info("Generated %d entities", len(entities))
+    if log.isEnabledFor(logging.DEBUG):
+        for entity_id, entity in entities.items():
+            binding = entity["binding"]
+            log.debug(
+                "%s | measure=%s | dataType=%s | terms=%s",
+                entity_id, binding.get("measure"), binding.get("dataType"), entity["terms"]
+            )
     # -----------------------------------------------------------
 
     return {
@@ -58,6 +31,75 @@ def generate_linguistic_metadata(semantic_index: dict) -> dict:
     }
 
 
+def table_entities(table_name: str, table_info: dict) -> dict:
+    """
+    Entities contributed by ONE table of the semantic index
+    (the table itself, its columns and its explicit measures).
+    """
+    entities = {}
+
+    # -------------------------------
+    # Table entity
+    # -------------------------------
+    entities[table_name] = {
+        "kind": "table",
+        "binding": {"table": table_name},
+        "terms": [
+            table_name.lower(),
+            table_name.replace("_", " ").lower()
+        ]
+    }
+
+    # -------------------------------
+    # Column / Measure entities
+    # -------------------------------
+    for col_name, col_meta in table_info["columns"].items():
+        is_measure = col_name in table_info.get("measures", {})
+
+        entity_id = entity_key(table_name, col_name)
+
+        entities[entity_id] = {
+            "kind": "measure" if is_measure else "column",
+            "binding": {
+                "table": table_name,
+                "column": col_name,
+                "measure": is_measure,
+                "dataType": col_meta.get("dataType")
+            },
+            "terms": _expand_terms(col_name, is_measure)
+        }
+
+    # -------------------------------
+    # Explicit DAX measure entities
+    # -------------------------------
+    for measure_name in table_info.get("explicit_measures", {}):
+        entity_id = entity_key(table_name, measure_name, explicit=True)
+
+        entities[entity_id] = {
+            "kind": "measure",
+            "binding": {
+                "table": table_name,
+                "column": measure_name,
+                "measure": True,
+                "explicit": True,
+                "dataType": None
+            },
+            "terms": _expand_terms(measure_name, True)
+        }
+
+    return entities
+
+
+def entity_key(table_name: str, name: str, explicit: bool = False) -> str:
+    """
+    'Sales', 'Unit Price' -> 'Sales.unit_price'. Explicit measures live in
+    their own namespace ('Sales.measure:unit_price'): a measure may share
+    its name with a column of the same table.
+    """
+    prefix = "measure:" if explicit else ""
+    return f"{table_name}.{prefix}{name.lower().replace(' ', '_')}"
+
+
 def _expand_terms(name: str, is_measure: bool) -> list:
     """
     Generates controlled synonyms.
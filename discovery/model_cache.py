@@ -0,0 +1,154 @@
+# discovery/model_cache.py
+import hashlib
+import json
+import os
+
+from discovery.tmdl_parser import load_relationships, parse_tmdl_files
+from discovery.indexer import extract_semantic_index
+from discovery.linguistic import generate_linguistic_metadata
+from discovery.semantic_store import SemanticStore
+from core.tracing import trace_span
+from core.log import get_logger
+
+log = get_logger("model_cache")
+
+# Bump whenever the parser / indexer / linguistic output shape changes
+CACHE_VERSION = 3
+
+
+def load_semantic_model(
+    tmdl_root: str,
+    cache_path: str = None,
+    linguistic_path: str = None,
+    max_workers: int = None,
+    compact: bool = False
+) -> tuple:
+    """
+    Steps 1A, 1B and 2 behind a persistent cache.
+
+    Returns (tmdl_tables, semantic_index, linguistic_metadata).
+    Relationships come from relationships.tmdl next to `tmdl_root`.
+    Each .tmdl file is fingerprinted by (mtime, size) and, when those
+    move, by a SHA-256 of its content. Only changed files are re-parsed;
+    if nothing changed the cached index and metadata are returned as-is.
+
+    With `compact`, index and metadata are read-only dict views over a
+    SemanticStore (same shapes, a fraction of the memory).
+    """
+    if not os.path.exists(tmdl_root):
+        raise FileNotFoundError(f"TMDL path not found: {tmdl_root}")
+
+    cache = _read_cache(cache_path)
+    cached_files = cache.get("files", {})
+
+    files = {}
+    to_parse = {}
+    dirty = set(cached_files) - set(os.listdir(tmdl_root))  # deleted files
+
+    for file in os.listdir(tmdl_root):
+        if not file.endswith(".tmdl"):
+            continue
+
+        file_path = os.path.join(tmdl_root, file)
+        stat = os.stat(file_path)
+        entry = cached_files.get(file)
+
+        if not (entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size):
+            digest = _hash_file(file_path)
+            if entry and entry["sha256"] == digest:
+                # Touched but unchanged: refresh the stat fingerprint only
+                entry = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            else:
+                entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+                to_parse[file_path] = file
+                dirty.add(file)
+
+        files[file] = entry
+
+    # Changed files are parsed together on the loader's pool
+    with trace_span("tmdl_load", files=len(to_parse)):
+        parsed = parse_tmdl_files(list(to_parse), max_workers=max_workers)
+    for file_path, (table_name, table_def) in parsed.items():
+        files[to_parse[file_path]].update(table=table_name, definition=table_def)
+
+    tables = {}
+    for entry in files.values():
+        if entry["table"]:
+            tables[entry["table"]] = entry["definition"]
+
+    # A single small file: parsed every time, compared with the cached index
+    relationships = load_relationships(os.path.dirname(os.path.abspath(tmdl_root)))
+    if cache.get("semantic_index", {}).get("relationships") != relationships:
+        dirty.add("relationships.tmdl")
+
+    if not dirty and "semantic_index" in cache and "linguistic_metadata" in cache:
+        log.info("Semantic model unchanged (%d files)", len(files))
+        if files != cached_files:
+            _write_json(cache_path, dict(cache, files=files))
+        if compact:
+            # Straight from the cached dicts: no terms are derived again
+            with trace_span("indexing", tables=len(tables), compact=True, cached=True):
+                store = SemanticStore.from_dicts(cache["semantic_index"], cache["linguistic_metadata"])
+            return tables, store.index_view(), store.linguistic_view()
+        return tables, cache["semantic_index"], cache["linguistic_metadata"]
+
+    if cached_files:
+        log.info("Re-parsed %d changed file(s): %s", len(dirty), sorted(dirty))
+
+    if compact:
+        tables, index, linguistic = _compact(tables, relationships)
+        index_dict, linguistic_dict = index.to_dict(), linguistic.to_dict()
+    else:
+        with trace_span("indexing", tables=len(tables)):
+            index = index_dict = extract_semantic_index(tables, relationships)
+        with trace_span("linguistic"):
+            linguistic = linguistic_dict = generate_linguistic_metadata(index)
+
+    _write_json(cache_path, {
+        "version": CACHE_VERSION,
+        "files": files,
+        "semantic_index": index_dict,
+        "linguistic_metadata": linguistic_dict
+    })
+    _write_json(linguistic_path, linguistic_dict)
+
+    return tables, index, linguistic
+
+
+def _compact(tables: dict, relationships: list) -> tuple:
+    with trace_span("indexing", tables=len(tables), compact=True):
+        store = SemanticStore.from_tables(tables, relationships)
+    return tables, store.index_view(), store.linguistic_view()
+
+
+def _hash_file(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path: str) -> dict:
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring unreadable cache %s: %s", cache_path, e)
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache
+
+
+def _write_json(path: str, payload: dict):
+    """Atomic write: never leaves a half-written cache behind."""
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,393 @@
+# discovery/semantic_store.py
+import sys
+from collections.abc import Mapping
+from typing import Dict, List, Tuple
+from discovery.indexer import IMPLICIT_AGGREGATIONS
+from discovery.linguistic import _expand_terms, entity_key
+
+# Column kinds
+DIMENSION = 0
+MEASURE = 1    # implicit: summarizeBy aggregation
+EXPLICIT = 2   # DAX measure block
+
+# Entity kinds (index into ENTITY_KINDS)
+TABLE_ENTITY, COLUMN_ENTITY, MEASURE_ENTITY = 0, 1, 2
+ENTITY_KINDS = ("table", "column", "measure")
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Table:
+    __slots__ = ("id", "name", "column_ids", "entity_ids")
+
+    def __init__(self, table_id: int, name: str):
+        self.id = table_id
+        self.name = name
+        self.column_ids: List[int] = []
+        self.entity_ids: List[int] = []
+
+
+class Column:
+    __slots__ = ("id", "table_id", "name", "kind", "data_type", "summarize_by", "expression", "format_string")
+
+    def __init__(self, column_id: int, table_id: int, name: str, kind: int,
+                 data_type=None, summarize_by=None, expression=None, format_string=None):
+        self.id = column_id
+        self.table_id = table_id
+        self.name = name
+        self.kind = kind
+        self.data_type = data_type
+        self.summarize_by = summarize_by
+        self.expression = expression
+        self.format_string = format_string
+
+
+class Entity:
+    __slots__ = ("id", "key", "kind", "table_id", "column_id", "terms")
+
+    def __init__(self, entity_id: int, key: str, kind: int, table_id: int, column_id: int, terms: Tuple[str, ...]):
+        self.id = entity_id
+        self.key = key
+        self.kind = kind
+        self.table_id = table_id
+        self.column_id = column_id   # -1 for table entities
+        self.terms = terms
+
+
+class SemanticStore:
+    """
+    Compact form of the semantic index and linguistic metadata.
+
+    Tables, columns and entities are slotted objects addressed by integer
+    ids; every name, data type and term is interned, and identical term
+    tuples are shared between entities. index_view() / linguistic_view()
+    expose the familiar dict shapes for code that still expects
+    extract_semantic_index / generate_linguistic_metadata output. Entity
+    and table dicts are built on access around one cached binding per
+    entity, so every consumer shares the same binding objects.
+
+    drop_table() / add_table() / reorder() patch the store in place
+    (discovery/watcher.IncrementalModel); dropped ids are never reused.
+    """
+
+    def __init__(self):
+        self.tables: List[Table] = []
+        self.columns: List[Column] = []
+        self.entities: List[Entity] = []
+        self.table_ids: Dict[str, int] = {}
+        self.entity_ids: Dict[str, int] = {}
+        self.relationships: list = []
+        # Bumped by every patch; views cache derived sections per version
+        self.version = 0
+        self._bindings: Dict[int, dict] = {}
+        self._index_view = None
+        self._linguistic_view = None
+        self._term_tuples: Dict[tuple, tuple] = {}
+
+    @classmethod
+    def from_tables(cls, tmdl_tables: dict, relationships: list = None) -> "SemanticStore":
+        """Same input as extract_semantic_index (parsed TMDL tables)."""
+        store = cls()
+        store.relationships = relationships or []
+
+        tables = [store._load_table(name, table_data) for name, table_data in tmdl_tables.items()]
+        for table in tables:
+            store._table_entities(table)
+        # Only needed while building
+        store._term_tuples = {}
+        return store
+
+    @classmethod
+    def from_dicts(cls, semantic_index: dict, linguistic_metadata: dict) -> "SemanticStore":
+        """
+        Rebuilds the store from index / metadata dicts (e.g. the model
+        cache) without re-deriving any terms.
+        """
+        store = cls()
+        store.relationships = semantic_index.get("relationships", [])
+
+        columns = {}
+        for table_name, info in semantic_index["tables"].items():
+            table = store._add_table(table_name)
+            for col_name, meta in info["columns"].items():
+                column = store._add_column(
+                    table, col_name, MEASURE if col_name in info["measures"] else DIMENSION,
+                    data_type=meta.get("dataType"), summarize_by=meta.get("summarizeBy")
+                )
+                columns[table.name, column.name] = column.id
+            for measure_name, meta in info["explicit_measures"].items():
+                column = store._add_column(
+                    table, measure_name, EXPLICIT,
+                    expression=meta.get("expression"), format_string=meta.get("formatString")
+                )
+                columns[table.name, column.name] = column.id
+
+        for key, entity in linguistic_metadata["entities"].items():
+            binding = entity["binding"]
+            table_id = store.table_ids[binding["table"]]
+            column_id = columns[binding["table"], binding["column"]] if "column" in binding else -1
+            store._add_entity(key, ENTITY_KINDS.index(entity["kind"]), table_id, column_id, entity["terms"])
+
+        store._term_tuples = {}
+        return store
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    def _add_table(self, name: str) -> Table:
+        table = Table(len(self.tables), _intern(name))
+        self.tables.append(table)
+        self.table_ids[table.name] = table.id
+        return table
+
+    def _add_column(self, table: Table, name: str, kind: int, **meta) -> Column:
+        column = Column(
+            len(self.columns), table.id, _intern(name), kind,
+            **{k: _intern(v) for k, v in meta.items()}
+        )
+        self.columns.append(column)
+        table.column_ids.append(column.id)
+        return column
+
+    def _terms(self, terms) -> tuple:
+        terms = tuple(_intern(t) for t in terms)
+        return self._term_tuples.setdefault(terms, terms)
+
+    def _add_entity(self, key: str, kind: int, table_id: int, column_id: int, terms) -> Entity:
+        entity = Entity(len(self.entities), _intern(key), kind, table_id, column_id, self._terms(terms))
+        # Later keys win, as with dict assignment in generate_linguistic_metadata
+        if entity.key in self.entity_ids:
+            self.entities[self.entity_ids[entity.key]] = None
+        self.entities.append(entity)
+        self.entity_ids[entity.key] = entity.id
+        self.tables[table_id].entity_ids.append(entity.id)
+        return entity
+
+    def _load_table(self, name: str, table_data: dict) -> Table:
+        """Adds a parsed TMDL table and its columns (no entities yet)."""
+        table = self._add_table(name)
+
+        for col_name, meta in table_data.get("columns", {}).items():
+            summarize = meta.get("summarizeBy", "none")
+            self._add_column(
+                table, col_name,
+                MEASURE if summarize in IMPLICIT_AGGREGATIONS else DIMENSION,
+                data_type=meta.get("dataType", "unknown"),
+                summarize_by=summarize
+            )
+
+        for measure_name, meta in table_data.get("measures", {}).items():
+            self._add_column(
+                table, measure_name, EXPLICIT,
+                expression=meta.get("expression"),
+                format_string=meta.get("formatString")
+            )
+        return table
+
+    def _table_entities(self, table: Table) -> List[str]:
+        """Mirrors discovery.linguistic.table_entities entity for entity."""
+        keys = [self._add_entity(
+            table.name, TABLE_ENTITY, table.id, -1,
+            [table.name.lower(), table.name.replace("_", " ").lower()]
+        ).key]
+        # Columns first, then explicit measures (same order as the dict builder)
+        for explicit in (False, True):
+            for column_id in table.column_ids:
+                column = self.columns[column_id]
+                if (column.kind == EXPLICIT) != explicit:
+                    continue
+                is_measure = column.kind != DIMENSION
+                keys.append(self._add_entity(
+                    entity_key(table.name, column.name, explicit),
+                    MEASURE_ENTITY if is_measure else COLUMN_ENTITY, table.id, column.id,
+                    _expand_terms(column.name, is_measure)
+                ).key)
+        return keys
+
+    # ------------------------------------------------------------------
+    # Patching
+    # ------------------------------------------------------------------
+    def drop_table(self, name: str) -> List[str]:
+        """Removes a table with its columns and entities; returns the dropped entity keys."""
+        table_id = self.table_ids.pop(name, None)
+        if table_id is None:
+            return []
+        table = self.tables[table_id]
+        self.tables[table_id] = None
+        for column_id in table.column_ids:
+            self.columns[column_id] = None
+
+        removed = []
+        for entity_id in table.entity_ids:
+            entity = self.entities[entity_id]
+            if entity is None:
+                continue
+            if self.entity_ids.get(entity.key) == entity_id:
+                del self.entity_ids[entity.key]
+                removed.append(entity.key)
+            self.entities[entity_id] = None
+            self._bindings.pop(entity_id, None)
+        self.version += 1
+        return removed
+
+    def add_table(self, name: str, table_data: dict) -> List[str]:
+        """Adds (or replaces) one parsed TMDL table; returns its entity keys."""
+        self.drop_table(name)
+        keys = self._table_entities(self._load_table(name, table_data))
+        self._term_tuples = {}
+        self.version += 1
+        return keys
+
+    def reorder(self, table_names: List[str]):
+        """Tables, then their entities, in the given order (what the views iterate)."""
+        tables = [(name, self.table_ids[name]) for name in table_names]
+        self.table_ids.clear()
+        self.table_ids.update(tables)
+
+        entities = []
+        for _, table_id in tables:
+            for entity_id in self.tables[table_id].entity_ids:
+                entity = self.entities[entity_id]
+                if entity is not None and self.entity_ids.get(entity.key) == entity_id:
+                    entities.append((entity.key, entity_id))
+        # In place: views hold on to these dicts
+        self.entity_ids.clear()
+        self.entity_ids.update(entities)
+        self.version += 1
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def table(self, name: str) -> Table:
+        return self.tables[self.table_ids[name]]
+
+    def entity(self, key: str) -> Entity:
+        return self.entities[self.entity_ids[key]]
+
+    def iter_entities(self):
+        return (e for e in self.entities if e is not None)
+
+    def binding(self, entity: Entity) -> dict:
+        """The entity's binding dict: built once, then shared (treat as read-only)."""
+        binding = self._bindings.get(entity.id)
+        if binding is None:
+            binding = self._bindings[entity.id] = self._make_binding(entity)
+        return binding
+
+    def _make_binding(self, entity: Entity) -> dict:
+        table = self.tables[entity.table_id]
+        if entity.column_id < 0:
+            return {"table": table.name}
+        column = self.columns[entity.column_id]
+        binding = {
+            "table": table.name,
+            "column": column.name,
+            "measure": column.kind != DIMENSION,
+            "dataType": column.data_type
+        }
+        if column.kind == EXPLICIT:
+            binding["explicit"] = True
+        return binding
+
+    # ------------------------------------------------------------------
+    # Backward-compatible dict views
+    # ------------------------------------------------------------------
+    def index_view(self) -> Mapping:
+        if self._index_view is None:
+            self._index_view = _IndexView(self)
+        return self._index_view
+
+    def linguistic_view(self) -> Mapping:
+        if self._linguistic_view is None:
+            self._linguistic_view = _LinguisticView(self)
+        return self._linguistic_view
+
+
+class _View(Mapping):
+    """Read-only mapping whose values are computed on access."""
+
+    def __init__(self, keys, get):
+        self._keys = keys
+        self._get = get
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return self._get(key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def to_dict(self) -> dict:
+        return {k: v.to_dict() if isinstance(v, _View) else v for k, v in self.items()}
+
+
+class _IndexView(_View):
+    """Shape of extract_semantic_index output."""
+
+    def __init__(self, store: SemanticStore):
+        self.store = store
+        self._tables = _View(store.table_ids, lambda name: self._table(store.table(name)))
+        self._names = {}
+        super().__init__(
+            ("tables", "all_dimensions", "all_measures", "relationships"),
+            self._section
+        )
+
+    def _section(self, key):
+        store = self.store
+        if key == "tables":
+            return self._tables
+        if key == "relationships":
+            return store.relationships
+        # Sorted name lists are cached until the store is patched
+        cached = self._names.get(key)
+        if cached is None or cached[0] != store.version:
+            wanted = (DIMENSION,) if key == "all_dimensions" else (MEASURE, EXPLICIT)
+            names = sorted({c.name for c in store.columns if c is not None and c.kind in wanted})
+            cached = self._names[key] = (store.version, names)
+        return cached[1]
+
+    def _table(self, table: Table) -> dict:
+        columns = [self.store.columns[i] for i in table.column_ids]
+        return {
+            "columns": {
+                c.name: {"dataType": c.data_type, "summarizeBy": c.summarize_by}
+                for c in columns if c.kind != EXPLICIT
+            },
+            "dimensions": [c.name for c in columns if c.kind == DIMENSION],
+            "measures": {
+                c.name: {"dataType": c.data_type, "summarizeBy": c.summarize_by}
+                for c in columns if c.kind == MEASURE
+            },
+            "explicit_measures": {
+                c.name: {"expression": c.expression, "formatString": c.format_string}
+                for c in columns if c.kind == EXPLICIT
+            }
+        }
+
+
+class _LinguisticView(_View):
+    """Shape of generate_linguistic_metadata output."""
+
+    def __init__(self, store: SemanticStore):
+        self.store = store
+        self._entities = _View(store.entity_ids, lambda k: self._entity(store.entity(k)))
+        super().__init__(("language", "entities"), self._section)
+
+    def _section(self, key):
+        if key == "language":
+            return "en-US"
+        return self._entities
+
+    def _entity(self, entity: Entity) -> dict:
+        return {
+            "kind": ENTITY_KINDS[entity.kind],
+            "binding": self.store.binding(entity),
+            "terms": list(entity.terms)
+        }
@@ -0,0 +1,247 @@
+# discovery/tmdl_model.py
+from typing import Any, ClassVar, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+def read_name(text: str, stops: str = " =") -> tuple:
+    """
+    Reads a TMDL object name from the start of `text`.
+    Handles 'quoted names' (with '' escapes) and bare names.
+    Returns (name, remainder). Single left-to-right scan.
+    """
+    if text.startswith("'"):
+        chars = []
+        i = 1
+        while i < len(text):
+            c = text[i]
+            if c == "'":
+                if text[i + 1:i + 2] == "'":
+                    chars.append("'")
+                    i += 2
+                    continue
+                return "".join(chars), text[i + 1:].lstrip()
+            chars.append(c)
+            i += 1
+        return "".join(chars), ""
+
+    end = len(text)
+    for stop in stops:
+        pos = text.find(stop)
+        if pos != -1 and pos < end:
+            end = pos
+    return text[:end], text[end:].lstrip()
+
+
+def split_column_ref(ref: str) -> tuple:
+    """`'My Table'.Column` -> ("My Table", "Column")"""
+    table, rest = read_name(ref, stops=".")
+    if not rest.startswith("."):
+        return None, table
+    column, _ = read_name(rest[1:], stops="")
+    return table, column
+
+
+class TmdlObject(BaseModel):
+    """
+    Base for every TMDL object.
+    Known properties map onto typed fields (see PROPERTY_FIELDS);
+    anything else is kept verbatim in `properties`.
+    """
+    PROPERTY_FIELDS: ClassVar[Dict[str, str]] = {}
+    LOWERCASE_FIELDS: ClassVar[set] = set()
+
+    name: str
+    description: Optional[str] = None
+    lineage_tag: Optional[str] = None
+    annotations: Dict[str, str] = Field(default_factory=dict)
+    properties: Dict[str, Any] = Field(default_factory=dict)
+
+    def set_property(self, key: str, value: Any):
+        field = self.PROPERTY_FIELDS.get(key)
+        if key == "lineageTag":
+            field = "lineage_tag"
+        if field is None:
+            self.properties[key] = value
+            return
+        if field in self.LOWERCASE_FIELDS and isinstance(value, str):
+            value = value.lower()
+        setattr(self, field, value)
+
+
+class TmdlVariation(TmdlObject):
+    PROPERTY_FIELDS: ClassVar[Dict[str, str]] = {
+        "isDefault": "is_default",
+        "relationship": "relationship",
+        "defaultHierarchy": "default_hierarchy"
+    }
+
+    is_default: bool = False
+    relationship: Optional[str] = None
+    default_hierarchy: Optional[str] = None
+
+
+class TmdlColumn(TmdlObject):
+    PROPERTY_FIELDS: ClassVar[Dict[str, str]] = {
+        "dataType": "data_type",
+        "summarizeBy": "summarize_by",
+        "formatString": "format_string",
+        "isHidden": "is_hidden",
+        "sourceColumn": "source_column",
+        "dataCategory": "data_category",
+        "displayFolder": "display_folder",
+        "sortByColumn": "sort_by_column"
+    }
+    LOWERCASE_FIELDS: ClassVar[set] = {"data_type", "summarize_by"}
+
+    data_type: str = "unknown"
+    summarize_by: str = "none"
+    format_string: Optional[str] = None
+    is_hidden: bool = False
+    source_column: Optional[str] = None
+    data_category: Optional[str] = None
+    display_folder: Optional[str] = None
+    sort_by_column: Optional[str] = None
+    # DAX expression for calculated columns
+    expression: Optional[str] = None
+    variations: List[TmdlVariation] = Field(default_factory=list)
+
+    @property
+    def is_calculated(self) -> bool:
+        return self.expression is not None
+
+
+class TmdlMeasure(TmdlObject):
+    PROPERTY_FIELDS: ClassVar[Dict[str, str]] = {
+        "formatString": "format_string",
+        "isHidden": "is_hidden",
+        "displayFolder": "display_folder",
+        "dataType": "data_type"
+    }
+    LOWERCASE_FIELDS: ClassVar[set] = {"data_type"}
+
+    expression: str = ""
+    format_string: Optional[str] = None
+    is_hidden: bool = False
+    display_folder: Optional[str] = None
+    data_type: Optional[str] = None
+
+
+class TmdlLevel(TmdlObject):
+    PROPERTY_FIELDS: ClassVar[Dict[str, str]] = {"column": "column"}
+
+    column: Optional[str] = None
+
+
+class TmdlHierarchy(TmdlObject):
+    PROPERTY_FIELDS: ClassVar[Dict[str, str]] = {
+        "isHidden": "is_hidden",
+        "displayFolder": "display_folder"
+    }
+
+    is_hidden: bool = False
+    display_folder: Optional[str] = None
+    levels: List[TmdlLevel] = Field(default_factory=list)
+
+
+class TmdlPartition(TmdlObject):
+    PROPERTY_FIELDS: ClassVar[Dict[str, str]] = {"mode": "mode"}
+
+    # `partition data = m` -> source_type "m"
+    source_type: Optional[str] = None
+    mode: Optional[str] = None
+    # Only retained when the parser is asked to keep expressions
+    source: Optional[str] = None
+
+
+class TmdlTable(TmdlObject):
+    PROPERTY_FIELDS: ClassVar[Dict[str, str]] = {
+        "isHidden": "is_hidden",
+        "dataCategory": "data_category"
+    }
+
+    is_hidden: bool = False
+    data_category: Optional[str] = None
+    columns: Dict[str, TmdlColumn] = Field(default_factory=dict)
+    measures: Dict[str, TmdlMeasure] = Field(default_factory=dict)
+    hierarchies: Dict[str, TmdlHierarchy] = Field(default_factory=dict)
+    partitions: List[TmdlPartition] = Field(default_factory=list)
+
+    def to_definition(self) -> dict:
+        """
+        Plain-dict view consumed by the indexer and the model cache.
+        Keeps the original {"columns": {name: {dataType, summarizeBy}}} shape.
+        """
+        return {
+            "isHidden": self.is_hidden,
+            "columns": {
+                name: {
+                    "dataType": col.data_type,
+                    "summarizeBy": col.summarize_by,
+                    "formatString": col.format_string,
+                    "isHidden": col.is_hidden,
+                    "expression": col.expression
+                }
+                for name, col in self.columns.items()
+            },
+            "measures": {
+                name: {
+                    "expression": m.expression,
+                    "formatString": m.format_string,
+                    "isHidden": m.is_hidden,
+                    "displayFolder": m.display_folder
+                }
+                for name, m in self.measures.items()
+            },
+            "hierarchies": {
+                name: [level.column for level in h.levels]
+                for name, h in self.hierarchies.items()
+            }
+        }
+
+
+class TmdlRelationship(TmdlObject):
+    PROPERTY_FIELDS: ClassVar[Dict[str, str]] = {
+        "isActive": "is_active",
+        "crossFilteringBehavior": "cross_filtering_behavior",
+        "fromCardinality": "from_cardinality",
+        "toCardinality": "to_cardinality",
+        "joinOnDateBehavior": "join_on_date_behavior"
+    }
+
+    from_table: Optional[str] = None
+    from_column: Optional[str] = None
+    to_table: Optional[str] = None
+    to_column: Optional[str] = None
+    is_active: bool = True
+    cross_filtering_behavior: Optional[str] = None
+    from_cardinality: Optional[str] = None
+    to_cardinality: Optional[str] = None
+    join_on_date_behavior: Optional[str] = None
+
+    def set_property(self, key: str, value: Any):
+        if key in ("fromColumn", "toColumn"):
+            table, column = split_column_ref(value)
+            side = key[:-len("Column")]
+            setattr(self, f"{side}_table", table)
+            setattr(self, f"{side}_column", column)
+            return
+        super().set_property(key, value)
+
+    def to_definition(self) -> dict:
+        return {
+            "name": self.name,
+            "fromTable": self.from_table,
+            "fromColumn": self.from_column,
+            "toTable": self.to_table,
+            "toColumn": self.to_column,
+            "isActive": self.is_active
+        }
+
+
+class SemanticModelDefinition(BaseModel):
+    """Typed object model of an entire `definition/` folder."""
+    name: Optional[str] = None
+    properties: Dict[str, Any] = Field(default_factory=dict)
+    tables: Dict[str, TmdlTable] = Field(default_factory=dict)
+    relationships: List[TmdlRelationship] = Field(default_factory=list)
+    annotations: Dict[str, str] = Field(default_factory=dict)
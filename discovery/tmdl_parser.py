@@ -1,60 +1,412 @@
 import os
-import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from discovery.tmdl_model import (
+    SemanticModelDefinition, TmdlTable, TmdlColumn, TmdlMeasure,
+    TmdlHierarchy, TmdlLevel, TmdlPartition, TmdlVariation,
+    TmdlRelationship, read_name
+)
 
-def load_tmdl_files(tmdl_root: str) -> dict:
+def load_tmdl_files(tmdl_root: str, max_workers: int = None, timings: dict = None) -> dict:
     """
     Step 1A: Load all .tmdl files from the semantic model directory.
+
+    Files are parsed concurrently (`max_workers=1` parses serially).
+    Pass a dict as `timings` to receive per-file parse stats.
     """
-    tables = {}
     if not os.path.exists(tmdl_root):
         raise FileNotFoundError(f"TMDL path not found: {tmdl_root}")
 
-    for file in os.listdir(tmdl_root):
-        if not file.endswith(".tmdl"):
-            continue
+    file_paths = [
+        os.path.join(tmdl_root, file)
+        for file in os.listdir(tmdl_root)
+        if file.endswith(".tmdl")
+    ]
 
-        file_path = os.path.join(tmdl_root, file)
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        table_name, table_def = _parse_table_content(content)
+    tables = {}
+    parsed = parse_tmdl_files(file_paths, max_workers=max_workers, timings=timings)
+    for table_name, table_def in parsed.values():
         if table_name:
             tables[table_name] = table_def
 
     return tables
 
-def _parse_table_content(tmdl_text: str) -> tuple:
+def parse_tmdl_files(file_paths: list, max_workers: int = None, timings: dict = None) -> dict:
     """
-    Parses TMDL syntax to extract table names and column metadata.
+    Parses many .tmdl files on a thread pool.
+    Returns {file_path: (table_name, table_def)} in input order.
+    """
+    def _timed_parse(file_path):
+        start = time.perf_counter()
+        result = parse_tmdl_file(file_path)
+        return result, time.perf_counter() - start
+
+    if max_workers == 1 or len(file_paths) <= 1:
+        outcomes = [_timed_parse(path) for path in file_paths]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            outcomes = list(pool.map(_timed_parse, file_paths))
+
+    parsed = {}
+    for file_path, (result, elapsed) in zip(file_paths, outcomes):
+        parsed[file_path] = result
+        if timings is not None:
+            timings[os.path.basename(file_path)] = {
+                "table": result[0],
+                "seconds": round(elapsed, 6),
+                "bytes": os.path.getsize(file_path)
+            }
+
+    return parsed
+
+def parse_tmdl_file(file_path: str) -> tuple:
     """
-    lines = tmdl_text.splitlines()
-    table_name = None
-    columns = {}
-    current_col = None
+    Parses a single .tmdl file into (table_name, table_def).
+    Streams the file line by line, so large partition expressions
+    are never held in memory.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        return _parse_table_content(f)
+
+def load_semantic_definition(definition_root: str, max_workers: int = None, keep_expressions: bool = False) -> SemanticModelDefinition:
+    """
+    Parses a whole `definition/` folder (model.tmdl, relationships.tmdl,
+    tables/*.tmdl, ...) into one typed SemanticModelDefinition.
+    """
+    if not os.path.exists(definition_root):
+        raise FileNotFoundError(f"TMDL path not found: {definition_root}")
+
+    file_paths = []
+    for root in (definition_root, os.path.join(definition_root, "tables")):
+        if os.path.isdir(root):
+            file_paths.extend(
+                os.path.join(root, file)
+                for file in sorted(os.listdir(root))
+                if file.endswith(".tmdl")
+            )
+
+    def _parse(file_path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            return parse_tmdl_document(f, keep_expressions=keep_expressions)
+
+    if max_workers == 1:
+        documents = [_parse(path) for path in file_paths]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            documents = list(pool.map(_parse, file_paths))
+
+    model = SemanticModelDefinition()
+    for doc in documents:
+        model.tables.update(doc.tables)
+        model.relationships.extend(doc.relationships)
+        model.annotations.update(doc.annotations)
+        model.properties.update(doc.properties)
+        model.name = model.name or doc.name
 
+    return model
+
+def load_relationships(definition_root: str) -> list:
+    """
+    Relationships of a `definition/` folder (relationships.tmdl) as plain
+    dicts ({name, fromTable, fromColumn, toTable, toColumn, isActive});
+    [] when the file does not exist.
+    """
+    path = os.path.join(definition_root, "relationships.tmdl")
+    if not os.path.isfile(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [rel.to_definition() for rel in parse_tmdl_document(f).relationships]
+
+def _parse_table_content(tmdl_text) -> tuple:
+    """
+    Parses TMDL syntax to extract the table name and its definition
+    (columns, measures, hierarchies) as plain dicts.
+    Accepts the full text or any iterable of lines (e.g. an open file).
+    """
+    lines = tmdl_text.splitlines() if isinstance(tmdl_text, str) else tmdl_text
+    doc = parse_tmdl_document(lines)
+
+    for table in doc.tables.values():
+        return table.name, table.to_definition()
+
+    return None, {"columns": {}}
+
+def parse_tmdl_document(lines, keep_expressions: bool = False) -> SemanticModelDefinition:
+    """
+    Single-pass, indentation-aware TMDL parser.
+
+    Each line is classified once by its indent depth and leading keyword;
+    a depth stack tracks the owning object. Multi-line expressions (DAX,
+    M, annotations) are consumed while lines stay deeper than the
+    declaring object's properties. No regular expressions are involved.
+
+    Partition source expressions are skipped unless `keep_expressions`.
+    """
+    reader = _TmdlReader(keep_expressions)
     for raw in lines:
-        line = raw.strip()
-        if not line: continue
-
-        # Identify Table
-        if line.startswith("table "):
-            table_name = line.replace("table", "").strip().strip("'")
-            continue
-
-        # Identify Column
-        if line.startswith("column "):
-            # Handle quoted or unquoted column names
-            col_match = re.search(r"column\s+'?([^']+)'?", line)
-            if col_match:
-                current_col = col_match.group(1)
-                columns[current_col] = {"dataType": "unknown", "summarizeBy": "none"}
-            continue
-
-        # Column Metadata
-        if current_col and ":" in line:
-            if line.startswith("dataType:"):
-                columns[current_col]["dataType"] = line.split(":", 1)[1].strip().lower()
-            elif line.startswith("summarizeBy:"):
-                columns[current_col]["summarizeBy"] = line.split(":", 1)[1].strip().lower()
-
-    return table_name, {"columns": columns}
\ No newline at end of file
+        reader.feed(raw)
+    return reader.finish()
+
+
+# -------------------------------------------------------------------------
+# Tokenizer / reader internals
+# -------------------------------------------------------------------------
+_IGNORED = object()  # placeholder node whose children are skipped
+
+
+def _depth(indent: str) -> int:
+    tabs = indent.count("\t")
+    return tabs + (len(indent) - tabs) // 4
+
+
+def _coerce(value: str):
+    if value == "true":
+        return True
+    if value == "false":
+        return False
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+class _Capture:
+    """An in-flight multi-line expression."""
+    __slots__ = ("setter", "min_depth", "fenced", "keep", "lines", "blanks")
+
+    def __init__(self, setter, min_depth, fenced, keep):
+        self.setter = setter
+        self.min_depth = min_depth
+        self.fenced = fenced
+        self.keep = keep
+        self.lines = []
+        self.blanks = 0
+
+
+class _TmdlReader:
+
+    def __init__(self, keep_expressions: bool):
+        self.keep_expressions = keep_expressions
+        self.model = SemanticModelDefinition()
+        self.stack = []        # [(depth, node)]
+        self.capture = None
+        self.description = []
+
+        self.declarations = {
+            "table": self._declare_table,
+            "column": self._declare_column,
+            "measure": self._declare_measure,
+            "hierarchy": self._declare_hierarchy,
+            "level": self._declare_level,
+            "partition": self._declare_partition,
+            "variation": self._declare_variation,
+            "relationship": self._declare_relationship,
+            "annotation": self._declare_annotation,
+            "model": self._declare_model,
+            "ref": self._skip
+        }
+
+    # ---------------- line dispatch ----------------
+    def feed(self, raw: str):
+        line = raw.rstrip("\r\n")
+        text = line.lstrip("\t ")
+        depth = _depth(line[:len(line) - len(text)])
+
+        if self.capture is not None and self._continue_capture(depth, line, text):
+            return
+
+        text = text.rstrip()
+        if not text:
+            return
+        if text.startswith("///"):
+            self.description.append(text[3:].strip())
+            return
+
+        while self.stack and self.stack[-1][0] >= depth:
+            self.stack.pop()
+        parent = self.stack[-1][1] if self.stack else None
+        if parent is _IGNORED:
+            return
+
+        keyword, _, rest = text.partition(" ")
+        declare = self.declarations.get(keyword)
+        if declare is not None and rest:
+            node = declare(parent, depth, rest.lstrip())
+        elif parent is None:
+            # Unknown top-level object (cultureInfo, expression, role, ...)
+            node = _IGNORED
+        else:
+            node = self._property(parent, depth, text)
+
+        if node is not None:
+            if self.description and node is not _IGNORED and hasattr(node, "description"):
+                node.description = "\n".join(self.description)
+            self.stack.append((depth, node))
+        self.description = []
+
+    def finish(self) -> SemanticModelDefinition:
+        if self.capture is not None:
+            self._end_capture()
+        return self.model
+
+    # ---------------- expressions ----------------
+    def _begin_capture(self, setter, depth, first, keep=True):
+        """`first` is whatever followed the '=' on the declaring line."""
+        if first and first != "```":
+            if keep:
+                setter(first)
+            return
+        self.capture = _Capture(setter, depth + 2, first == "```", keep)
+
+    def _continue_capture(self, depth, line, text) -> bool:
+        cap = self.capture
+        if cap.fenced:
+            if text.rstrip() == "```":
+                self._end_capture()
+            elif cap.keep:
+                cap.lines.append(self._dedent(cap, line, text))
+            return True
+
+        if not text.strip():
+            cap.blanks += 1
+            return True
+
+        if depth >= cap.min_depth:
+            if cap.keep:
+                cap.lines.extend([""] * cap.blanks)
+                cap.lines.append(self._dedent(cap, line, text))
+            cap.blanks = 0
+            return True
+
+        self._end_capture()
+        return False
+
+    @staticmethod
+    def _dedent(cap, line, text) -> str:
+        # Indentation beyond the expression's own is part of the expression
+        prefix = line[:cap.min_depth]
+        return (line[cap.min_depth:] if prefix == "\t" * cap.min_depth else text).rstrip()
+
+    def _end_capture(self):
+        cap, self.capture = self.capture, None
+        if cap.keep:
+            cap.setter("\n".join(cap.lines))
+
+    # ---------------- properties ----------------
+    def _property(self, node, depth, text):
+        """
+        `key: value` | `key = expression` | `flag`.
+        Anything else is an unknown child object and is skipped.
+        """
+        end = len(text)
+        for stop in ": =":
+            pos = text.find(stop)
+            if pos != -1 and pos < end:
+                end = pos
+        key, rest = text[:end], text[end:].lstrip()
+
+        if rest.startswith(":"):
+            self._set(node, key, _coerce(rest[1:].strip()))
+            return None
+        if rest.startswith("="):
+            keep = self.keep_expressions or not isinstance(node, TmdlPartition)
+            self._begin_capture(lambda v: self._set(node, key, v), depth, rest[1:].strip(), keep)
+            return None
+        if not rest:
+            self._set(node, key, True)
+            return None
+        return _IGNORED
+
+    def _set(self, node, key, value):
+        if isinstance(node, TmdlPartition) and key == "source":
+            node.source = value
+        elif isinstance(node, SemanticModelDefinition):
+            node.properties[key] = value
+        else:
+            node.set_property(key, value)
+
+    # ---------------- declarations ----------------
+    def _skip(self, parent, depth, rest):
+        return None
+
+    def _declare_model(self, parent, depth, rest):
+        if parent is not None:
+            return _IGNORED
+        self.model.name, _ = read_name(rest)
+        return self.model
+
+    def _declare_table(self, parent, depth, rest):
+        if parent is not None:
+            return _IGNORED
+        name, _ = read_name(rest)
+        table = TmdlTable(name=name)
+        self.model.tables[name] = table
+        return table
+
+    def _declare_column(self, parent, depth, rest):
+        if not isinstance(parent, TmdlTable):
+            return self._property(parent, depth, "column " + rest)
+        name, rest = read_name(rest)
+        column = TmdlColumn(name=name)
+        parent.columns[name] = column
+        if rest.startswith("="):
+            self._begin_capture(lambda v: setattr(column, "expression", v), depth, rest[1:].strip())
+        return column
+
+    def _declare_measure(self, parent, depth, rest):
+        if not isinstance(parent, TmdlTable):
+            return _IGNORED
+        name, rest = read_name(rest)
+        measure = TmdlMeasure(name=name)
+        parent.measures[name] = measure
+        if rest.startswith("="):
+            self._begin_capture(lambda v: setattr(measure, "expression", v), depth, rest[1:].strip())
+        return measure
+
+    def _declare_hierarchy(self, parent, depth, rest):
+        if not isinstance(parent, TmdlTable):
+            return _IGNORED
+        name, _ = read_name(rest)
+        hierarchy = TmdlHierarchy(name=name)
+        parent.hierarchies[name] = hierarchy
+        return hierarchy
+
+    def _declare_level(self, parent, depth, rest):
+        if not isinstance(parent, TmdlHierarchy):
+            return _IGNORED
+        name, _ = read_name(rest)
+        level = TmdlLevel(name=name)
+        parent.levels.append(level)
+        return level
+
+    def _declare_partition(self, parent, depth, rest):
+        if not isinstance(parent, TmdlTable):
+            return _IGNORED
+        name, rest = read_name(rest)
+        partition = TmdlPartition(name=name)
+        if rest.startswith("="):
+            partition.source_type = rest[1:].strip() or None
+        parent.partitions.append(partition)
+        return partition
+
+    def _declare_variation(self, parent, depth, rest):
+        if not isinstance(parent, TmdlColumn):
+            return _IGNORED
+        name, _ = read_name(rest)
+        variation = TmdlVariation(name=name)
+        parent.variations.append(variation)
+        return variation
+
+    def _declare_relationship(self, parent, depth, rest):
+        if parent is not None:
+            return self._property(parent, depth, "relationship " + rest)
+        name, _ = read_name(rest)
+        relationship = TmdlRelationship(name=name)
+        self.model.relationships.append(relationship)
+        return relationship
+
+    def _declare_annotation(self, parent, depth, rest):
+        name, rest = read_name(rest)
+        target = parent.annotations if parent is not None else self.model.annotations
+        value = rest[1:].strip() if rest.startswith("=") else ""
+        self._begin_capture(lambda v: target.__setitem__(name, v), depth, value)
+        return _IGNORED
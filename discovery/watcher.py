@@ -0,0 +1,248 @@
+# discovery/watcher.py
+import bisect
+import os
+import threading
+from collections import Counter
+from typing import Callable, Dict, List
+from discovery.tmdl_parser import parse_tmdl_file
+from discovery.indexer import index_table
+from discovery.linguistic import table_entities
+from core.tracing import trace_span
+from core.log import get_logger
+
+log = get_logger("watcher")
+
+POLL_INTERVAL = 1.0  # seconds
+
+
+def scan_tables(tmdl_root: str) -> Dict[str, tuple]:
+    """{file name: (mtime_ns, size)} for every .tmdl file in the folder."""
+    stats = {}
+    with os.scandir(tmdl_root) as entries:
+        for entry in entries:
+            if entry.name.endswith(".tmdl") and entry.is_file():
+                stat = entry.stat()
+                stats[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return stats
+
+
+class IncrementalModel:
+    """
+    Semantic index + linguistic metadata that are patched per table.
+
+    apply() re-parses only the given files, replaces their tables in the
+    semantic index, swaps their entities in the linguistic metadata and
+    forwards the entity delta to every registered resolver
+    (ConceptResolver.update_entities). Work is proportional to the
+    changed tables, not to the model: dicts only append, and ties keep
+    following the cold-build table order through `table_rank`, which
+    registered resolvers share (a re-indexed table keeps its rank, new
+    tables rank last).
+
+    The dicts are patched in place, so code holding `index` /
+    `linguistic` sees the update; compact models (SemanticStore views)
+    are patched through their store. Use `lock` to keep readers out while a
+    patch is applied; registered resolvers take it on every lookup.
+    """
+
+    def __init__(self, tmdl_root: str, tables: dict, semantic_index: dict, linguistic_metadata: dict,
+                 files: Dict[str, str] = None):
+        self.tmdl_root = tmdl_root
+        self.tables = tables
+        self.index = semantic_index
+        self.linguistic = linguistic_metadata
+        self.resolvers = []
+        self.lock = threading.RLock()
+
+        # file name -> table name (unparsable files map to None)
+        self.files = dict(files) if files is not None else self._match_files()
+
+        # Read-only views: the store is patched and the views follow
+        self.store = getattr(semantic_index, "store", None)
+
+        # table name -> tie-break rank, in cold-build order (never reused)
+        self.table_rank = {name: rank for rank, name in enumerate(self.index["tables"])}
+
+        # Name multiplicities behind the sorted all_dimensions / all_measures lists
+        self._dimensions = Counter()
+        self._measures = Counter()
+        if self.store is None:
+            for table_info in self.index["tables"].values():
+                self._count(table_info, 1)
+
+    def _match_files(self) -> Dict[str, str]:
+        files = {}
+        for file in scan_tables(self.tmdl_root):
+            name = file[:-len(".tmdl")]
+            files[file] = name if name in self.tables else parse_tmdl_file(os.path.join(self.tmdl_root, file))[0]
+        return files
+
+    def register_resolver(self, resolver):
+        """
+        `resolver.update_entities(removed, added)` is called on every patch.
+        The resolver shares `lock` from here on: register it before it
+        serves lookups.
+        """
+        resolver.lock = self.lock
+        if resolver.index.table_rank != self.table_rank:
+            # Indexed in another table order: re-rank it once
+            resolver.index.table_rank = self.table_rank
+            resolver.update_entities((), dict(resolver.linguistic.get("entities", {})))
+        resolver.index.table_rank = self.table_rank
+        self.resolvers.append(resolver)
+
+    # ------------------------------------------------------------------
+    # Patching
+    # ------------------------------------------------------------------
+    def apply(self, changed: List[str] = (), deleted: List[str] = ()) -> dict:
+        """
+        changed / deleted: .tmdl file names (relative to tmdl_root).
+        Returns {"tables": [...touched tables], "removed": n, "added": n}.
+        """
+        with self.lock, trace_span("incremental_index", changed=len(changed), deleted=len(deleted)):
+            removed_ids = []
+            added = {}
+            touched = []
+
+            for file in deleted:
+                table_name = self.files.pop(file, None)
+                if table_name:
+                    removed_ids += self._drop_table(table_name)
+                    touched.append(table_name)
+
+            for file in changed:
+                table_name, table_def = parse_tmdl_file(os.path.join(self.tmdl_root, file))
+
+                # Table may have been renamed inside the file (it keeps the rank)
+                previous = self.files.get(file)
+                if previous:
+                    removed_ids += self._drop_table(previous)
+                self.files[file] = table_name
+                if not table_name:
+                    continue
+                if table_name not in self.table_rank:
+                    self.table_rank[table_name] = self.table_rank.get(previous, len(self.table_rank))
+
+                removed_ids += self._drop_table(table_name)
+                added.update(self._add_table(table_name, table_def))
+                touched.append(table_name)
+
+            # An entity dropped and re-added is simply replaced
+            removed_ids = [e for e in dict.fromkeys(removed_ids) if e not in added]
+            for resolver in self.resolvers:
+                resolver.update_entities(removed_ids, added)
+
+        log.info(
+            "Re-indexed %d table(s) %s: -%d/+%d entities",
+            len(touched), touched, len(removed_ids), len(added)
+        )
+        return {"tables": touched, "removed": len(removed_ids), "added": len(added)}
+
+    def _drop_table(self, table_name: str) -> List[str]:
+        if self.store is not None:
+            self.tables.pop(table_name, None)
+            return self.store.drop_table(table_name)
+
+        table_info = self.index["tables"].pop(table_name, None)
+        self.tables.pop(table_name, None)
+        if table_info is None:
+            return []
+        self._count(table_info, -1)
+
+        entities = self.linguistic["entities"]
+        removed = [
+            entity_id for entity_id in table_entities(table_name, table_info)
+            if entity_id in entities
+        ]
+        for entity_id in removed:
+            del entities[entity_id]
+        return removed
+
+    def _add_table(self, table_name: str, table_def: dict) -> dict:
+        if self.store is not None:
+            self.tables[table_name] = table_def
+            entities = self.linguistic["entities"]
+            return {key: entities[key] for key in self.store.add_table(table_name, table_def)}
+
+        table_info = index_table(table_def)
+        self.tables[table_name] = table_def
+        self.index["tables"][table_name] = table_info
+        self._count(table_info, 1)
+
+        added = table_entities(table_name, table_info)
+        self.linguistic["entities"].update(added)
+        return added
+
+    def _count(self, table_info: dict, delta: int):
+        names = [
+            (self._dimensions, self.index["all_dimensions"], table_info["dimensions"]),
+            (self._measures, self.index["all_measures"], list(table_info["measures"]) + list(table_info["explicit_measures"]))
+        ]
+        for counter, sorted_names, table_names in names:
+            for name in table_names:
+                before = counter[name]
+                counter[name] += delta
+                # Keep the global sorted lists in step (first add / last remove)
+                if before == 0 and counter[name] > 0:
+                    i = bisect.bisect_left(sorted_names, name)
+                    if i == len(sorted_names) or sorted_names[i] != name:
+                        sorted_names.insert(i, name)
+                elif before > 0 and counter[name] == 0:
+                    i = bisect.bisect_left(sorted_names, name)
+                    if i < len(sorted_names) and sorted_names[i] == name:
+                        del sorted_names[i]
+                    del counter[name]
+
+
+class TableWatcher:
+    """
+    Polls the tables folder and feeds changes to an IncrementalModel.
+
+        watcher = TableWatcher(model).start()
+        ...
+        watcher.stop()
+
+    poll() can also be called directly (tests, request-driven checks).
+    """
+
+    def __init__(self, model: IncrementalModel, interval: float = POLL_INTERVAL,
+                 on_change: Callable[[dict], None] = None):
+        self.model = model
+        self.interval = interval
+        self.on_change = on_change
+        self._stats = scan_tables(model.tmdl_root)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self) -> dict:
+        """Applies pending changes; returns the patch summary or None."""
+        stats = scan_tables(self.model.tmdl_root)
+        changed = [f for f, stat in stats.items() if self._stats.get(f) != stat]
+        deleted = [f for f in self._stats if f not in stats]
+        if not changed and not deleted:
+            return None
+
+        result = self.model.apply(changed, deleted)
+        # Only after a successful patch: failures are retried next poll
+        self._stats = stats
+        if self.on_change:
+            self.on_change(result)
+        return result
+
+    def start(self) -> "TableWatcher":
+        self._thread = threading.Thread(target=self._run, name="tmdl-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                # Half-saved files parse again on the next tick
+                log.exception("Incremental re-index failed")
@@ -0,0 +1,169 @@
+# llm/cache.py
+import abc
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+
+def make_cache_key(query: str, concepts: List[str], model: str, prompt_version: str) -> str:
+    """
+    Stable key for a planner call. The query is case/whitespace/
+    punctuation-normalized and the concept list is order-insensitive.
+    """
+    query_norm = re.sub(r"\s+", " ", query.lower()).strip(" .!?")
+    payload = json.dumps(
+        [query_norm, sorted(set(concepts)), model, prompt_version],
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(abc.ABC):
+    """
+    Interface for LLM response caches.
+    Entries expire after `ttl` seconds (None = never) and the cache holds
+    at most `max_entries` (least recently used entries are evicted first).
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = None, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._put(key, value)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "size": len(self)
+        }
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and self.clock() - created > self.ttl
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        """Value for `key`, or None if missing or expired (called under the lock)."""
+
+    @abc.abstractmethod
+    def _put(self, key: str, value: str):
+        """Stores `value` and evicts down to `max_entries` (called under the lock)."""
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries."""
+
+
+class MemoryLRUCache(ResponseCache):
+    """In-process LRU cache."""
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = None, clock=time.time):
+        super().__init__(max_entries, ttl, clock)
+        self._entries = OrderedDict()  # key -> (created, value)
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created, value = entry
+        if self._expired(created):
+            del self._entries[key]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value):
+        self._entries[key] = (self.clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache(ResponseCache):
+    """On-disk cache shared across runs (and processes)."""
+
+    def __init__(self, path: str, max_entries: int = 1000, ttl: Optional[float] = None, clock=time.time):
+        super().__init__(max_entries, ttl, clock)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _get(self, key):
+        row = self._conn.execute(
+            "SELECT value, created FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if self._expired(created):
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+            self.evictions += 1
+            return None
+        self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (self.clock(), key))
+        self._conn.commit()
+        return value
+
+    def _put(self, key, value):
+        now = self.clock()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+            (key, value, now, now)
+        )
+        overflow = self._count() - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += overflow
+        self._conn.commit()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._count()
+
+    def close(self):
+        self._conn.close()
@@ -1,11 +1,218 @@
 import os
-from groq import Groq
+import random
+import re
+import threading
+import time
+import httpx
+from groq import Groq, APIConnectionError, APITimeoutError, APIStatusError
 from dotenv import load_dotenv
+from core.log import get_logger
 load_dotenv()
 
+log = get_logger("llm")
+
+MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "4"))
+REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+REQUEST_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "60"))
+BACKOFF_BASE = 0.5   # seconds
+BACKOFF_CAP = 30.0   # seconds
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# Record/replay (llm/replay.py): "record" saves every completion under
+# GENAI_LLM_FIXTURES, "replay" serves them offline (no key needed)
+LLM_MODE = os.getenv("GENAI_LLM_MODE", "").lower()
+LLM_FIXTURES = os.getenv(
+    "GENAI_LLM_FIXTURES",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "llm")
+)
+# Replay delay: fixed seconds per call (unset = as recorded), times the speed factor
+LLM_REPLAY_LATENCY = os.getenv("GENAI_LLM_REPLAY_LATENCY")
+LLM_REPLAY_SPEED = float(os.getenv("GENAI_LLM_REPLAY_SPEED", "1"))
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter: `rate` requests per second with bursts up
+    to `capacity`. acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+    def drain(self, seconds: float):
+        """Provider says we are out of quota: hold everyone for `seconds`."""
+        with self._lock:
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+            self.updated = self.clock()
+
+
+def parse_reset(value: str) -> float:
+    """
+    Parses Groq/OpenAI style reset durations ('7.66s', '2m59.56s',
+    '120ms') or plain seconds ('3') into seconds.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total = 0.0
+    matched = False
+    for amount, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value):
+        matched = True
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total if matched else None
+
+
+def retry_delay(attempt: int, headers=None) -> float:
+    """
+    Seconds to wait before retry `attempt` (0-based).
+    Honours retry-after / x-ratelimit-reset-* headers when present,
+    otherwise full-jitter exponential backoff. Never more than BACKOFF_CAP.
+    """
+    headers = headers or {}
+    for header in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        delay = parse_reset(headers.get(header))
+        if delay is not None:
+            # A token-window reset can be minutes away; retry sooner and let the server answer
+            return min(BACKOFF_CAP, delay + random.uniform(0, BACKOFF_BASE))
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+class _Completions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def create(self, **kwargs):
+        return self._owner._call(kwargs)
+
+
+class _Chat:
+    def __init__(self, owner):
+        self.completions = _Completions(owner)
+
+
+class PooledClient:
+    """
+    Drop-in for `Groq` (`client.chat.completions.create(...)`) that keeps
+    one keep-alive connection pool per API key, rate-limits requests with
+    a token bucket and retries 429/5xx/timeouts with backoff.
+    """
+
+    def __init__(self, api_key: str, base_url: str = None, max_retries: int = MAX_RETRIES,
+                 requests_per_minute: float = REQUESTS_PER_MINUTE, timeout: float = REQUEST_TIMEOUT,
+                 sleep=time.sleep):
+        self.max_retries = max_retries
+        self.sleep = sleep
+        self.bucket = TokenBucket(requests_per_minute / 60.0, sleep=sleep)
+        self.http_client = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120)
+        )
+        # SDK retries are disabled: retry policy lives here
+        self.groq = Groq(api_key=api_key, base_url=base_url, max_retries=0, http_client=self.http_client)
+        self.chat = _Chat(self)
+        self.retries = 0
+
+    def _call(self, kwargs):
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                return self.groq.chat.completions.create(**kwargs)
+            except (APITimeoutError, APIConnectionError) as e:
+                error, headers = e, None
+            except APIStatusError as e:
+                if e.status_code not in RETRYABLE_STATUS:
+                    raise
+                error, headers = e, e.response.headers
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = retry_delay(attempt, headers)
+            if headers is not None and getattr(error, "status_code", None) == 429:
+                self.bucket.drain(delay)
+            log.warning("%s, retry %d/%d in %.2fs", type(error).__name__, attempt + 1, self.max_retries, delay)
+            self.retries += 1
+            attempt += 1
+            self.sleep(delay)
+
+    def close(self):
+        self.http_client.close()
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+# Set by use_client(): served instead of the registry (load tests, replay)
+_override = None
+
+
+def get_client(api_key: str, base_url: str = None):
+    """
+    Process-wide client registry: one PooledClient per (key, base_url),
+    wrapped in a ReplayClient when GENAI_LLM_MODE is record / replay.
+    """
+    base_url = base_url or os.getenv("GROQ_BASE_URL")
+    with _registry_lock:
+        client = _registry.get((api_key, base_url))
+        if client is None:
+            client = _make_client(api_key, base_url)
+            _registry[(api_key, base_url)] = client
+        return client
+
+
+def _make_client(api_key: str, base_url: str = None):
+    if not LLM_MODE:
+        return PooledClient(api_key, base_url=base_url)
+
+    from llm.replay import ReplayClient
+    live = PooledClient(api_key, base_url=base_url) if LLM_MODE == "record" else None
+    log.info("LLM %s mode, fixtures in %s", LLM_MODE, LLM_FIXTURES)
+    return ReplayClient(
+        LLM_FIXTURES, mode=LLM_MODE, client=live,
+        latency=float(LLM_REPLAY_LATENCY) if LLM_REPLAY_LATENCY else None,
+        speed=LLM_REPLAY_SPEED
+    )
+
+
+def use_client(client):
+    """Serves `client` from planner_client()/dashboard_client() (None restores). Returns the previous one."""
+    global _override
+    previous, _override = _override, client
+    return previous
+
+
+def reset_clients():
+    """Closes and forgets every pooled client (tests, key rotation)."""
+    with _registry_lock:
+        for client in _registry.values():
+            client.close()
+        _registry.clear()
+
 
 def planner_client():
-    return Groq(api_key=os.getenv("GROQ_PLANNER_KEY"))
+    return _override or get_client(os.getenv("GROQ_PLANNER_KEY"))
 
 def dashboard_client():
-    return Groq(api_key=os.getenv("GROQ_DASHBOARD_KEY"))
+    return _override or get_client(os.getenv("GROQ_DASHBOARD_KEY"))
@@ -0,0 +1,120 @@
+# llm/json_stream.py
+import json
+from typing import List
+
+
+class PlanStreamParser:
+    """
+    Incremental parser for a streamed planner response
+    ({"dashboard_title": ..., "charts": [{...}, {...}]}).
+
+    feed() takes the next text delta and returns the chart objects that
+    were completed by it, so each one can be bound while the rest is
+    still being generated. Only the characters of each delta are
+    scanned; a finished chart is decoded once with json.loads.
+    Text before the first '{' (prose, ```json fences) is ignored.
+    """
+
+    def __init__(self, array_key: str = "charts", title_key: str = "dashboard_title"):
+        self.array_key = array_key
+        self.title_key = title_key
+        self.title = None
+        self.done = False
+
+        self._buffer = []
+        self._length = 0
+        self._stack = []          # open '{' / '[' characters
+        self._started = False
+        self._span = [0, 0]       # [start, end) of the JSON object
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False  # next top-level string is a key
+        self._key = None          # current top-level key
+        self._in_array = False
+        self._item_start = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._buffer)
+
+    @property
+    def document(self) -> str:
+        """The complete JSON object (once done), without surrounding text."""
+        return self.text[self._span[0]:self._span[1]] if self.done else None
+
+    def feed(self, delta: str) -> List[dict]:
+        completed = []
+        if not delta or self.done:
+            return completed
+
+        offset = self._length
+        self._buffer.append(delta)
+        self._length += len(delta)
+        text = None  # joined lazily, only when something needs decoding
+
+        for i, ch in enumerate(delta, offset):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        text = text or self.text
+                        self._top_level_string(text[self._string_start:i + 1])
+                continue
+
+            if not self._started:
+                if ch != "{":
+                    continue
+                self._started = True
+                self._span[0] = i
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._stack.append(ch)
+                if len(self._stack) == 2 and ch == "[" and self._key == self.array_key:
+                    self._in_array = True
+                elif len(self._stack) == 3 and self._in_array and ch == "{":
+                    self._item_start = i
+                elif len(self._stack) == 1:
+                    self._expect_key = True
+            elif ch in "}]":
+                if not self._stack:
+                    continue
+                self._stack.pop()
+                if len(self._stack) == 2 and self._item_start is not None and ch == "}":
+                    text = text or self.text
+                    item = _loads(text[self._item_start:i + 1])
+                    if isinstance(item, dict):
+                        completed.append(item)
+                    self._item_start = None
+                elif len(self._stack) == 1 and self._in_array:
+                    self._in_array = False
+                elif not self._stack:
+                    self.done = True
+                    self._span[1] = i + 1
+                    break
+            elif ch == "," and len(self._stack) == 1:
+                self._expect_key = True
+
+        return completed
+
+    def _top_level_string(self, literal: str):
+        value = _loads(literal)
+        if self._expect_key:
+            self._key = value
+            self._expect_key = False
+        elif self._key == self.title_key and isinstance(value, str):
+            self.title = value
+
+
+def _loads(literal: str):
+    try:
+        return json.loads(literal)
+    except ValueError:
+        return None
@@ -0,0 +1,204 @@
+# llm/replay.py
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Callable, Optional
+from llm.clients import _Chat
+from core.log import get_logger
+
+log = get_logger("llm")
+
+# Request fields that identify a completion. stream / response_format are
+# left out, so a recorded streaming call also replays a plain one and back
+KEY_FIELDS = ("model", "messages", "temperature", "top_p", "max_tokens", "seed")
+
+# Non-streamed recordings replayed as a stream are cut into chunks this long
+REPLAY_CHUNK_CHARS = 24
+# Without recorded timings, the first chunk arrives after this share of the latency
+FIRST_CHUNK_SHARE = 0.3
+
+
+class ReplayMissError(LookupError):
+    """No fixture recorded for a request in replay mode."""
+
+
+def fixture_key(request: dict) -> str:
+    payload = json.dumps(
+        {field: request.get(field) for field in KEY_FIELDS},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReplayClient:
+    """
+    Drop-in for `Groq` (`client.chat.completions.create(...)`) that records
+    completions to fixture files or replays them offline.
+
+    mode="record"  forwards every call to `client` and saves the response
+                   text (and, for streams, each chunk's arrival time) to
+                   <fixtures_dir>/<key>.json
+    mode="replay"  serves fixtures only; a missing one raises
+                   ReplayMissError, unless `fallback(request) -> content`
+                   is given
+
+    Replays are delayed to mimic the provider: `latency` seconds per call,
+    or the recorded duration when None, times `speed`, +/- `jitter` (a
+    fraction). Streams keep their recorded chunk rhythm.
+    """
+
+    MODES = ("record", "replay")
+
+    def __init__(self, fixtures_dir: str, mode: str = "replay", client=None,
+                 latency: Optional[float] = None, speed: float = 1.0, jitter: float = 0.0,
+                 fallback: Callable[[dict], str] = None, sleep=time.sleep, seed: int = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown replay mode '{mode}' (expected one of {self.MODES})")
+        if mode == "record" and client is None:
+            raise ValueError("Record mode needs a live client to forward calls to")
+
+        self.fixtures_dir = fixtures_dir
+        self.mode = mode
+        self.client = client
+        self.latency = latency
+        self.speed = speed
+        self.jitter = jitter
+        self.fallback = fallback
+        self.sleep = sleep
+        self.chat = _Chat(self)
+        self.stats = {"recorded": 0, "replayed": 0, "fallback": 0}
+        self._rng = random.Random(seed)
+        self._fixtures = {}
+        self._lock = threading.Lock()
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.fixtures_dir, f"{key}.json")
+
+    def _call(self, kwargs):
+        key = fixture_key(kwargs)
+        if self.mode == "record":
+            return self._record(key, kwargs)
+        return self._replay(key, kwargs)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def _record(self, key: str, kwargs: dict):
+        started = time.perf_counter()
+        response = self.client.chat.completions.create(**kwargs)
+        if not kwargs.get("stream"):
+            content = response.choices[0].message.content
+            self._save(key, kwargs, content, [], time.perf_counter() - started)
+            return response
+        return self._record_stream(key, kwargs, response, started)
+
+    def _record_stream(self, key: str, kwargs: dict, stream, started: float):
+        chunks = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                chunks.append([round(time.perf_counter() - started, 4), chunk.choices[0].delta.content])
+            yield chunk
+        # Only streams read to the end are complete enough to replay
+        self._save(key, kwargs, "".join(text for _, text in chunks), chunks, time.perf_counter() - started)
+
+    def _save(self, key: str, kwargs: dict, content: str, chunks: list, elapsed: float):
+        fixture = {
+            "request": {field: kwargs[field] for field in KEY_FIELDS if field in kwargs},
+            "stream": bool(kwargs.get("stream")),
+            "content": content,
+            "chunks": chunks,
+            "latency": round(elapsed, 4)
+        }
+        os.makedirs(self.fixtures_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._fixtures[key] = fixture
+            self.stats["recorded"] += 1
+        log.debug("Recorded completion %s (%.2fs)", key[:12], elapsed)
+
+    # ------------------------------------------------------------------
+    # Replay
+    # ------------------------------------------------------------------
+    def load(self, key: str) -> Optional[dict]:
+        with self._lock:
+            fixture = self._fixtures.get(key)
+        if fixture is None and os.path.exists(self._path(key)):
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                fixture = json.load(f)
+            with self._lock:
+                self._fixtures[key] = fixture
+        return fixture
+
+    def _replay(self, key: str, kwargs: dict):
+        fixture = self.load(key)
+        if fixture is not None:
+            counter = "replayed"
+        elif self.fallback is not None:
+            counter = "fallback"
+            fixture = {"content": self.fallback(kwargs), "chunks": [], "latency": 0.0}
+        else:
+            raise ReplayMissError(
+                f"No recorded completion {key[:12]} in {self.fixtures_dir} "
+                "(record it first with GENAI_LLM_MODE=record)"
+            )
+        with self._lock:
+            self.stats[counter] += 1
+
+        total = self._delay(fixture.get("latency", 0.0))
+        if kwargs.get("stream"):
+            return self._replay_stream(fixture, total)
+        self.sleep(total)
+        return _completion(fixture["content"], kwargs.get("model"))
+
+    def _delay(self, recorded: float) -> float:
+        base = recorded if self.latency is None else self.latency
+        if self.jitter:
+            with self._lock:
+                base *= 1 + self._rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, base * self.speed)
+
+    def _replay_stream(self, fixture: dict, total: float):
+        chunks = fixture.get("chunks") or _split(fixture["content"])
+        recorded = chunks[-1][0] if chunks and chunks[-1][0] else None
+        elapsed = 0.0
+        for i, (offset, text) in enumerate(chunks):
+            if recorded:
+                # Same rhythm as the recording, stretched to `total`
+                due = offset / recorded * total
+            else:
+                due = total * (FIRST_CHUNK_SHARE + (1 - FIRST_CHUNK_SHARE) * i / max(len(chunks) - 1, 1))
+            if due > elapsed:
+                self.sleep(due - elapsed)
+                elapsed = due
+            yield _chunk(text)
+
+
+def _split(content: str) -> list:
+    return [[None, content[i:i + REPLAY_CHUNK_CHARS]] for i in range(0, len(content), REPLAY_CHUNK_CHARS)]
+
+
+def _completion(content: str, model: str = None):
+    """Minimal stand-in for the SDK's ChatCompletion."""
+    message = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(
+        id="replay", model=model,
+        choices=[SimpleNamespace(index=0, finish_reason="stop", message=message)]
+    )
+
+
+def _chunk(text: str):
+    """Minimal stand-in for the SDK's ChatCompletionChunk."""
+    return SimpleNamespace(id="replay", choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=text))])
@@ -1,66 +1,307 @@
-from discovery.tmdl_parser import load_tmdl_files
-from discovery.indexer import extract_semantic_index
-from discovery.linguistic import generate_linguistic_metadata
-import shutil
-import os
-from agents.visual_planner import agent_plan_visuals
+import argparse
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from discovery.model_cache import load_semantic_model
+from agents.visual_planner import PlanStream, agent_plan_visuals, agent_plan_visuals_stream
 from compiler.binder import VisualBinder
-from backend.pbip_writer import materialize_visual
+from compiler.concept_retrieval import ConceptRetriever
+from backend.report_pages import is_page_name, register_pages, unregister_pages, page_slug, sync_pages
 from agents.layout_planner import LayoutPlanner
-from config.settings import SEMANTIC_MODEL_PATH, REPORT_PATH
+from agents.rule_planner import RulePlanner
+from core.tracing import Tracer, carry_span, set_tracer, trace_span
+from core.log import configure_logging, get_logger
+from config.settings import (
+    SEMANTIC_MODEL_PATH, REPORT_PAGES_PATH,
+    SEMANTIC_CACHE_PATH, LINGUISTIC_METADATA_PATH, RESOLVER_BACKEND,
+    EMBEDDING_MODEL_PATH, COMPACT_SEMANTIC_MODEL, PLANNER_MAX_CONCEPTS, PLANNER_CONCEPT_TOKENS,
+    PLANNER_STREAMING, RULE_FAST_PATH
+)
 
-def run_genai_pipeline(user_query: str):
-    # --- INFRASTRUCTURE (Step 1 & 2) ---
-    tmdl = load_tmdl_files(SEMANTIC_MODEL_PATH)
-    index = extract_semantic_index(tmdl)
-    linguistic = generate_linguistic_metadata(index)
-    
-    # Get flat list of terms for the LLM to choose from
-    concept_list = [e["terms"][0] for e in linguistic["entities"].values()]
+log = get_logger("pipeline")
+
+# Single-query runs write here (plus page-1-p2, ... when they overflow)
+DEFAULT_PAGE = "page-1"
+
+def load_model():
+    """
+    Steps 1 & 2: parsed tables, semantic index and linguistic metadata.
+    Cached on disk; only changed .tmdl files are re-parsed.
+    """
+    with trace_span("load_model"):
+        return load_semantic_model(
+            SEMANTIC_MODEL_PATH, SEMANTIC_CACHE_PATH, LINGUISTIC_METADATA_PATH,
+            compact=COMPACT_SEMANTIC_MODEL
+        )
+
+def make_binder(linguistic: dict) -> VisualBinder:
+    """
+    Binder with the configured resolver backend. The embedding index is
+    only created when a local model is configured, and loads lazily.
+    """
+    embeddings = None
+    if EMBEDDING_MODEL_PATH:
+        from compiler.embedding_index import EmbeddingIndex, embeddings_path_for
+        embeddings = EmbeddingIndex(
+            linguistic, EMBEDDING_MODEL_PATH, embeddings_path_for(LINGUISTIC_METADATA_PATH)
+        )
+    return VisualBinder(linguistic, backend=RESOLVER_BACKEND, embeddings=embeddings)
+
+def make_retriever(linguistic: dict) -> ConceptRetriever:
+    """Ranks concepts per query so the planner prompt stays within budget."""
+    return ConceptRetriever(
+        linguistic, max_concepts=PLANNER_MAX_CONCEPTS, token_budget=PLANNER_CONCEPT_TOKENS
+    )
+
+def make_fast_path(linguistic: dict) -> RulePlanner:
+    """Rule-based planner for formulaic queries (see agents/rule_planner.py)."""
+    return RulePlanner(linguistic)
+
+def build_dashboard(user_query: str, linguistic: dict, binder: VisualBinder, planner=None,
+                    retriever: ConceptRetriever = None, fast_path: RulePlanner = None) -> tuple:
+    """
+    Steps 3-5: plan, bind and lay out one dashboard.
+    Returns (pages, dashboard_title) where pages is
+    [(page_display_name, planned_visuals)] - more than one page when the
+    dashboard does not fit a single canvas.
+    `planner(query, concepts, schema_summary)` returns (intents, title) or
+    a PlanStream; it defaults to the (streaming) LLM planner and is only
+    called when the rule fast path does not recognize the query.
+    Pass a prebuilt `retriever` / `fast_path` to reuse them across queries.
+    """
+    if planner is None:
+        planner = agent_plan_visuals_stream if PLANNER_STREAMING else agent_plan_visuals
 
     # --- FRONTEND (Step 3 & 4) ---
-    # Convert query into Abstract Intent
-    intents, dashboard_title = agent_plan_visuals(user_query, concept_list)
+    # Formulaic queries are planned by rules: no LLM call, no tokens
+    planned = None
+    if RULE_FAST_PATH:
+        with trace_span("rule_planning"):
+            fast_path = fast_path or make_fast_path(linguistic)
+            planned = fast_path.plan(user_query)
+
+    if planned is not None:
+        with trace_span("binding", visuals=len(planned[0])):
+            # One batched resolution for every concept on the dashboard
+            binder.resolve_intents(planned[0])
+            bound_visuals, dashboard_title = bind_plan(PlanStream.completed(*planned), binder)
+        if not bound_visuals:
+            log.info("Rule plan for '%s' did not bind, asking the LLM", user_query)
+            planned = None
 
-    # --- MIDDLE & BACKEND (Step 5 & 6) ---
-    binder = VisualBinder(linguistic)
-    layout_planner = LayoutPlanner()
-    
+    if planned is None:
+        # Concepts for the LLM to choose from: the most relevant ones only
+        # on large models, plus a short summary of the rest
+        with trace_span("concept_retrieval"):
+            retriever = retriever or make_retriever(linguistic)
+            concept_list, schema_summary = retriever.select(user_query)
+
+        # Convert query into Abstract Intent; each visual is bound while
+        # the rest of the plan is still being generated
+        with trace_span("llm_planning", concepts=len(concept_list)) as span:
+            plan = planner(user_query, concept_list, schema_summary)
+            if isinstance(plan, tuple):
+                # Complete up front: resolve its concepts in one batch
+                binder.resolve_intents(plan[0])
+                plan = PlanStream.completed(*plan)
+            bound_visuals, dashboard_title = bind_plan(plan, binder, span)
+
+    # 5b. Plan Layout ( Split into pages, then assign positions per page )
+    return layout_pages(bound_visuals, dashboard_title), dashboard_title
+
+def bind_plan(plan: PlanStream, binder: VisualBinder, span=None) -> tuple:
+    """
+    Step 5a: binds each planned visual ( Semantic -> Physical ) as soon as
+    the plan yields it. Returns (bound_visuals, dashboard_title).
+    """
     bound_visuals = []
-    
-    # 5a. Bind all visuals ( Semantic -> Physical )
-    for intent in intents:
+    started = time.perf_counter()
+    for intent in plan:
         try:
-            bound = binder.bind(intent)
+            with trace_span("bind_visual", visual=intent.title):
+                bound = binder.bind(intent)
             bound_visuals.append(bound)
         except Exception as e:
-            print(f"FAILED to bind visual '{intent.title}': {e}")
-            
-    # 5b. Plan Layout ( Assign positions )
-    planned_visuals = layout_planner.plan_layout(bound_visuals, dashboard_title=dashboard_title)
+            log.error("FAILED to bind visual '%s': %s", intent.title, e)
+            continue
+        if len(bound_visuals) == 1:
+            first_visual = time.perf_counter() - started
+            log.debug("First visual bound after %.2fs", first_visual)
+            if span is not None:
+                span.attributes["first_visual_ms"] = round(first_visual * 1000, 1)
+    return bound_visuals, plan.title
+
+def layout_pages(bound_visuals: list, dashboard_title: str) -> list:
+    """Paginates and lays out each page in parallel: [(display_name, planned_visuals)]."""
+    planner = LayoutPlanner()
+    chunks = planner.paginate(bound_visuals)
+    titles = [
+        dashboard_title if len(chunks) == 1 else f"{dashboard_title} ({i}/{len(chunks)})"
+        for i in range(1, len(chunks) + 1)
+    ]
+
+    def _layout(item):
+        title, chunk = item
+        with trace_span("layout", page=title, visuals=len(chunk)):
+            return title, planner.plan_layout(chunk, dashboard_title=title)
+
+    if len(chunks) == 1:
+        return [_layout((titles[0], chunks[0]))]
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        return list(pool.map(carry_span(_layout), zip(titles, chunks)))
+
+def write_dashboard(page_name: str, pages: list) -> dict:
+    """
+    Step 6: writes every page of one dashboard (in parallel) and prunes
+    continuation pages a longer previous run left behind.
+    Does not touch pages.json.
+    """
+    with trace_span("writing", pages=len(pages), visuals=sum(len(v) for _, v in pages)):
+        return sync_pages(REPORT_PAGES_PATH, page_name, pages)
+
+def run_genai_pipeline(user_query: str):
+    # --- INFRASTRUCTURE (Step 1 & 2) ---
+    tmdl, index, linguistic = load_model()
+
+    # --- FRONTEND & MIDDLE (Step 3 - 5) ---
+    binder = make_binder(linguistic)
+    pages, dashboard_title = build_dashboard(user_query, linguistic, binder)
 
     # 6. Materialize ( Physical -> PBIP )
-    # Clear existing visuals first
-    if os.path.exists(REPORT_PATH):
-        print(f"[PIPELINE] Clearing visuals at {REPORT_PATH}")
-        for filename in os.listdir(REPORT_PATH):
-            file_path = os.path.join(REPORT_PATH, filename)
-            try:
-                if os.path.isfile(file_path) or os.path.islink(file_path):
-                    os.unlink(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-            except Exception as e:
-                print(f"[PIPELINE] Failed to delete {file_path}. Reason: {e}")
-    else:
-        os.makedirs(REPORT_PATH, exist_ok=True)
-
-    for i, bound in enumerate(planned_visuals, 1):
+    # Incremental: only visual.json files whose content changed are touched
+    try:
+        written = write_dashboard(DEFAULT_PAGE, pages)
+        unregister_pages(REPORT_PAGES_PATH, written["stale"])
+        register_pages(REPORT_PAGES_PATH, written["pages"])
+        log.info(
+            "Successfully generated %d visuals on %d page(s)",
+            sum(len(visuals) for _, visuals in pages), len(pages)
+        )
+    except Exception as e:
+        log.error("Failed to generate visuals: %s", e)
+
+def load_batch_queries(path: str) -> List[dict]:
+    """
+    Reads batch requests from .jsonl ({"query": ..., "page": ...} per line)
+    or .csv (a `query` column, optional `page` column).
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    return [row for row in rows if row.get("query")]
+
+def batch_page_names(requests: List[dict]) -> List[str]:
+    """
+    Unique, stable page folder per request. Explicit `page` names are
+    kept (first request wins); generated and repeated names get the
+    first free -<n> suffix. Invalid explicit names (see is_page_name)
+    are passed through as text and never reserved: run_batch_pipeline
+    rejects those requests.
+    """
+    reserved = {request["page"] for request in requests if is_page_name(request.get("page"))}
+    used = set()
+    names = []
+    for i, request in enumerate(requests, 1):
+        explicit = request.get("page")
+        if explicit and not is_page_name(explicit):
+            names.append(str(explicit))
+            continue
+        name = explicit or f"genai-{page_slug(request['query'])}"
+        if name in used or (not explicit and name in reserved):
+            base, n = name, i
+            while name in used or name in reserved:
+                name = f"{base}-{n}"
+                n += 1
+        used.add(name)
+        names.append(name)
+    return names
+
+def run_batch_pipeline(requests: List[dict], max_concurrency: int = 4) -> dict:
+    """
+    Generates one dashboard page per request.
+    The semantic model and resolver index are built once; planning,
+    binding and writing for each page run concurrently (at most
+    `max_concurrency` LLM calls in flight), so wall time tracks the
+    slowest request rather than the sum of all of them.
+    Returns {page_name: error or None}.
+    """
+    tmdl, index, linguistic = load_model()
+    # Shared by every worker: the resolver serializes its memo and lazy
+    # scorer state behind its own lock, retriever / fast path are read-only
+    binder = make_binder(linguistic)
+    retriever = make_retriever(linguistic)
+    fast_path = make_fast_path(linguistic) if RULE_FAST_PATH else None
+
+    pages = list(zip(batch_page_names(requests), requests))
+
+    def _run(page):
+        page_name, request = page
+        explicit = request.get("page")
+        if explicit and not is_page_name(explicit):
+            # Same rule as the service: never a path outside the pages folder
+            log.error("Rejected page %r: lowercase letters, digits and '-' only", explicit)
+            return None, f"Invalid page name {explicit!r} (lowercase letters, digits and '-' only)"
+        query = request["query"]
         try:
-            materialize_visual(bound, REPORT_PATH, i)
-            print(f"Successfully generated: {bound.title}")
+            with trace_span("dashboard", page=page_name):
+                dashboard_pages, _ = build_dashboard(
+                    query, linguistic, binder, retriever=retriever, fast_path=fast_path
+                )
+                return write_dashboard(page_name, dashboard_pages), None
         except Exception as e:
-            print(f"Failed to generate visual {bound.title}: {e}")
+            log.error("Failed page '%s': %s", page_name, e)
+            return None, str(e)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        outcomes = list(pool.map(carry_span(_run), pages))
+
+    results = {name: error for (name, _), (_, error) in zip(pages, outcomes)}
+    written = [w for w, _ in outcomes if w]
+    unregister_pages(REPORT_PAGES_PATH, [name for w in written for name in w["stale"]])
+    register_pages(REPORT_PAGES_PATH, [name for w in written for name in w["pages"]])
+    errors = [error for _, error in outcomes]
+
+    log.info("%d/%d dashboards generated", sum(e is None for e in errors), len(pages))
+    return results
+
+def make_tracer(args):
+    """Tracer for the CLI flags, or None when no tracing flag is given (--trace-memory counts)."""
+    if not (args.trace or args.chrome_trace or args.profile or args.trace_memory):
+        return None
+    return Tracer(profile=[s for s in args.profile.split(",") if s], trace_memory=args.trace_memory)
 
 if __name__ == "__main__":
-    run_genai_pipeline("Overall sales overview with product analysis")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate Power BI dashboards from natural language.")
+    parser.add_argument("query", nargs="?", default="Overall sales overview with product analysis")
+    parser.add_argument("--batch", help="CSV or JSONL file of queries (one page per query)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--trace", help="Write stage spans as JSON to this path")
+    parser.add_argument("--chrome-trace", help="Write a Chrome/Perfetto trace to this path")
+    parser.add_argument("--profile", default="", help="Comma-separated stages to run under cProfile")
+    parser.add_argument("--trace-memory", action="store_true", help="Record tracemalloc peaks for profiled stages (or the whole run)")
+    parser.add_argument("--log-level", help="INFO, DEBUG, TRACE, ... (default: $GENAI_LOG_LEVEL or INFO)")
+    parser.add_argument("--log-json", help="Also write JSON log lines to this file")
+    args = parser.parse_args()
+
+    configure_logging(level=args.log_level, json_path=args.log_json)
+
+    tracer = make_tracer(args)
+    if tracer:
+        set_tracer(tracer)
+
+    with trace_span("pipeline"):
+        if args.batch:
+            run_batch_pipeline(load_batch_queries(args.batch), max_concurrency=args.concurrency)
+        else:
+            run_genai_pipeline(args.query)
+
+    if tracer:
+        tracer.print_summary()
+        if args.trace:
+            tracer.to_json(args.trace)
+        if args.chrome_trace:
+            tracer.to_chrome_trace(args.chrome_trace)
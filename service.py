@@ -0,0 +1,315 @@
+# service.py
+"""
+Resident dashboard service (ASGI).
+
+    uvicorn service:app --port 8000
+    python service.py --port 8000
+
+POST /dashboards  {"query": "...", "page": "optional-page-name", "write": true}
+GET  /health
+
+The parsed semantic model, resolver index and pooled LLM clients stay in
+memory between requests. When TMDL files change, only those tables are
+re-indexed, in place (discovery/watcher.py).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable
+from backend.report_pages import is_page_name, page_slug, register_pages, sync_pages, unregister_pages
+from config.settings import REPORT_PAGES_PATH, SEMANTIC_MODEL_PATH
+from core.log import configure_logging, get_logger
+from core.tracing import trace_span
+from discovery.watcher import IncrementalModel, TableWatcher
+from pipeline import build_dashboard, load_model, make_binder, make_fast_path, make_retriever
+
+log = get_logger("service")
+
+RELOAD_CHECK_INTERVAL = 2.0  # seconds between TMDL change checks
+MAX_CONCURRENCY = int(os.getenv("GENAI_SERVICE_CONCURRENCY", "4"))
+
+
+class ModelSnapshot:
+    """
+    One generation of the warm model. Only `retriever`, `fast_path` and
+    `generation` are per snapshot: tables / index / linguistic and the
+    binder's resolver are shared by every generation and patched in place
+    (under the model lock the resolver takes on every lookup), so a request
+    that outlives a patch sees the new tables through them. A patch then
+    publishes a new snapshot with a rebuilt retriever and fast path.
+    """
+
+    __slots__ = (
+        "tables", "index", "linguistic", "binder", "retriever", "fast_path", "generation"
+    )
+
+    def __init__(self, tables, index, linguistic, binder, retriever, fast_path, generation):
+        self.tables = tables
+        self.index = index
+        self.linguistic = linguistic
+        self.binder = binder
+        self.retriever = retriever
+        self.fast_path = fast_path
+        self.generation = generation
+
+
+def default_page_name(query: str) -> str:
+    """genai-<slug>-<hash>: the slug is truncated, the hash keeps queries apart."""
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+    return f"genai-{page_slug(query)}-{digest}"
+
+
+class DashboardService:
+    """
+    Warm pipeline state shared by every request.
+
+    model_loader  () -> (tables, index, linguistic); defaults to pipeline.load_model
+    planner       (query, concepts, schema_summary) -> (intents, title) or a PlanStream;
+                  defaults to the pipeline's (streaming) LLM planner
+    """
+
+    def __init__(
+        self,
+        model_loader: Callable = load_model,
+        planner: Callable = None,
+        tmdl_root: str = SEMANTIC_MODEL_PATH,
+        pages_dir: str = REPORT_PAGES_PATH,
+        reload_interval: float = RELOAD_CHECK_INTERVAL
+    ):
+        self.model_loader = model_loader
+        self.planner = planner
+        self.tmdl_root = tmdl_root
+        self.pages_dir = pages_dir
+        self.reload_interval = reload_interval
+        self._snapshot = None
+        self._watcher = None
+        self._checked = 0.0
+        self._reload_lock = threading.Lock()
+        # pages.json is read-modify-write
+        self._pages_lock = threading.Lock()
+        # One writer per page folder (page.json, visuals/)
+        self._page_locks = {}
+        self._page_locks_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Warm model
+    # ------------------------------------------------------------------
+    def model(self) -> ModelSnapshot:
+        """Current snapshot, patched first if the TMDL files changed."""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._checked < self.reload_interval:
+            return snapshot
+
+        with self._reload_lock:
+            self._checked = time.monotonic()
+            if self._snapshot is None:
+                return self._load()
+            try:
+                self._watcher.poll()
+            except Exception:
+                # Half-saved files are parsed again on the next check
+                log.exception("Incremental re-index failed")
+            return self._snapshot
+
+    def _load(self) -> ModelSnapshot:
+        with trace_span("model_load"):
+            tables, index, linguistic = self.model_loader()
+            binder = make_binder(linguistic)
+            retriever = make_retriever(linguistic)
+            fast_path = make_fast_path(linguistic)
+
+        # Wired up before the snapshot is published: lookups share the model's lock
+        incremental = IncrementalModel(self.tmdl_root, tables, index, linguistic)
+        incremental.register_resolver(binder.resolver)
+        self._watcher = TableWatcher(incremental, on_change=self._patched)
+
+        snapshot = self._snapshot = ModelSnapshot(tables, index, linguistic, binder, retriever, fast_path, 1)
+        log.info("Semantic model loaded (%d entities)", len(linguistic["entities"]))
+        return snapshot
+
+    def _patched(self, result: dict):
+        previous = self._snapshot
+        with trace_span("model_patch", tables=len(result["tables"])):
+            retriever = make_retriever(previous.linguistic)
+            fast_path = make_fast_path(previous.linguistic)
+        self._snapshot = ModelSnapshot(
+            previous.tables, previous.index, previous.linguistic, previous.binder, retriever, fast_path,
+            previous.generation + 1
+        )
+        log.info("Semantic model patched (generation %d): %s", previous.generation + 1, result["tables"])
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def _page_lock(self, page_name: str) -> threading.Lock:
+        with self._page_locks_lock:
+            return self._page_locks.setdefault(page_name, threading.Lock())
+
+    def generate(self, query: str, page: str = None, write: bool = True) -> dict:
+        if page is not None and not is_page_name(page):
+            raise ValueError(f"Invalid page name {page!r} (lowercase letters, digits and '-' only)")
+        snapshot = self.model()
+        with trace_span("dashboard", query=query):
+            pages, dashboard_title = build_dashboard(
+                query, snapshot.linguistic, snapshot.binder, planner=self.planner,
+                retriever=snapshot.retriever, fast_path=snapshot.fast_path
+            )
+
+            result = {
+                "title": dashboard_title,
+                "model_generation": snapshot.generation,
+                "pages": [
+                    {
+                        "title": page_title,
+                        "visuals": [
+                            {
+                                "name": v.visual_name,
+                                "type": v.visual_type,
+                                "title": v.title,
+                                "layout": v.layout.model_dump() if v.layout else None
+                            }
+                            for v in visuals
+                        ]
+                    }
+                    for page_title, visuals in pages
+                ]
+            }
+
+            if write:
+                page_name = page or default_page_name(query)
+                with trace_span("writing", pages=len(pages)), self._page_lock(page_name):
+                    written = sync_pages(self.pages_dir, page_name, pages)
+                    with self._pages_lock:
+                        unregister_pages(self.pages_dir, written["stale"])
+                        register_pages(self.pages_dir, written["pages"])
+                for entry, name in zip(result["pages"], written["pages"]):
+                    entry["name"] = name
+        return result
+
+
+# ----------------------------------------------------------------------
+# ASGI
+# ----------------------------------------------------------------------
+class DashboardApp:
+    """
+    Minimal ASGI application over a DashboardService. Requests run on
+    worker threads; at most `max_concurrency` dashboards are generated
+    at a time, the rest wait.
+    """
+
+    def __init__(self, service: DashboardService = None, max_concurrency: int = MAX_CONCURRENCY):
+        self._service = service
+        self.max_concurrency = max_concurrency
+        self._slots = None
+
+    @property
+    def service(self) -> DashboardService:
+        if self._service is None:
+            self._service = DashboardService()
+        return self._service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        method, path = scope["method"], scope["path"].rstrip("/")
+        if path == "/health" and method == "GET":
+            snapshot = self.service._snapshot
+            await _respond(send, 200, {
+                "status": "ok",
+                "model_generation": snapshot.generation if snapshot else None
+            })
+        elif path == "/dashboards" and method == "POST":
+            await self._dashboards(receive, send)
+        elif path in ("/health", "/dashboards"):
+            await _respond(send, 405, {"error": "method not allowed"})
+        else:
+            await _respond(send, 404, {"error": "not found"})
+
+    async def _dashboards(self, receive, send):
+        try:
+            body = json.loads(await _read_body(receive) or b"{}")
+        except ValueError:
+            await _respond(send, 400, {"error": "invalid JSON body"})
+            return
+        query = body.get("query") if isinstance(body, dict) else None
+        if not query or not isinstance(query, str):
+            await _respond(send, 400, {"error": "'query' is required"})
+            return
+
+        page, write = body.get("page"), body.get("write", True)
+        if page is not None and not is_page_name(page):
+            await _respond(send, 400, {"error": "'page' must be lowercase letters, digits and '-'"})
+            return
+        if not isinstance(write, bool):
+            await _respond(send, 400, {"error": "'write' must be true or false"})
+            return
+
+        async with self._slots:
+            try:
+                result = await asyncio.to_thread(self.service.generate, query, page, write)
+            except Exception as e:
+                log.exception("Dashboard request failed")
+                await _respond(send, 500, {"error": str(e)})
+                return
+        await _respond(send, 200, result)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    # Warm the model before the first request arrives
+                    await asyncio.to_thread(self.service.model)
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _respond(send, status: int, payload: dict):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+app = DashboardApp()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve dashboard generation over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", help="INFO, DEBUG, TRACE, ... (default: $GENAI_LOG_LEVEL or INFO)")
+    args = parser.parse_args()
+
+    configure_logging(level=args.log_level)
+    import uvicorn  # only needed to run the server standalone
+    uvicorn.run(app, host=args.host, port=args.port, log_config=None)
@@ -46,7 +46,7 @@ try:
     materialize_visual(mock_visual, OUTPUT_DIR, 1002)
 
     print(f"\n[SUCCESS] Card visual generated successfully.")
-    print(f"Check folder: GenAI_Visual_1002_...")
+    print(f"Check folder: GenAI_Visual_<content hash>")
     print(f"Verify 'visual.json' uses 'card' and contains a single measure binding.")
 
 except Exception as e:
@@ -0,0 +1,66 @@
+import json
+from discovery.tmdl_parser import load_tmdl_files, load_semantic_definition
+from benchmarks.synthetic_tmdl import write_synthetic_model
+from benchmarks.bench_stages import compare, run, scaling, synthetic_intents
+
+STAGES = [
+    "load_tmdl_files", "extract_semantic_index", "generate_linguistic_metadata",
+    "binder_build", "resolve_concept", "bind", "plan_layout", "materialize_visual"
+]
+
+
+def test_synthetic_model_round_trips(tmp_path):
+    model = write_synthetic_model(str(tmp_path / "Synthetic.SemanticModel"), 500, columns_per_table=40, seed=3)
+    tables = load_tmdl_files(model["tables_path"])
+
+    assert len(tables) == model["tables"] == 13
+    assert sum(len(t["columns"]) for t in tables.values()) == model["columns"] == 500
+    assert sum(len(t["measures"]) for t in tables.values()) == model["measures"] > 0
+
+    definition = load_semantic_definition(model["definition"])
+    assert len(definition.relationships) == model["relationships"] > 0
+    for rel in definition.relationships:
+        assert rel.to_column in definition.tables[rel.to_table].columns
+        assert rel.from_column in definition.tables[rel.from_table].columns
+
+    # Same seed, same model
+    again = write_synthetic_model(str(tmp_path / "Again.SemanticModel"), 500, columns_per_table=40, seed=3)
+    assert load_tmdl_files(again["tables_path"]) == tables
+
+
+def test_intents_name_real_columns(tmp_path):
+    model = write_synthetic_model(str(tmp_path / "m"), 200)
+    tables = load_tmdl_files(model["tables_path"])
+    columns = {c.lower() for t in tables.values() for c in t["columns"]}
+    intents = synthetic_intents(tables, 12)
+
+    assert len(intents) == 12
+    assert all(c in columns for intent in intents for c in intent.concepts)
+
+
+def test_stage_report(tmp_path):
+    report = run([10, 200], visuals=6, workdir=str(tmp_path))
+    json.dumps(report)
+
+    assert [r["columns"] for r in report["results"]] == [10, 200]
+    for result in report["results"]:
+        assert list(result["stages"]) == STAGES
+        for stats in result["stages"].values():
+            assert stats["items"] > 0 and stats["seconds"] >= 0 and stats["peak_kb"] >= 0
+    assert set(report["scaling"]) <= set(STAGES)
+
+    slower = json.loads(json.dumps(report))
+    for stats in slower["results"][1]["stages"].values():
+        stats["seconds"] = stats["seconds"] * 3 + 1
+    regressions = compare(slower, report)
+    assert {r["stage"] for r in regressions} == set(STAGES)
+    assert all(r["columns"] == 200 for r in regressions)
+    assert compare(report, slower) == []
+
+
+def test_scaling_slope():
+    results = [
+        {"columns": n, "stages": {"linear": {"seconds": n * 1e-6}, "flat": {"seconds": 0.002}}}
+        for n in (10, 100, 1000)
+    ]
+    assert scaling(results) == {"linear": 1.0, "flat": 0.0}
@@ -0,0 +1,89 @@
+import os
+import random
+from difflib import SequenceMatcher
+from compiler.concept_index import ConceptIndex, SUBSTRING_BONUS, normalize_term
+from compiler.resolver import NUMERIC_CONCEPTS, ConceptResolver, _numeric_measure
+from discovery.indexer import extract_semantic_index
+from discovery.linguistic import generate_linguistic_metadata
+from discovery.tmdl_parser import load_tmdl_files
+
+TABLES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "PowerBI", "PowerBI-GenAI-Dashboard.SemanticModel", "definition", "tables"
+)
+
+WORDS = ["amount", "amounts", "sales", "sale", "country", "region", "product", "products",
+         "date", "order date", "ship date", "customer", "price", "unit price", "cost",
+         "boxes", "boxes shipped", "sales person", "salesperson", "revenue", "qty", "quantity"]
+
+
+def linear_scan(concept_norm, linguistic, accept=None):
+    """The resolver's original full scan: first occurrence with the highest score wins."""
+    best, best_score = None, 0.0
+    for entity_id, entity in linguistic["entities"].items():
+        binding = entity.get("binding", {})
+        for term in entity.get("terms", []):
+            term_text = term.get("term") if isinstance(term, dict) else term
+            weight = term.get("weight", 1.0) if isinstance(term, dict) else 1.0
+            if not term_text:
+                continue
+            term_norm = normalize_term(term_text)
+            score = SequenceMatcher(None, concept_norm, term_norm).ratio()
+            if concept_norm in term_norm or term_norm in concept_norm:
+                score += SUBSTRING_BONUS
+            final_score = score * weight
+            if accept is not None and not accept(binding):
+                continue
+            if final_score > best_score:
+                best, best_score = (entity_id, binding), final_score
+    return best and (best[0], best_score)
+
+
+def random_linguistic(rng, entities=60):
+    linguistic = {"entities": {}}
+    for i in range(entities):
+        terms = []
+        for _ in range(rng.randint(0, 4)):
+            text = rng.choice(WORDS) + rng.choice(["", "", " total", "s", " id"])
+            terms.append({"term": text, "weight": rng.choice([1.0, 0.9, 0.75, 0.5, 0.0])}
+                         if rng.random() < 0.8 else text)
+        linguistic["entities"][f"e{i}"] = {
+            "terms": terms,
+            "binding": {
+                "table": "T", "column": f"c{i}",
+                "measure": rng.random() < 0.4,
+                "dataType": rng.choice(["string", "int64", "double", "dateTime"])
+            }
+        }
+    return linguistic
+
+
+def test_index_matches_a_linear_scan():
+    rng = random.Random(11)
+    concepts = [normalize_term(w) for w in WORDS] + ["amountbycountry", "x", "shipped", "zzz"]
+    for _ in range(10):
+        linguistic = random_linguistic(rng)
+        for top_k in (1, 3, 8):
+            index = ConceptIndex(linguistic, top_k=top_k)
+            for concept in concepts:
+                accept = _numeric_measure if concept in NUMERIC_CONCEPTS else None
+                hit = index.best_match(concept, accept)
+                assert (hit and (hit[2], hit[1])) == linear_scan(concept, linguistic, accept), concept
+
+
+def test_resolver_matches_a_linear_scan_on_the_sample_model():
+    linguistic = generate_linguistic_metadata(extract_semantic_index(load_tmdl_files(TABLES)))
+    resolver = ConceptResolver(linguistic)
+    concepts = ["amount", "country", "product", "boxes shipped", "sales person", "date",
+                "revenue", "price", "geography", "team", "nothing"]
+    for concept, result in resolver.resolve_concepts(concepts).items():
+        concept_norm = normalize_term(concept)
+        accept = _numeric_measure if concept_norm in NUMERIC_CONCEPTS else None
+        expected = linear_scan(concept_norm, linguistic, accept)
+        if not expected or expected[1] < 0.45:
+            assert isinstance(result, Exception), concept
+        else:
+            entity_id, score = expected
+            binding = linguistic["entities"][entity_id]["binding"]
+            assert (result["entity"], result["column"]) == (binding["table"], binding["column"])
+            assert result["score"] == round(score, 3)
@@ -0,0 +1,85 @@
+import os
+import time
+from compiler.concept_retrieval import ConceptRetriever, estimate_tokens
+from discovery.indexer import extract_semantic_index
+from discovery.linguistic import generate_linguistic_metadata
+from discovery.tmdl_parser import load_tmdl_files
+
+TABLES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "PowerBI", "PowerBI-GenAI-Dashboard.SemanticModel", "definition", "tables"
+)
+
+WORDS = ["order", "ship", "customer", "region", "product", "store", "price", "margin", "channel", "week"]
+
+
+def synthetic_linguistic(columns: int) -> dict:
+    tables = {}
+    for t in range(columns // 50):
+        cols = {
+            f"{WORDS[(t + c) % len(WORDS)].title()} {WORDS[c % 7].title()} {c}": {
+                "dataType": "double" if c % 3 == 0 else "string",
+                "summarizeBy": "sum" if c % 3 == 0 else "none"
+            }
+            for c in range(50)
+        }
+        tables[f"Table_{t}"] = {"columns": cols, "measures": {}}
+    tables["Finance"] = {
+        "columns": {"Gross Bookings": {"dataType": "double", "summarizeBy": "sum"}},
+        "measures": {}
+    }
+    return generate_linguistic_metadata(extract_semantic_index(tables))
+
+
+def prompt_tokens(concepts, summary):
+    return estimate_tokens(str(concepts)) + estimate_tokens(summary)
+
+
+def test_small_models_pass_through():
+    linguistic = generate_linguistic_metadata(extract_semantic_index(load_tmdl_files(TABLES)))
+    concepts, summary = ConceptRetriever(linguistic).select("sales by country")
+    assert concepts == [e["terms"][0] for e in linguistic["entities"].values()]
+    assert summary == ""
+
+
+def test_relevant_concepts_first_and_prompt_stays_flat():
+    sizes = {}
+    for columns in (2000, 20000):
+        retriever = ConceptRetriever(synthetic_linguistic(columns), max_concepts=40, token_budget=800)
+        concepts, summary = retriever.select("gross bookings by customer region")
+
+        assert concepts[0] == "gross bookings"
+        assert len(concepts) <= 40
+        assert "customer" in concepts[1] and "region" in concepts[1]
+        assert summary.startswith("Also available")
+        sizes[columns] = prompt_tokens(concepts, summary)
+        assert sizes[columns] <= 800 * 1.1
+
+    # 10x the columns, about the same prompt
+    assert abs(sizes[20000] - sizes[2000]) < 0.2 * sizes[2000]
+
+
+def test_prefixes_and_broad_queries():
+    retriever = ConceptRetriever(synthetic_linguistic(2000), max_concepts=30, token_budget=600)
+    assert retriever.select("gross book")[0][0] == "gross bookings"
+
+    # Nothing matches: still a useful, bounded list (measures first)
+    concepts, summary = retriever.select("overview")
+    assert 0 < len(concepts) <= 30
+    assert summary
+
+
+def test_broad_queries_do_not_scale_with_the_model():
+    timings = {}
+    for columns in (2000, 20000):
+        retriever = ConceptRetriever(synthetic_linguistic(columns), max_concepts=30, token_budget=600)
+        runs = []
+        for _ in range(20):
+            start = time.perf_counter()
+            concepts, summary = retriever.select("overview")
+            runs.append(time.perf_counter() - start)
+        timings[columns] = min(runs)
+        assert f"({columns + 1 - len(concepts)} more fields" in summary
+
+    # Nothing matches "overview": top-up and summary cost the same at 10x the columns
+    assert timings[20000] < 3 * timings[2000], timings
@@ -0,0 +1,160 @@
+import threading
+import numpy as np
+from compiler.embedding_index import EmbeddingIndex
+from compiler.resolver import ConceptResolver
+
+# ---------------------------------------------------------
+# Toy "model": words sharing a meaning share a dimension
+# ---------------------------------------------------------
+MEANINGS = {
+    "income": 0, "revenue": 0, "sales": 0,
+    "nation": 1, "country": 1,
+    "client": 2, "customer": 2,
+}
+
+
+def toy_encoder(texts):
+    vectors = np.zeros((len(texts), 4), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in text.split():
+            vectors[i, MEANINGS.get(word, 3)] += 1.0
+    return vectors
+
+
+LINGUISTIC = {
+    "entities": {
+        "Sales.country": {
+            "binding": {"table": "Sales", "column": "Country", "measure": False, "dataType": "string"},
+            "terms": ["country"]
+        },
+        "Sales.revenue": {
+            "binding": {"table": "Sales", "column": "Revenue", "measure": True, "dataType": "double"},
+            "terms": ["revenue", "sales"]
+        },
+        "Sales.customer": {
+            "binding": {"table": "Sales", "column": "Customer", "measure": False, "dataType": "string"},
+            "terms": ["customer"]
+        }
+    }
+}
+
+
+def test_vectors_are_persisted_and_memory_mapped(tmp_path):
+    path = str(tmp_path / "linguistic_metadata.embeddings.npy")
+    calls = []
+
+    def counting_encoder(texts):
+        calls.append(list(texts))
+        return toy_encoder(texts)
+
+    index = EmbeddingIndex(LINGUISTIC, "toy", path, encoder=counting_encoder)
+    assert calls == []  # lazy: nothing encoded before the first search
+
+    hits = index.search("nation", k=2)
+    assert hits[0][1] == "Sales.country"
+    assert len(hits) == 2
+
+    # Second index reuses the .npy instead of re-encoding the terms
+    calls.clear()
+    reloaded = EmbeddingIndex(LINGUISTIC, "toy", path, encoder=counting_encoder)
+    assert isinstance(reloaded.vectors(), np.memmap)
+    assert calls == []
+    assert reloaded.search("client", k=1)[0][1] == "Sales.customer"
+
+
+def test_resolver_falls_back_to_embeddings():
+    embeddings = EmbeddingIndex(LINGUISTIC, encoder=toy_encoder)
+    resolver = ConceptResolver(LINGUISTIC, embeddings=embeddings)
+
+    # "nation" has no usable string match (score < 0.45)
+    assert resolver.resolve("nation")["column"] == "Country"
+    # String matches still win without consulting the model
+    assert resolver.resolve("country")["score"] >= 1.0
+
+
+def test_accepted_fuzzy_matches_do_not_consult_embeddings():
+    searched = []
+
+    def misleading_encoder(texts):
+        # The model would send "countries" to Customer
+        vectors = toy_encoder([t.replace("countries", "client") for t in texts])
+        searched.extend(texts)
+        return vectors
+
+    embeddings = EmbeddingIndex(LINGUISTIC, encoder=misleading_encoder)
+    resolver = ConceptResolver(LINGUISTIC, embeddings=embeddings)
+
+    match = resolver.resolve("countries")
+    assert match["column"] == "Country"
+    assert 0.45 <= match["score"] < 1.0
+    assert "countries" not in searched
+
+
+def test_search_during_refresh_sees_one_generation():
+    encoding_new_terms, release = threading.Event(), threading.Event()
+
+    def gated_encoder(texts):
+        if "income" in texts:
+            encoding_new_terms.set()
+            release.wait(5)
+        return toy_encoder(texts)
+
+    index = EmbeddingIndex(LINGUISTIC, encoder=gated_encoder)
+    assert index.search("client", k=1)[0][1] == "Sales.customer"
+
+    # New first entity: every row shifts in the refreshed term list
+    patched = {"entities": {
+        "Sales.income": {
+            "binding": {"table": "Sales", "column": "Income", "measure": True, "dataType": "double"},
+            "terms": ["income"]
+        },
+        **LINGUISTIC["entities"]
+    }}
+    refresher = threading.Thread(target=index.refresh, args=(patched,))
+    refresher.start()
+    try:
+        assert encoding_new_terms.wait(5)
+        # Mid-refresh: still the previous terms with their own vectors
+        assert index.search("client", k=1)[0][1] == "Sales.customer"
+        assert len(index.terms) == 4
+    finally:
+        release.set()
+        refresher.join()
+
+    assert len(index.terms) == 5
+    assert index.search("client", k=1)[0][1] == "Sales.customer"
+    assert index.vectors().shape[0] == 5
+
+
+def test_update_encodes_only_new_terms(tmp_path):
+    path = str(tmp_path / "linguistic_metadata.embeddings.npy")
+    calls = []
+
+    def counting_encoder(texts):
+        calls.append(list(texts))
+        return toy_encoder(texts)
+
+    index = EmbeddingIndex(LINGUISTIC, "toy", path, encoder=counting_encoder)
+    assert index.search("nation", k=1)[0][1] == "Sales.country"
+
+    calls.clear()
+    income = {
+        "binding": {"table": "Sales", "column": "Income", "measure": True, "dataType": "double"},
+        "terms": ["income", "sales"]
+    }
+    index.update(removed=["Sales.country"], added={"Sales.income": income})
+    assert calls == [["income"]]
+    calls.clear()
+    assert all(hit[1] != "Sales.country" for hit in index.search("nation", k=3))
+    # Same meaning as revenue in the toy model; "sales" row is shared by both
+    assert {hit[1] for hit in index.search("income", k=2)} == {"Sales.revenue", "Sales.income"}
+
+    # A cold start on the patched metadata reuses the stored rows by text
+    calls.clear()
+    patched = {"entities": {
+        key: entity for key, entity in LINGUISTIC["entities"].items() if key != "Sales.country"
+    }}
+    patched["entities"]["Sales.income"] = income
+    reloaded = EmbeddingIndex(patched, "toy", path, encoder=counting_encoder)
+    assert reloaded.search("client", k=1)[0][1] == "Sales.customer"
+    assert calls == [["income"], ["client"]]  # the new term, then the query
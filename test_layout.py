@@ -45,19 +45,50 @@ def test_layout_logic():
              if l.y != 10:
                  print("!! FAIL: Header should be at y=10")
         elif v.visual_type == "card":
-            if l.width != 1240:
-                print(f"!! FAIL: Card width should be 1240, got {l.width}")
-            if l.height != 110:
-                print(f"!! FAIL: Card height should be 110, got {l.height}")
-            if l.x != 20:
-                 print(f"!! FAIL: Card should be centered at x=20, got {l.x}")
+            if l.height < 90:
+                print(f"!! FAIL: Card height should be at least 90, got {l.height}")
+            if l.y != 70:
+                 print(f"!! FAIL: Cards should share the first row at y=70, got {l.y}")
         else:
-            if l.y <= 200: # Header (50) + Card (150) + Padding
+            if l.y <= 180: # Header (50) + Card row (110) + Padding
                  print(f"!! FAIL: Chart potentially overlapping or too high at y={l.y}")
                  
     # Check overlaps?
     # Simplified check
     print("\nTest Complete.")
 
+def test_large_dashboard_splits_into_pages(tmp_path):
+    import json
+    from agents.layout_engine import size_rule
+    from backend.report_pages import register_pages, sync_pages, unregister_pages
+
+    planner = LayoutPlanner()
+    visuals = [create_mock_visual("card", f"KPI {i}") for i in range(2)]
+    visuals += [create_mock_visual("bar", f"Chart {i}") for i in range(10)]
+
+    pages = planner.paginate(visuals)
+    assert len(pages) > 1
+    assert sorted(v.title for page in pages for v in page) == sorted(v.title for v in visuals)
+    for page in pages:
+        planned = planner.plan_layout(page, dashboard_title="Big")
+        assert len(planned) == len(page) + 1  # nothing left out, plus header
+        for v in planned:
+            min_w, min_h = size_rule(v.visual_type)["min"]
+            assert v.layout.width >= min_w and v.layout.height >= min_h
+            assert v.layout.y + v.layout.height <= planner.CANVAS_HEIGHT
+
+    # Written as page, page-p2, ...; a shorter re-run drops the extras
+    pages_dir = str(tmp_path)
+    laid_out = [(f"Big ({i})", planner.plan_layout(p, dashboard_title="Big")) for i, p in enumerate(pages, 1)]
+    written = sync_pages(pages_dir, "big", laid_out)
+    register_pages(pages_dir, written["pages"])
+    assert written["pages"] == ["big"] + [f"big-p{i}" for i in range(2, len(pages) + 1)]
+
+    written = sync_pages(pages_dir, "big", laid_out[:1])
+    unregister_pages(pages_dir, written["stale"])
+    with open(tmp_path / "pages.json", encoding="utf-8") as f:
+        assert json.load(f)["pageOrder"] == ["big"]
+    assert not (tmp_path / "big-p2").exists()
+
 if __name__ == "__main__":
     test_layout_logic()
@@ -0,0 +1,86 @@
+import random
+import time
+import pytest
+from agents.layout_engine import LayoutEngine, VISUAL_SIZES, size_rule
+
+TYPES = sorted(VISUAL_SIZES) + ["unknown"]
+
+
+def check_packing(engine, visual_types):
+    placements, overflow = engine.pack(visual_types)
+
+    # Every visual is either placed or overflowed, never both
+    assert sorted(list(placements) + overflow) == list(range(len(visual_types)))
+    if visual_types:
+        assert placements, "at least one shelf is always placed"
+
+    boxes = list(placements.items())
+    for i, (x, y, w, h) in boxes:
+        # Inside the region
+        assert engine.x <= x and x + w <= engine.x + engine.width
+        assert engine.y <= y and y + h <= engine.y + engine.height
+        # Never below the type's minimum size
+        min_w, min_h = size_rule(visual_types[i])["min"]
+        assert w >= min(min_w, engine.width) and h >= min_h
+
+    # No two boxes overlap
+    for a in range(len(boxes)):
+        ax, ay, aw, ah = boxes[a][1]
+        for b in range(a + 1, len(boxes)):
+            bx, by, bw, bh = boxes[b][1]
+            assert ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay
+
+    # Deterministic
+    assert engine.pack(visual_types) == (placements, overflow)
+    return placements, overflow
+
+
+def test_random_dashboards_never_overlap_or_overflow():
+    rng = random.Random(1234)
+    for _ in range(500):
+        engine = LayoutEngine(
+            x=rng.randint(0, 40), y=rng.randint(0, 100),
+            width=rng.randint(400, 1600), height=rng.randint(240, 900),
+            gap=rng.randint(0, 30)
+        )
+        check_packing(engine, [rng.choice(TYPES) for _ in range(rng.randint(0, 60))])
+
+
+def test_overflow_repacks_into_pages():
+    rng = random.Random(99)
+    engine = LayoutEngine()
+    for _ in range(100):
+        remaining = [rng.choice(TYPES) for _ in range(rng.randint(1, 50))]
+        placed = 0
+        while remaining:
+            placements, overflow = check_packing(engine, remaining)
+            placed += len(placements)
+            remaining = [remaining[i] for i in overflow]
+        assert placed > 0
+
+
+def test_fifty_visuals_under_a_millisecond():
+    rng = random.Random(7)
+    visual_types = [rng.choice(TYPES) for _ in range(50)]
+    engine = LayoutEngine()
+    runs = []
+    for _ in range(50):
+        start = time.perf_counter()
+        engine.pack(visual_types)
+        runs.append(time.perf_counter() - start)
+    assert sorted(runs)[len(runs) // 2] < 0.001
+
+
+def test_with_hypothesis():
+    hypothesis = pytest.importorskip("hypothesis")
+    st = pytest.importorskip("hypothesis.strategies")
+
+    @hypothesis.settings(max_examples=300, deadline=None)
+    @hypothesis.given(
+        st.lists(st.sampled_from(TYPES), max_size=60),
+        st.integers(400, 1600), st.integers(240, 900), st.integers(0, 30)
+    )
+    def prop(visual_types, width, height, gap):
+        check_packing(LayoutEngine(width=width, height=height, gap=gap), visual_types)
+
+    prop()
@@ -0,0 +1,105 @@
+import pytest
+from llm.cache import MemoryLRUCache, ResponseCache, SQLiteCache, make_cache_key
+
+
+class Clock:
+    """Manual clock; every call also ticks a millisecond so LRU order is strict."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        self.now += 0.001
+        return self.now
+
+
+def caches(tmp_path, **kwargs):
+    return [
+        MemoryLRUCache(**kwargs),
+        SQLiteCache(str(tmp_path / "cache" / "responses.sqlite"), **kwargs)
+    ]
+
+
+def test_response_cache_is_abstract():
+    with pytest.raises(TypeError):
+        ResponseCache()
+
+    class Partial(ResponseCache):
+        def _get(self, key):
+            return None
+
+    with pytest.raises(TypeError, match="_put"):
+        Partial()
+
+
+def test_cache_key_normalization():
+    key = make_cache_key("Sales by Country?", ["country", "amount"], "m", "v1")
+    assert key == make_cache_key("  sales   by country ", ["amount", "country", "amount"], "m", "v1")
+    assert key != make_cache_key("sales by country", ["country", "amount"], "m", "v2")
+    assert key != make_cache_key("sales by region", ["country", "amount"], "m", "v1")
+
+
+def test_ttl_expiry(tmp_path):
+    clock = Clock()
+    for cache in caches(tmp_path, max_entries=10, ttl=60, clock=clock):
+        cache.put("a", "1")
+        clock.now += 59
+        assert cache.get("a") == "1"
+        clock.now += 2
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 1, "hit_rate": 0.5, "size": 0}
+
+
+def test_lru_eviction(tmp_path):
+    for cache in caches(tmp_path, max_entries=2, clock=Clock()):
+        cache.put("a", "1")
+        cache.put("b", "2")
+        assert cache.get("a") == "1"  # "b" is now least recently used
+        cache.put("c", "3")
+        assert cache.get("b") is None
+        assert (cache.get("a"), cache.get("c")) == ("1", "3")
+        assert len(cache) == 2 and cache.evictions == 1
+
+        # Overwriting keeps the size and counts no eviction
+        cache.put("a", "4")
+        assert cache.get("a") == "4" and len(cache) == 2 and cache.evictions == 1
+
+
+def test_hit_miss_counters(tmp_path):
+    for cache in caches(tmp_path, max_entries=10, clock=Clock()):
+        assert cache.stats() == {"hits": 0, "misses": 0, "evictions": 0, "hit_rate": 0.0, "size": 0}
+        cache.put("a", "1")
+        for key in ["a", "a", "a", "b"]:
+            cache.get(key)
+        assert cache.stats() == {"hits": 3, "misses": 1, "evictions": 0, "hit_rate": 0.75, "size": 1}
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "nested" / "responses.sqlite")
+    clock = Clock()
+    first = SQLiteCache(path, max_entries=2, ttl=100, clock=clock)
+    first.put("a", '{"charts": []}')
+    first.put("b", "2")
+    first.get("a")
+    first.close()
+
+    second = SQLiteCache(path, max_entries=2, ttl=100, clock=clock)
+    assert len(second) == 2
+    assert second.get("a") == '{"charts": []}'
+    # Access times survive the reopen: "b" is the LRU entry
+    second.put("c", "3")
+    assert second.get("b") is None
+    # Counters are per instance
+    assert (second.hits, second.misses, second.evictions) == (1, 1, 1)
+
+    clock.now += 101
+    assert second.get("a") is None and second.get("c") is None
+    assert len(second) == 0
+    second.close()
+
+
+def test_zero_capacity_stores_nothing(tmp_path):
+    for cache in caches(tmp_path, max_entries=0, clock=Clock()):
+        cache.put("a", "1")
+        assert cache.get("a") is None and len(cache) == 0
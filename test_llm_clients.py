@@ -0,0 +1,111 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from llm.clients import BACKOFF_BASE, BACKOFF_CAP, PooledClient, TokenBucket, parse_reset, retry_delay
+
+# ---------------------------------------------------------
+# Local stub of the chat completions endpoint:
+# first request is rate limited, second succeeds.
+# ---------------------------------------------------------
+COMPLETION = {
+    "id": "stub", "object": "chat.completion", "created": 0, "model": "stub",
+    "choices": [{
+        "index": 0, "finish_reason": "stop",
+        "message": {"role": "assistant", "content": "{\"charts\": []}"}
+    }]
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    responses = []
+    connections = set()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        StubHandler.connections.add(self.client_address)
+        status, headers, body = StubHandler.responses.pop(0)
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_retry_on_rate_limit():
+    print("--- TESTING POOLED CLIENT (stub server) ---")
+    StubHandler.protocol_version = "HTTP/1.1"  # keep-alive
+    StubHandler.responses = [
+        (429, {"retry-after": "0.25"}, {"error": {"message": "rate limited"}}),
+        (200, {}, COMPLETION),
+        (200, {}, COMPLETION)
+    ]
+    StubHandler.connections = set()
+    server = HTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    sleeps = []
+    requests_per_minute = 6000
+    client = PooledClient(
+        "test-key",
+        base_url=f"http://127.0.0.1:{server.server_port}",
+        requests_per_minute=requests_per_minute,
+        sleep=sleeps.append
+    )
+    try:
+        for _ in range(2):
+            response = client.chat.completions.create(
+                model="stub", messages=[{"role": "user", "content": "hi"}]
+            )
+            assert response.choices[0].message.content == "{\"charts\": []}"
+    finally:
+        client.close()
+        server.shutdown()
+
+    assert client.retries == 1
+    # Backoff honoured the retry-after header, plus jitter, plus the one
+    # token interval the rate limiter's drained bucket waits on top
+    assert 0.25 <= max(sleeps) < 0.25 + BACKOFF_BASE + 60 / requests_per_minute
+    # All three requests reused one keep-alive connection
+    assert len(StubHandler.connections) == 1
+    print("Test Complete.")
+
+
+def test_rate_limit_helpers():
+    assert parse_reset("2m59.5s") == 179.5
+    assert parse_reset("120ms") == 0.12
+    assert parse_reset("3") == 3.0
+
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        bucket.acquire()
+    # Burst of 2, then one token every 0.5s
+    assert round(sum(waits), 6) == 1.0
+
+
+def test_retry_delay_is_capped():
+    assert 2.0 <= retry_delay(0, {"retry-after": "2"}) < 2.0 + BACKOFF_BASE
+    assert 1.5 <= retry_delay(0, {"x-ratelimit-reset-tokens": "1.5s"}) < 1.5 + BACKOFF_BASE
+    # Header-derived delays are clamped like the exponential ones
+    assert retry_delay(0, {"retry-after": "3600"}) == BACKOFF_CAP
+    assert retry_delay(0, {"x-ratelimit-reset-requests": "2m59.5s"}) == BACKOFF_CAP
+    for attempt in range(12):
+        assert 0 <= retry_delay(attempt) <= min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+
+
+if __name__ == "__main__":
+    test_retry_on_rate_limit()
+    test_rate_limit_helpers()
+    test_retry_delay_is_capped()
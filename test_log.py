@@ -0,0 +1,59 @@
+import json
+import logging
+import pytest
+from core.log import ROOT, TRACE, configure_logging, get_logger, _parse_level
+
+
+@pytest.fixture
+def genai_root():
+    root = logging.getLogger(ROOT)
+    saved = (root.level, root.propagate, list(root.handlers))
+    yield root
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(saved[0])
+    root.propagate = saved[1]
+    for handler in saved[2]:
+        root.addHandler(handler)
+
+
+def test_parse_level():
+    assert _parse_level("trace") == TRACE
+    assert _parse_level(" debug ") == logging.DEBUG
+    assert _parse_level("WARNING") == logging.WARNING
+    assert _parse_level(logging.ERROR) == logging.ERROR
+    assert _parse_level("15") == 15
+
+
+def test_unknown_level_lists_the_valid_ones():
+    with pytest.raises(ValueError, match="'verbose'.*TRACE, DEBUG, INFO, WARNING, ERROR, CRITICAL"):
+        _parse_level("verbose")
+
+
+def test_configure_logging_rejects_unknown_levels(genai_root, monkeypatch):
+    monkeypatch.delenv("GENAI_LOG_LEVELS", raising=False)
+    with pytest.raises(ValueError, match="'loud'"):
+        configure_logging("loud")
+    monkeypatch.setenv("GENAI_LOG_LEVELS", "resolver=TRACE,binder=chatty")
+    with pytest.raises(ValueError, match="'chatty'"):
+        configure_logging("INFO")
+
+
+def test_configure_logging_levels_and_json_sink(genai_root, tmp_path):
+    path = tmp_path / "logs" / "run.jsonl"
+    configure_logging("info", levels={"resolver": "trace"}, json_path=str(path))
+    try:
+        assert genai_root.level == logging.INFO
+        assert get_logger("resolver").level == TRACE
+        get_logger("binder").debug("dropped")
+        get_logger("binder").info("bound %d visuals", 3, extra={"data": {"page": "p"}})
+    finally:
+        get_logger("resolver").setLevel(logging.NOTSET)
+
+    for handler in genai_root.handlers:
+        handler.flush()
+    entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(entries) == 1
+    assert entries[0]["msg"] == "bound 3 visuals" and entries[0]["data"] == {"page": "p"}
+    assert entries[0]["logger"] == "genai.binder" and entries[0]["level"] == "INFO"
@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import discovery.model_cache as model_cache
+from discovery.model_cache import CACHE_VERSION, load_semantic_model
+
+DEFINITION = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "PowerBI", "PowerBI-GenAI-Dashboard.SemanticModel", "definition"
+)
+
+
+def setup_model(tmp_path, monkeypatch):
+    """Copy of the sample model plus a recorder of the files each load re-parses."""
+    definition = tmp_path / "definition"
+    shutil.copytree(os.path.join(DEFINITION, "tables"), definition / "tables")
+    shutil.copy(os.path.join(DEFINITION, "relationships.tmdl"), definition)
+
+    parsed = []
+    real_parse = model_cache.parse_tmdl_files
+
+    def recording_parse(file_paths, **kwargs):
+        parsed.append(sorted(os.path.basename(p) for p in file_paths))
+        return real_parse(file_paths, **kwargs)
+
+    monkeypatch.setattr(model_cache, "parse_tmdl_files", recording_parse)
+    return str(definition / "tables"), str(tmp_path / "cache" / "model.json"), parsed
+
+
+def load(tables, cache):
+    return load_semantic_model(tables, cache)
+
+
+def test_warm_load_parses_nothing(tmp_path, monkeypatch):
+    tables, cache, parsed = setup_model(tmp_path, monkeypatch)
+    linguistic_path = str(tmp_path / "cache" / "linguistic.json")
+    cold = load_semantic_model(tables, cache, linguistic_path)
+    assert parsed[-1] == sorted(os.listdir(tables))
+    with open(linguistic_path, encoding="utf-8") as f:
+        assert json.load(f) == cold[2]
+
+    warm = load(tables, cache)
+    assert parsed[-1] == []
+    assert warm[1] == cold[1] and warm[2] == cold[2]
+    assert warm[0].keys() == cold[0].keys()
+
+
+def test_touched_file_is_hashed_not_parsed(tmp_path, monkeypatch):
+    tables, cache, parsed = setup_model(tmp_path, monkeypatch)
+    load(tables, cache)
+    path = os.path.join(tables, "data.tmdl")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    load(tables, cache)
+    assert parsed[-1] == []
+    # The new mtime is stored, so the next load skips the hash too
+    with open(cache, encoding="utf-8") as f:
+        assert json.load(f)["files"]["data.tmdl"]["mtime_ns"] == stat.st_mtime_ns + 5_000_000_000
+    hashed = []
+    monkeypatch.setattr(model_cache, "_hash_file", lambda p: hashed.append(p))
+    load(tables, cache)
+    assert hashed == [] and parsed[-1] == []
+
+
+def test_changed_content_reparses_only_that_file(tmp_path, monkeypatch):
+    tables, cache, parsed = setup_model(tmp_path, monkeypatch)
+    _, index, _ = load(tables, cache)
+    path = os.path.join(tables, "data.tmdl")
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    assert "Boxes Shipped" in text
+
+    # Same size, new content: caught by mtime, confirmed by SHA-256
+    stat = os.stat(path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace("Boxes Shipped", "Packs Shipped"))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert os.stat(path).st_size == stat.st_size
+
+    _, patched, linguistic = load(tables, cache)
+    assert parsed[-1] == ["data.tmdl"]
+    columns = patched["tables"]["data"]["columns"]
+    assert "Packs Shipped" in columns and "Boxes Shipped" not in columns
+    assert any(e["binding"].get("column") == "Packs Shipped" for e in linguistic["entities"].values())
+    assert patched["tables"].keys() == index["tables"].keys()
+
+
+def test_deleted_file_drops_its_table(tmp_path, monkeypatch):
+    tables, cache, parsed = setup_model(tmp_path, monkeypatch)
+    before, _, _ = load(tables, cache)
+    name = next(f for f in sorted(os.listdir(tables)) if f.startswith("LocalDateTable"))
+    os.remove(os.path.join(tables, name))
+
+    after, index, _ = load(tables, cache)
+    assert parsed[-1] == []
+    assert len(after) == len(before) - 1
+    assert set(index["tables"]) == set(after)
+
+
+def test_stale_or_unreadable_cache_is_rebuilt(tmp_path, monkeypatch):
+    tables, cache, parsed = setup_model(tmp_path, monkeypatch)
+    load(tables, cache)
+    with open(cache, encoding="utf-8") as f:
+        payload = json.load(f)
+
+    payload["version"] = CACHE_VERSION - 1
+    with open(cache, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    load(tables, cache)
+    assert parsed[-1] == sorted(os.listdir(tables))
+
+    with open(cache, "w", encoding="utf-8") as f:
+        f.write("{not json")
+    load(tables, cache)
+    assert parsed[-1] == sorted(os.listdir(tables))
+    assert load(tables, cache) and parsed[-1] == []
@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+import threading
+
+# config.settings needs a project root; pages are written to tmp_path below
+os.environ.setdefault("PROJECT_ROOT", tempfile.mkdtemp())
+
+import pipeline
+from compiler.resolver import ConceptResolver
+from llm.clients import use_client
+from llm.replay import ReplayClient
+from benchmarks.load_test import load_linguistic, synthetic_planner
+from pipeline import batch_page_names, run_batch_pipeline
+
+TABLES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "PowerBI", "PowerBI-GenAI-Dashboard.SemanticModel", "definition", "tables"
+)
+
+
+def test_batch_page_names_never_collide():
+    requests = [
+        {"query": "Sales by country"},
+        {"query": "sales by country"},
+        {"query": "other", "page": "genai-sales-by-country-2"},
+        {"query": "margin", "page": "genai-sales-by-country"},
+        {"query": "x", "page": "shared"},
+        {"query": "y", "page": "shared"}
+    ]
+    names = batch_page_names(requests)
+    assert len(set(names)) == len(names)
+    # Explicit names are kept; generated ones step around them
+    assert names[2:5] == ["genai-sales-by-country-2", "genai-sales-by-country", "shared"]
+    assert names[0] == "genai-sales-by-country-1"
+    assert names[1] == "genai-sales-by-country-3"
+    assert names[5] == "shared-6"
+
+
+def test_invalid_explicit_page_names_are_not_reserved():
+    names = batch_page_names([
+        {"query": "a", "page": "../escape"},
+        {"query": "b", "page": "/abs/path"},
+        {"query": "c", "page": 7},
+        {"query": "d", "page": "ok"}
+    ])
+    assert names == ["../escape", "/abs/path", "7", "ok"]
+
+
+def test_shared_resolver_is_thread_safe():
+    linguistic = load_linguistic(TABLES)
+    concepts = ["amount", "country", "product", "boxes shipped", "sales person", "date", "revenue", "nothing"]
+    expected = {c: str(r) for c, r in ConceptResolver(linguistic).resolve_concepts(concepts).items()}
+
+    for backend in ConceptResolver.BACKENDS:
+        shared = ConceptResolver(linguistic, backend=backend)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker(offset):
+            barrier.wait()
+            ordered = concepts[offset:] + concepts[:offset]
+            results.append({c: str(r) for c, r in shared.resolve_concepts(ordered).items()})
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        reference = expected if backend == "exact" else results[0]
+        assert all(r == reference for r in results)
+
+
+def test_batch_pipeline_writes_every_page(tmp_path, monkeypatch):
+    linguistic = load_linguistic(TABLES)
+    monkeypatch.setattr(pipeline, "load_model", lambda: ({}, {}, linguistic))
+    monkeypatch.setattr(pipeline, "REPORT_PAGES_PATH", str(tmp_path))
+
+    client = ReplayClient(str(tmp_path / "fixtures"), latency=0.05, fallback=synthetic_planner(linguistic))
+    previous = use_client(client)
+    try:
+        requests = [
+            {"query": "amount by country"},
+            {"query": "Amount by Country"},
+            {"query": "Overall sales overview with product analysis"},
+            {"query": "top 5 products by amount", "page": "genai-amount-by-country-2"}
+        ]
+        results = run_batch_pipeline(requests, max_concurrency=4)
+    finally:
+        use_client(previous)
+
+    assert list(results) == batch_page_names(requests)
+    assert all(error is None for error in results.values())
+    with open(tmp_path / "pages.json", encoding="utf-8") as f:
+        assert sorted(json.load(f)["pageOrder"]) == sorted(results)
+    for name in results:
+        assert os.listdir(tmp_path / name / "visuals")
+
+
+def test_batch_rejects_invalid_page_names(tmp_path, monkeypatch):
+    linguistic = load_linguistic(TABLES)
+    pages_dir = tmp_path / "report" / "pages"
+    pages_dir.mkdir(parents=True)
+    monkeypatch.setattr(pipeline, "load_model", lambda: ({}, {}, linguistic))
+    monkeypatch.setattr(pipeline, "REPORT_PAGES_PATH", str(pages_dir))
+
+    client = ReplayClient(str(tmp_path / "fixtures"), latency=0, fallback=synthetic_planner(linguistic))
+    previous = use_client(client)
+    try:
+        results = run_batch_pipeline([
+            {"query": "amount by country", "page": "../outside"},
+            {"query": "amount by country", "page": str(tmp_path / "absolute")},
+            {"query": "amount by product", "page": "Not A Slug"},
+            {"query": "amount by country"}
+        ])
+    finally:
+        use_client(previous)
+
+    assert results["genai-amount-by-country"] is None
+    for name in ["../outside", str(tmp_path / "absolute"), "Not A Slug"]:
+        assert "Invalid page name" in results[name]
+    # Nothing was written next to or outside the pages folder
+    assert not {"outside", "absolute"} & set(os.listdir(tmp_path))
+    assert sorted(os.listdir(tmp_path / "report")) == ["pages"]
+    assert "genai-amount-by-country" in os.listdir(pages_dir)
@@ -0,0 +1,185 @@
+import json
+import os
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+
+# config.settings needs a project root
+os.environ.setdefault("PROJECT_ROOT", tempfile.mkdtemp())
+
+import agents.visual_planner as visual_planner
+from agents.visual_planner import PlanStream, agent_plan_visuals_stream
+from llm.cache import MemoryLRUCache
+from llm.json_stream import PlanStreamParser
+
+PLAN = {
+    "dashboard_title": "Sales {Overview} \"2024\"",
+    "charts": [
+        {"title": "Total [Amount]", "visual_type": "card", "concepts": ["amount"], "top_n": None},
+        {"title": "Amount by \\ Country }", "visual_type": "bar", "concepts": ["country", "amount"], "top_n": 5},
+        {"title": "Trend", "visual_type": "line", "concepts": ["date", "amount"], "top_n": None}
+    ]
+}
+RESPONSE = "Here is the plan:\n```json\n" + json.dumps(PLAN, indent=2) + "\n```"
+
+
+def chunked(text, rng):
+    i = 0
+    while i < len(text):
+        n = rng.randint(1, 12)
+        yield text[i:i + n]
+        i += n
+
+
+def test_parser_emits_each_chart_when_it_closes():
+    rng = random.Random(0)
+    for _ in range(50):
+        parser = PlanStreamParser()
+        fed, emitted = "", []
+        for delta in chunked(RESPONSE, rng):
+            fed += delta
+            for chart in parser.feed(delta):
+                emitted.append(chart)
+                # Emitted no later than the delta that closed it
+                assert json.dumps(chart, indent=2).replace("\n", "\n    ") in fed
+        assert emitted == PLAN["charts"]
+        assert parser.title == PLAN["dashboard_title"]
+        assert parser.done and json.loads(parser.document) == PLAN
+
+
+def test_parser_ignores_other_arrays_and_incomplete_input():
+    parser = PlanStreamParser()
+    charts = parser.feed('{"notes": [{"a": 1}], "charts": [{"title": "x"}, {"title": "y"')
+    assert charts == [{"title": "x"}]
+    assert not parser.done and parser.document is None
+
+
+class FakeStreamingClient:
+    """chat.completions.create(stream=True) yielding small deltas with latency."""
+
+    def __init__(self, text, delay=0.01):
+        self.text = text
+        self.delay = delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        self.calls += 1
+        for delta in chunked(self.text, random.Random(1)):
+            time.sleep(self.delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+
+def test_intents_arrive_before_the_stream_ends(monkeypatch):
+    client = FakeStreamingClient(RESPONSE)
+    monkeypatch.setattr(visual_planner, "planner_client", lambda: client)
+    cache = MemoryLRUCache()
+
+    start = time.perf_counter()
+    plan = agent_plan_visuals_stream("sales overview", ["amount", "country", "date"], cache=cache)
+    arrivals = [(intent.title, time.perf_counter() - start) for intent in plan]
+    total = time.perf_counter() - start
+
+    assert [title for title, _ in arrivals] == [c["title"] for c in PLAN["charts"]]
+    assert arrivals[0][1] < 0.6 * total
+    assert plan.title == PLAN["dashboard_title"]
+
+    # The JSON object (without the prose around it) is cached and replayed
+    replay = agent_plan_visuals_stream("sales overview", ["amount", "country", "date"], cache=cache)
+    assert isinstance(replay, PlanStream)
+    assert [i.title for i in replay] == [c["title"] for c in PLAN["charts"]]
+    assert replay.title == PLAN["dashboard_title"]
+    assert client.calls == 1
+
+
+def test_broken_stream_falls_back_to_json_mode(monkeypatch):
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        if not kwargs.get("stream"):
+            message = SimpleNamespace(content=json.dumps(PLAN))
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        def chunks():
+            # First chart arrives, then the connection drops
+            text = RESPONSE[:RESPONSE.index('"Amount by')]
+            for delta in chunked(text, random.Random(3)):
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+            raise ConnectionError("stream reset")
+        return chunks()
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(visual_planner, "planner_client", lambda: client)
+    cache = MemoryLRUCache()
+
+    plan = agent_plan_visuals_stream("sales overview", ["amount", "country", "date"], cache=cache)
+    # The streamed first chart is not repeated by the fallback plan
+    assert [i.title for i in plan] == [c["title"] for c in PLAN["charts"]]
+    assert plan.title == PLAN["dashboard_title"]
+    assert [r.get("stream", False) for r in requests] == [True, False]
+    assert requests[1]["response_format"] == {"type": "json_object"}
+
+    # The JSON-mode plan is what gets cached
+    replay = agent_plan_visuals_stream("sales overview", ["amount", "country", "date"], cache=cache)
+    assert [i.title for i in replay] == [c["title"] for c in PLAN["charts"]]
+    assert len(requests) == 2
+
+
+def test_build_dashboard_binds_while_streaming():
+    from discovery.indexer import extract_semantic_index
+    from discovery.linguistic import generate_linguistic_metadata
+    from discovery.tmdl_parser import load_tmdl_files
+    from pipeline import build_dashboard, make_binder
+
+    tables = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "PowerBI", "PowerBI-GenAI-Dashboard.SemanticModel", "definition", "tables"
+    )
+    linguistic = generate_linguistic_metadata(extract_semantic_index(load_tmdl_files(tables)))
+    bound_at = []
+
+    def streaming_planner(query, concepts, schema_summary=""):
+        def deltas():
+            for delta in chunked(json.dumps(PLAN), random.Random(2)):
+                # Bind of the previous chart must already have happened
+                bound_at.append(len(binder.resolver._memo))
+                yield delta
+        return PlanStream(deltas())
+
+    binder = make_binder(linguistic)
+    pages, title = build_dashboard("sales overview", linguistic, binder, planner=streaming_planner)
+
+    assert title == PLAN["dashboard_title"]
+    visuals = [v for _, page in pages for v in page if v.visual_type != "textbox"]
+    assert sorted(v.title for v in visuals) == sorted(c["title"] for c in PLAN["charts"])
+    # Concepts were resolved before the stream finished
+    assert bound_at[-1] > 0
+
+
+def test_complete_plans_are_resolved_in_one_batch(monkeypatch):
+    from core.models import VisualIntent
+    from discovery.indexer import extract_semantic_index
+    from discovery.linguistic import generate_linguistic_metadata
+    from discovery.tmdl_parser import load_tmdl_files
+    from pipeline import build_dashboard, make_binder
+
+    tables = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "PowerBI", "PowerBI-GenAI-Dashboard.SemanticModel", "definition", "tables"
+    )
+    linguistic = generate_linguistic_metadata(extract_semantic_index(load_tmdl_files(tables)))
+    binder = make_binder(linguistic)
+    batches = []
+    resolve_concepts = binder.resolver.resolve_concepts
+    monkeypatch.setattr(binder.resolver, "resolve_concepts", lambda c: batches.append(list(c)) or resolve_concepts(c))
+
+    def planner(query, concepts, schema_summary=""):
+        return [VisualIntent(**chart) for chart in PLAN["charts"]], PLAN["dashboard_title"]
+
+    build_dashboard("sales overview", linguistic, binder, planner=planner)
+    # Every concept in one call; bind() then only reads the memo
+    assert batches[0] == [c for chart in PLAN["charts"] for c in chart["concepts"]]
+    assert all(len(batch) == 1 for batch in batches[1:])
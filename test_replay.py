@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+import pytest
+
+# config.settings needs a project root; nothing below writes there
+os.environ.setdefault("PROJECT_ROOT", tempfile.mkdtemp())
+
+from llm.cache import MemoryLRUCache
+from llm.clients import use_client
+from llm.replay import ReplayClient, ReplayMissError, fixture_key
+from agents.visual_planner import agent_plan_visuals, agent_plan_visuals_stream
+from benchmarks.load_test import load_linguistic, percentile, run, synthetic_planner
+
+TABLES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "PowerBI", "PowerBI-GenAI-Dashboard.SemanticModel", "definition", "tables"
+)
+
+PLAN = json.dumps({
+    "dashboard_title": "Sales",
+    "charts": [
+        {"title": "Amount by Country", "visual_type": "bar", "concepts": ["country", "amount"]},
+        {"title": "Amount", "visual_type": "card", "concepts": ["amount"]}
+    ]
+})
+
+
+class LiveStub:
+    """Stands in for the Groq client: answers every prompt with PLAN."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if not kwargs.get("stream"):
+            message = SimpleNamespace(content=PLAN)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return (
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=PLAN[i:i + 10]))])
+            for i in range(0, len(PLAN), 10)
+        )
+
+
+def request(stream=False, prompt="plan sales"):
+    return {"model": "m", "messages": [{"role": "user", "content": prompt}], "stream": stream}
+
+
+def test_record_then_replay(tmp_path):
+    live = LiveStub()
+    recorder = ReplayClient(str(tmp_path), mode="record", client=live)
+    text = "".join(c.choices[0].delta.content for c in recorder.chat.completions.create(**request(stream=True)))
+    assert text == PLAN
+    assert recorder.stats["recorded"] == 1
+    assert os.path.exists(tmp_path / f"{fixture_key(request())}.json")
+
+    sleeps = []
+    replay = ReplayClient(str(tmp_path), latency=2.0, sleep=sleeps.append)
+    # Streams replay chunk by chunk, spread over the injected latency
+    chunks = [c.choices[0].delta.content for c in replay.chat.completions.create(**request(stream=True))]
+    assert "".join(chunks) == PLAN and len(chunks) == len(range(0, len(PLAN), 10))
+    assert sum(sleeps) == pytest.approx(2.0)
+
+    # A recorded stream also answers the non-streaming call
+    sleeps.clear()
+    response = replay.chat.completions.create(**request(), response_format={"type": "json_object"})
+    assert response.choices[0].message.content == PLAN
+    assert sleeps == [2.0]
+    assert replay.stats["replayed"] == 2 and live.calls == 1
+
+    with pytest.raises(ReplayMissError):
+        replay.chat.completions.create(**request(prompt="something else"))
+
+    fallback = ReplayClient(str(tmp_path), latency=0, fallback=lambda kwargs: PLAN, sleep=sleeps.append)
+    assert fallback.chat.completions.create(**request(prompt="other")).choices[0].message.content == PLAN
+    assert fallback.stats["fallback"] == 1
+
+
+def test_planner_runs_offline(tmp_path):
+    recorder = ReplayClient(str(tmp_path), mode="record", client=LiveStub())
+    previous = use_client(recorder)
+    try:
+        # The default (streaming) planner records on its own
+        plan = agent_plan_visuals_stream("sales by country", ["country", "amount"], cache=MemoryLRUCache(max_entries=0))
+        assert [i.visual_type for i in plan] == ["bar", "card"]
+        assert recorder.stats["recorded"] == 1
+        assert len(os.listdir(tmp_path)) == 1
+
+        # Same prompt, no live client: served from the fixture, in either mode
+        use_client(ReplayClient(str(tmp_path), latency=0))
+        intents, title = agent_plan_visuals("sales by country", ["country", "amount"], cache=MemoryLRUCache(max_entries=0))
+        assert title == "Sales" and len(intents) == 2
+        plan = agent_plan_visuals_stream("sales by country", ["country", "amount"], cache=MemoryLRUCache(max_entries=0))
+        assert [i.visual_type for i in plan] == ["bar", "card"] and plan.title == "Sales"
+    finally:
+        use_client(previous)
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert percentile([7], 95) == 7
+
+
+def test_load_test_reports_stage_percentiles(tmp_path):
+    linguistic = load_linguistic(TABLES)
+    client = ReplayClient(str(tmp_path / "fixtures"), latency=0.05, fallback=synthetic_planner(linguistic))
+    queries = ["amount by country", "Overall sales overview with product analysis"]
+    report = run(queries, runs=8, concurrency=4, client=client, linguistic=linguistic,
+                 pages_dir=str(tmp_path / "pages"))
+
+    assert report["errors"] == 0
+    # The formulaic query never reaches the LLM
+    assert client.stats["fallback"] == 4
+    stages = report["stages"]
+    assert stages["dashboard"]["count"] == 8 and stages["llm_planning"]["count"] == 4
+    for stats in stages.values():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+    assert stages["llm_planning"]["p50_ms"] >= 50
+    assert len(os.listdir(tmp_path / "pages")) == 8
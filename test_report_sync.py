@@ -0,0 +1,142 @@
+import os
+import pytest
+import backend.report_sync as report_sync
+from core.models import BoundVisual, PhysicalBinding, VisualLayout
+from backend.report_sync import diff_visuals, sync_visuals
+from backend.pbip_writer import materialize_visuals, visual_identities
+
+
+def visual(visual_type, column, i=0):
+    return BoundVisual(
+        visual_name=f"v{i}",
+        visual_type=visual_type,
+        bindings=[
+            PhysicalBinding(concept_name="country", table="data", column="Country", kind="dimension"),
+            PhysicalBinding(concept_name=column.lower(), table="data", column=column, kind="measure", aggregation="sum")
+        ],
+        title=f"{column} by Country",
+        layout=VisualLayout(x=0, y=200 * i, width=400, height=200, tabOrder=i)
+    )
+
+
+def snapshot(output_dir):
+    files = {}
+    for name in sorted(os.listdir(output_dir)):
+        if not os.path.isdir(os.path.join(output_dir, name)):
+            continue
+        with open(os.path.join(output_dir, name, "visual.json"), encoding="utf-8") as f:
+            files[name] = f.read()
+    return files
+
+
+def test_diff_visuals(tmp_path):
+    output_dir = tmp_path / "visuals"
+    for name, content in [("same", "a"), ("edited", "b"), ("gone", "c")]:
+        (output_dir / name).mkdir(parents=True)
+        (output_dir / name / "visual.json").write_text(content, encoding="utf-8")
+    # A folder without its visual.json counts as updated
+    (output_dir / "broken").mkdir()
+    (output_dir / "stray.txt").write_text("not a visual", encoding="utf-8")
+
+    diff = diff_visuals({"same": "a", "edited": "B", "broken": "d", "new": "e"}, str(output_dir))
+    assert diff == {"added": ["new"], "updated": ["edited", "broken"], "deleted": ["gone"], "unchanged": ["same"]}
+    assert diff_visuals({"new": "e"}, str(tmp_path / "missing")) == {
+        "added": ["new"], "updated": [], "deleted": [], "unchanged": []
+    }
+
+
+def test_sync_rewrites_only_what_changed(tmp_path):
+    output_dir = str(tmp_path / "page" / "visuals")
+    page = [visual("bar", "Amount"), visual("card", "Amount", 1), visual("line", "Boxes", 2)]
+    names = visual_identities(page)
+
+    diff = sync_visuals(page, output_dir)
+    assert sorted(diff["added"]) == sorted(names) and not diff["updated"] + diff["deleted"]
+    assert sorted(os.listdir(output_dir)) == sorted(names)
+    inodes = {name: os.stat(os.path.join(output_dir, name, "visual.json")).st_ino for name in names}
+
+    # Same page again: nothing is touched
+    assert sync_visuals(page, output_dir) == {"added": [], "updated": [], "deleted": [], "unchanged": names}
+
+    # New title (same identity), one chart dropped, one added
+    retitled = visual("bar", "Amount")
+    retitled.title = "Revenue by Country"
+    new_page = [retitled, visual("card", "Amount", 1), visual("pie", "Boxes", 2)]
+    new_names = visual_identities(new_page)
+    diff = sync_visuals(new_page, output_dir)
+    assert diff["updated"] == [names[0]]
+    assert diff["unchanged"] == [names[1]]
+    assert diff["added"] == [new_names[2]]
+    assert diff["deleted"] == [names[2]]
+
+    assert sorted(os.listdir(output_dir)) == sorted(new_names)
+    # The unchanged visual was carried over, not rewritten
+    assert os.stat(os.path.join(output_dir, names[1], "visual.json")).st_ino == inodes[names[1]]
+    assert "Revenue by Country" in snapshot(output_dir)[names[0]]
+    assert os.listdir(tmp_path / "page") == ["visuals"]
+
+
+def test_sync_removes_stale_folders(tmp_path):
+    output_dir = tmp_path / "page" / "visuals"
+    stale = output_dir / "GenAI_Visual_000000000000"
+    stale.mkdir(parents=True)
+    (stale / "visual.json").write_text("{}", encoding="utf-8")
+    (output_dir / "Manual_Visual" / "nested").mkdir(parents=True)
+
+    page = [visual("bar", "Amount")]
+    diff = sync_visuals(page, str(output_dir))
+    assert diff["deleted"] == ["GenAI_Visual_000000000000", "Manual_Visual"]
+    assert os.listdir(output_dir) == visual_identities(page)
+
+    # Emptying the page removes every visual folder
+    assert sync_visuals([], str(output_dir))["deleted"] == visual_identities(page)
+    assert os.listdir(output_dir) == []
+
+
+def test_failed_write_leaves_page_untouched(tmp_path, monkeypatch):
+    output_dir = str(tmp_path / "page" / "visuals")
+    sync_visuals([visual("bar", "Amount"), visual("card", "Amount", 1)], output_dir)
+    before = snapshot(output_dir)
+
+    real_write, calls = report_sync.write_visual_file, []
+
+    def failing_write(name, content, folder):
+        calls.append(name)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        return real_write(name, content, folder)
+
+    monkeypatch.setattr(report_sync, "write_visual_file", failing_write)
+    with pytest.raises(OSError, match="disk full"):
+        sync_visuals(
+            [visual("bar", "Amount"), visual("line", "Boxes", 1), visual("pie", "Boxes", 2)],
+            output_dir, max_workers=1
+        )
+
+    assert len(calls) == 2
+    assert snapshot(output_dir) == before
+    # No staging or retired folders left next to the page's visuals
+    assert os.listdir(tmp_path / "page") == ["visuals"]
+
+
+def test_loose_files_survive_the_swap(tmp_path):
+    output_dir = tmp_path / "page" / "visuals"
+    sync_visuals([visual("bar", "Amount")], str(output_dir))
+    (output_dir / "notes.txt").write_text("kept", encoding="utf-8")
+
+    diff = sync_visuals([visual("bar", "Amount"), visual("card", "Amount", 1)], str(output_dir))
+    assert len(diff["added"]) == 1
+    assert (output_dir / "notes.txt").read_text(encoding="utf-8") == "kept"
+    assert diff_visuals({}, str(output_dir))["deleted"] == sorted(diff["added"] + diff["unchanged"])
+
+
+def test_materialize_visuals_returns_folders_in_input_order(tmp_path):
+    output_dir = str(tmp_path / "page" / "visuals")
+    visuals = [visual("pie", "Boxes"), visual("bar", "Amount", 1), visual("bar", "Amount", 2)]
+    folders = materialize_visuals(visuals, output_dir)
+    assert folders == [os.path.join(output_dir, name) for name in visual_identities(visuals)]
+    assert all(os.path.isfile(os.path.join(folder, "visual.json")) for folder in folders)
+
+    # A shorter page removes the visuals it no longer has
+    assert materialize_visuals(visuals[:1], output_dir) == folders[:1]
+    assert os.listdir(output_dir) == [os.path.basename(folders[0])]
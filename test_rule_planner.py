@@ -0,0 +1,98 @@
+import os
+import random
+import tempfile
+import time
+
+# config.settings needs a project root
+os.environ.setdefault("PROJECT_ROOT", tempfile.mkdtemp())
+
+from agents.rule_planner import RulePlanner
+from compiler.term_automaton import TermAutomaton
+from discovery.indexer import extract_semantic_index
+from discovery.linguistic import generate_linguistic_metadata
+from discovery.tmdl_parser import load_tmdl_files
+
+TABLES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "PowerBI", "PowerBI-GenAI-Dashboard.SemanticModel", "definition", "tables"
+)
+LINGUISTIC = generate_linguistic_metadata(extract_semantic_index(load_tmdl_files(TABLES)))
+
+
+def test_automaton_finds_every_occurrence():
+    rng = random.Random(0)
+    for _ in range(200):
+        phrases = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(8)]
+        text = "".join(rng.choice("abc") for _ in range(40))
+        automaton = TermAutomaton()
+        for p in phrases:
+            automaton.add(p, p)
+        found = sorted((s, e, p) for s, e, p in automaton.iter_matches(text))
+        naive = sorted(
+            (i, i + len(p), p) for p in phrases
+            for i in range(len(text) - len(p) + 1) if text.startswith(p, i)
+        )
+        assert found == naive
+
+
+def test_automaton_whole_words_leftmost_longest():
+    automaton = TermAutomaton()
+    for phrase in ["sales", "sales person", "person", "over time", "time"]:
+        automaton.add(phrase, phrase)
+    assert [p for _, _, p in automaton.find_words("sales person sales over time timeline")] == [
+        "sales person", "sales", "over time"
+    ]
+
+
+def plan(query):
+    result = RulePlanner(LINGUISTIC).plan(query)
+    return result and [(i.visual_type, i.concepts, i.top_n) for i in result[0]]
+
+
+def test_formulaic_queries():
+    assert plan("Amount by country") == [("bar", ["country", "amount"], None)]
+    assert plan("top 5 products by amount") == [("bar", ["product", "amount"], 5)]
+    assert plan("amount over time") == [("line", ["date", "amount"], None)]
+    assert plan("monthly amount") == [("line", ["date", "amount"], None)]
+    assert plan("amount by month") == [("line", ["month", "amount"], None)]
+    assert plan("total amount and boxes shipped") == [("card", ["amount", "boxes shipped"], None)]
+    assert plan("share of amount by product") == [("pie", ["product", "amount"], None)]
+    assert plan("list products and countries") == [("table", ["product", "country"], None)]
+    assert plan("amount by country and product") == [
+        ("bar", ["country", "amount"], None), ("bar", ["product", "amount"], None)
+    ]
+
+
+def test_everything_else_goes_to_the_llm():
+    for query in [
+        "Overall sales overview with product analysis",
+        "which salesperson sold the most boxes",
+        "amount by country in 2023",
+        "country by product",
+        "top products",
+        "top 0 products by amount",
+        "",
+    ]:
+        assert plan(query) is None, query
+
+
+def test_fast_path_skips_the_planner_and_is_fast():
+    from pipeline import build_dashboard, make_binder
+
+    def planner(*args):
+        raise AssertionError("LLM planner must not be called")
+
+    planner_rules = RulePlanner(LINGUISTIC)
+    pages, title = build_dashboard(
+        "top 5 products by amount", LINGUISTIC, make_binder(LINGUISTIC),
+        planner=planner, fast_path=planner_rules
+    )
+    visual = [v for _, page in pages for v in page if v.visual_type != "textbox"][0]
+    assert title == "Top 5 Products by Amount"
+    assert (visual.visual_type, visual.top_n) == ("bar", 5)
+    assert [b.column for b in visual.bindings] == ["Product", "Amount"]
+
+    start = time.perf_counter()
+    for _ in range(100):
+        planner_rules.plan("amount and boxes shipped by country")
+    assert (time.perf_counter() - start) / 100 < 0.005
@@ -0,0 +1,114 @@
+from discovery.indexer import extract_semantic_index
+from discovery.linguistic import generate_linguistic_metadata
+from discovery.semantic_store import SemanticStore, EXPLICIT
+from compiler.resolver import ConceptResolver
+
+TABLES = {
+    "Sales": {
+        "columns": {
+            "Sales Amount": {"dataType": "double", "summarizeBy": "sum"},
+            "Product": {"dataType": "string", "summarizeBy": "none"},
+            "Order Date": {"dataType": "dateTime", "summarizeBy": "none"},
+            "Quantity": {"dataType": "int64", "summarizeBy": "count"}
+        },
+        "measures": {
+            "Total Cost": {"expression": "SUM(Sales[Cost])", "formatString": "0.00"}
+        }
+    },
+    "Geo_Region": {
+        "columns": {
+            "Country": {"dataType": "string", "summarizeBy": "none"}
+        }
+    }
+}
+
+
+def test_views_match_dict_builders():
+    index = extract_semantic_index(TABLES)
+    linguistic = generate_linguistic_metadata(index)
+    store = SemanticStore.from_tables(TABLES)
+
+    assert store.index_view().to_dict() == index
+    assert store.linguistic_view().to_dict() == linguistic
+    assert list(store.linguistic_view()["entities"]) == list(linguistic["entities"])
+
+    # Views are drop-in inputs for the next stages
+    assert generate_linguistic_metadata(store.index_view()) == linguistic
+    view_resolver = ConceptResolver(store.linguistic_view())
+    dict_resolver = ConceptResolver(linguistic)
+    for concept in ("amount", "product", "country", "cost", "date"):
+        assert view_resolver.resolve(concept) == dict_resolver.resolve(concept)
+
+
+def test_measure_named_like_a_column_keeps_both_entities():
+    tables = {"Sales": {
+        "columns": {"Margin": {"dataType": "double", "summarizeBy": "sum"}},
+        "measures": {"Margin": {"expression": "SUM(Sales[Margin]) * 0.9"}}
+    }}
+    linguistic = generate_linguistic_metadata(extract_semantic_index(tables))
+
+    entities = linguistic["entities"]
+    assert entities["Sales.margin"]["binding"].get("explicit") is None
+    assert entities["Sales.measure:margin"]["binding"]["explicit"] is True
+    assert SemanticStore.from_tables(tables).linguistic_view().to_dict() == linguistic
+
+
+def test_ids_and_interning():
+    store = SemanticStore.from_tables(TABLES)
+    sales = store.table("Sales")
+    cost = store.columns[sales.column_ids[-1]]
+
+    assert cost.kind == EXPLICIT and cost.table_id == sales.id
+    entity = store.entity("Sales.measure:total_cost")
+    assert entity.column_id == cost.id
+    assert store.binding(entity)["explicit"] is True
+    # Terms are interned strings: equal terms of separate stores are one object
+    other = SemanticStore.from_tables(TABLES).entity("Sales.measure:total_cost")
+    assert all(a is b for a, b in zip(entity.terms, other.terms))
+
+    # Entities with the same synonyms share one terms tuple
+    twins = SemanticStore.from_tables({"A": {"columns": {"Country": {}}}, "B": {"columns": {"Country": {}}}})
+    assert twins.entity("A.country").terms is twins.entity("B.country").terms
+
+
+def test_bindings_are_shared():
+    store = SemanticStore.from_tables(TABLES)
+    entities = store.linguistic_view()["entities"]
+    assert entities["Sales.product"]["binding"] is entities["Sales.product"]["binding"]
+    assert store.linguistic_view()["entities"] is entities
+
+    # Every occurrence in the resolver's index points at the store's binding
+    index = ConceptResolver(store.linguistic_view()).index
+    bindings = [o[3] for occs in index.occurrences.values() for o in occs if o[2] == "Sales.sales_amount"]
+    assert len(bindings) > 1
+    assert all(b is store.binding(store.entity("Sales.sales_amount")) for b in bindings)
+
+
+def test_from_dicts_round_trips_without_deriving_terms(monkeypatch):
+    index = extract_semantic_index(TABLES)
+    linguistic = generate_linguistic_metadata(index)
+
+    import discovery.semantic_store as semantic_store
+    monkeypatch.setattr(semantic_store, "_expand_terms", None)
+    store = SemanticStore.from_dicts(index, linguistic)
+
+    assert store.index_view().to_dict() == index
+    assert store.linguistic_view().to_dict() == linguistic
+    assert list(store.linguistic_view()["entities"]) == list(linguistic["entities"])
+
+
+def test_patching_matches_a_fresh_store():
+    store = SemanticStore.from_tables(TABLES)
+    changed = {"Sales": dict(TABLES["Sales"], columns={
+        **TABLES["Sales"]["columns"], "Discount": {"dataType": "double", "summarizeBy": "sum"}
+    })}
+    expected = SemanticStore.from_tables({**TABLES, **changed})
+
+    removed = store.drop_table("Sales")
+    assert "Sales.product" in removed and "Sales.product" not in store.linguistic_view()["entities"]
+    assert "Sales.discount" in store.add_table("Sales", changed["Sales"])
+    store.reorder(["Sales", "Geo_Region"])
+
+    assert store.index_view().to_dict() == expected.index_view().to_dict()
+    assert list(store.linguistic_view()["entities"]) == list(expected.linguistic_view()["entities"])
+    assert store.linguistic_view().to_dict() == expected.linguistic_view().to_dict()
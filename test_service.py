@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import httpx
+
+# config.settings needs a project root; the service gets explicit paths below
+os.environ.setdefault("PROJECT_ROOT", tempfile.mkdtemp())
+
+from core.models import VisualIntent
+from discovery.model_cache import load_semantic_model
+from backend.report_pages import is_page_name
+from service import DashboardApp, DashboardService, default_page_name
+
+TABLES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "PowerBI", "PowerBI-GenAI-Dashboard.SemanticModel", "definition", "tables"
+)
+
+
+def stub_planner(query, concepts, schema_summary=""):
+    """Stands in for the LLM: fixed plan, some latency."""
+    time.sleep(0.2)
+    return [
+        VisualIntent(title="Total Amount", visual_type="card", concepts=["amount"]),
+        VisualIntent(title="Amount by Country", visual_type="bar", concepts=["country", "amount"])
+    ], f"Dashboard: {query}"
+
+
+def make_app(tmp_path, planner=stub_planner):
+    tmdl_root = str(tmp_path / "tables")
+    shutil.copytree(TABLES, tmdl_root)
+    loads = []
+
+    def loader():
+        loads.append(time.time())
+        return load_semantic_model(tmdl_root, str(tmp_path / "cache.json"), str(tmp_path / "linguistic.json"))
+
+    service = DashboardService(
+        model_loader=loader, planner=planner, tmdl_root=tmdl_root,
+        pages_dir=str(tmp_path / "pages"), reload_interval=0
+    )
+    return DashboardApp(service, max_concurrency=4), tmdl_root, loads
+
+
+async def _post_many(app, bodies):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.post("/dashboards", json=b) for b in bodies))
+
+
+def test_concurrent_requests_share_warm_model(tmp_path):
+    # Every planner call waits for the other three: only passes if they overlap
+    barrier = threading.Barrier(4, timeout=5)
+
+    def overlapping_planner(query, concepts, schema_summary=""):
+        barrier.wait()
+        return stub_planner(query, concepts, schema_summary)
+
+    app, _, loads = make_app(tmp_path, planner=overlapping_planner)
+    responses = asyncio.run(_post_many(app, [{"query": f"sales overview {i}"} for i in range(4)]))
+
+    assert [r.status_code for r in responses] == [200] * 4
+    body = responses[0].json()
+    assert body["title"].startswith("Dashboard:")
+    assert [v["type"] for v in body["pages"][0]["visuals"]] == ["textbox", "card", "bar"]  # title + plan
+    assert len(loads) == 1            # model parsed once, then kept warm
+
+    with open(tmp_path / "pages" / "pages.json", encoding="utf-8") as f:
+        assert len(json.load(f)["pageOrder"]) == 4
+
+
+def test_hot_reload_and_validation(tmp_path):
+    app, tmdl_root, loads = make_app(tmp_path)
+
+    first = asyncio.run(_post_many(app, [{"query": "q", "write": False}]))[0].json()
+    assert first["model_generation"] == 1
+
+    # Only the changed table is re-indexed: no reload
+    path = os.path.join(tmdl_root, "data.tmdl")
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace("column 'Boxes Shipped'", "column 'Cartons Shipped'"))
+    second = asyncio.run(_post_many(app, [{"query": "q", "write": False}]))[0].json()
+    assert second["model_generation"] == 2
+    assert len(loads) == 1
+    snapshot = app.service.model()
+    assert "data.cartons_shipped" in snapshot.linguistic["entities"]
+    assert snapshot.binder.resolver.resolve("cartons shipped")["column"] == "Cartons Shipped"
+
+    bad = asyncio.run(_post_many(app, [{}]))[0]
+    assert bad.status_code == 400
+
+
+def test_page_names_and_write_flag_are_validated(tmp_path):
+    app, _, _ = make_app(tmp_path)
+    bodies = [
+        {"query": "q", "page": "../outside"},
+        {"query": "q", "page": str(tmp_path / "abs")},
+        {"query": "q", "page": "Sales Page"},
+        {"query": "q", "page": 3},
+        {"query": "q", "write": "no"}
+    ]
+    responses = asyncio.run(_post_many(app, bodies))
+    assert [r.status_code for r in responses] == [400] * 5
+    assert not os.path.exists(tmp_path / "outside") and not os.path.exists(tmp_path / "abs")
+
+
+def test_same_page_writes_are_serialized(tmp_path, monkeypatch):
+    import service
+    active, overlaps = {}, []
+    lock = threading.Lock()
+    real_sync = service.sync_pages
+
+    def tracking_sync(pages_dir, page_name, pages):
+        with lock:
+            active[page_name] = active.get(page_name, 0) + 1
+            overlaps.append(active[page_name])
+        time.sleep(0.05)
+        try:
+            return real_sync(pages_dir, page_name, pages)
+        finally:
+            with lock:
+                active[page_name] -= 1
+
+    monkeypatch.setattr(service, "sync_pages", tracking_sync)
+    app, _, _ = make_app(tmp_path)
+    responses = asyncio.run(_post_many(app, [{"query": f"overview {i}", "page": "shared"} for i in range(4)]))
+
+    assert [r.status_code for r in responses] == [200] * 4
+    assert overlaps == [1] * 4
+    with open(tmp_path / "pages" / "shared" / "page.json", encoding="utf-8") as f:
+        assert json.load(f)["name"] == "shared"
+
+
+def test_default_page_names_keep_long_queries_apart():
+    prefix = "total amount by country for every product category and "
+    first, second = default_page_name(prefix + "month"), default_page_name(prefix + "quarter")
+    assert first != second
+    assert first.startswith("genai-total-amount-by-country")
+    assert is_page_name(first) and is_page_name(second)
+    assert default_page_name(prefix + "month") == first
@@ -0,0 +1,188 @@
+import os
+from discovery.tmdl_parser import (
+    load_relationships, load_semantic_definition, load_tmdl_files, parse_tmdl_document, parse_tmdl_files
+)
+from discovery.model_cache import load_semantic_model
+from benchmarks.synthetic_tmdl import write_synthetic_model
+
+TABLE = """\
+/// Sales facts
+table 'Sales Facts'
+\tlineageTag: 1c2d
+
+\tmeasure 'Total Sales' = SUM('Sales Facts'[Amount])
+\t\tformatString: \\$#,0.00
+\t\tdisplayFolder: KPIs
+
+\tmeasure 'Sales YoY %' =
+\t\t\tVAR current = [Total Sales]
+\t\t\tVAR previous =
+\t\t\t\tCALCULATE([Total Sales], SAMEPERIODLASTYEAR('Date'[Date]))
+
+\t\t\tRETURN DIVIDE(current - previous, previous)
+\t\tformatString: 0.0%
+
+\tmeasure Margin = ```
+\t\t\tDIVIDE(
+\t\t\t    [Total Sales] - [Total Cost],
+\t\t\t    [Total Sales]
+\t\t\t)
+\t\t\t```
+\t\tisHidden
+
+\tcolumn Amount
+\t\tdataType: decimal
+\t\tsummarizeBy: sum
+\t\tannotation SummarizationSetBy = Automatic
+
+\tcolumn 'Customer''s Region'
+\t\tdataType: string
+\t\tsummarizeBy: none
+
+\tcolumn 'Unit Price' = 'Sales Facts'[Amount] / 'Sales Facts'[Quantity]
+\t\tdataType: double
+
+\tcolumn Band =
+\t\t\tSWITCH(TRUE(),
+\t\t\t\t[Amount] > 1000, "High",
+\t\t\t\t"Low")
+\t\tdataType: string
+
+\tannotation PBI_QueryOrder = ["Sales Facts"]
+
+\tannotation TabularEditor_Notes =
+\t\t\tfirst line
+\t\t\tsecond line
+
+\tpartition 'Sales Facts' = m
+\t\tmode: import
+\t\tsource =
+\t\t\t\tlet
+\t\t\t\t    Source = Sql.Database("server", "db")
+\t\t\t\tin
+\t\t\t\t    Source
+"""
+
+RELATIONSHIPS = """\
+relationship 5f0b
+\tfromColumn: 'Sales Facts'.'Order Date'
+\ttoColumn: Date.Date
+
+relationship 9a1c
+\tisActive: false
+\tcrossFilteringBehavior: bothDirections
+\tfromColumn: 'Sales Facts'.'Customer''s Region'
+\ttoColumn: Region.Name
+"""
+
+
+def parse(text):
+    return parse_tmdl_document(text.splitlines())
+
+
+def test_measures_single_multi_line_and_fenced():
+    table = parse(TABLE).tables["Sales Facts"]
+    assert table.description == "Sales facts"
+    assert list(table.measures) == ["Total Sales", "Sales YoY %", "Margin"]
+
+    total = table.measures["Total Sales"]
+    assert total.expression == "SUM('Sales Facts'[Amount])"
+    assert total.format_string == "\\$#,0.00" and total.display_folder == "KPIs"
+
+    # Deeper indentation is kept relative to the expression; inner blank lines survive
+    assert table.measures["Sales YoY %"].expression == (
+        "VAR current = [Total Sales]\n"
+        "VAR previous =\n"
+        "\tCALCULATE([Total Sales], SAMEPERIODLASTYEAR('Date'[Date]))\n"
+        "\n"
+        "RETURN DIVIDE(current - previous, previous)"
+    )
+    assert table.measures["Sales YoY %"].format_string == "0.0%"
+
+    margin = table.measures["Margin"]
+    assert margin.expression == "DIVIDE(\n    [Total Sales] - [Total Cost],\n    [Total Sales]\n)"
+    assert margin.is_hidden is True
+
+
+def test_columns_quoted_names_and_calculated_columns():
+    columns = parse(TABLE).tables["Sales Facts"].columns
+    assert list(columns) == ["Amount", "Customer's Region", "Unit Price", "Band"]
+    assert columns["Amount"].summarize_by == "sum" and not columns["Amount"].is_calculated
+    assert columns["Customer's Region"].data_type == "string"
+
+    assert columns["Unit Price"].expression == "'Sales Facts'[Amount] / 'Sales Facts'[Quantity]"
+    assert columns["Unit Price"].data_type == "double"
+    assert columns["Band"].expression == 'SWITCH(TRUE(),\n\t[Amount] > 1000, "High",\n\t"Low")'
+    assert columns["Band"].is_calculated and columns["Band"].data_type == "string"
+
+
+def test_annotations_and_partitions():
+    table = parse(TABLE).tables["Sales Facts"]
+    assert table.columns["Amount"].annotations == {"SummarizationSetBy": "Automatic"}
+    assert table.annotations == {
+        "PBI_QueryOrder": '["Sales Facts"]',
+        "TabularEditor_Notes": "first line\nsecond line"
+    }
+    partition = table.partitions[0]
+    assert partition.source_type == "m" and partition.mode == "import"
+    # Source expressions are skipped unless asked for
+    assert partition.source is None
+    kept = parse_tmdl_document(TABLE.splitlines(), keep_expressions=True)
+    assert kept.tables["Sales Facts"].partitions[0].source.startswith("let\n")
+
+
+def test_relationships():
+    first, second = parse(RELATIONSHIPS).relationships
+    assert (first.from_table, first.from_column, first.to_table, first.to_column) == (
+        "Sales Facts", "Order Date", "Date", "Date"
+    )
+    assert first.is_active is True
+    assert (second.from_column, second.is_active, second.cross_filtering_behavior) == (
+        "Customer's Region", False, "bothDirections"
+    )
+
+
+def test_relationships_reach_the_semantic_index(tmp_path):
+    definition = tmp_path / "definition"
+    (definition / "tables").mkdir(parents=True)
+    (definition / "tables" / "Sales Facts.tmdl").write_text(TABLE, encoding="utf-8")
+    (definition / "relationships.tmdl").write_text(RELATIONSHIPS, encoding="utf-8")
+    cache = str(tmp_path / "cache.json")
+
+    expected = load_relationships(str(definition))
+    assert [r["name"] for r in expected] == ["5f0b", "9a1c"]
+
+    tables, index, _ = load_semantic_model(str(definition / "tables"), cache)
+    assert index["relationships"] == expected
+    assert index["tables"]["Sales Facts"]["explicit_measures"].keys() >= {"Total Sales", "Margin"}
+
+    # Relationship edits invalidate the cached index; table files are untouched
+    os.remove(definition / "relationships.tmdl")
+    assert load_semantic_model(str(definition / "tables"), cache)[1]["relationships"] == []
+
+    _, compact_index, _ = load_semantic_model(str(definition / "tables"), compact=True)
+    assert compact_index["relationships"] == []
+
+
+def test_parallel_parse_equals_serial(tmp_path):
+    model = write_synthetic_model(str(tmp_path / "Synthetic.SemanticModel"), 600, columns_per_table=25, seed=9)
+    tables_path = model["tables_path"]
+
+    serial = load_tmdl_files(tables_path, max_workers=1)
+    for workers in (None, 2, 8):
+        parallel = load_tmdl_files(tables_path, max_workers=workers)
+        assert parallel == serial
+        assert list(parallel) == list(serial)
+    assert len(serial) == model["tables"]
+
+    # Results come back in input order, whichever file finishes first
+    paths = sorted((os.path.join(tables_path, f) for f in os.listdir(tables_path)), reverse=True)
+    timings = {}
+    assert list(parse_tmdl_files(paths, max_workers=8, timings=timings)) == paths
+    assert sorted(timings) == sorted(os.path.basename(p) for p in paths)
+
+    typed_serial = load_semantic_definition(model["definition"], max_workers=1)
+    typed_parallel = load_semantic_definition(model["definition"], max_workers=8)
+    assert typed_parallel == typed_serial
+    assert list(typed_parallel.tables) == list(typed_serial.tables)
+    assert len(typed_serial.relationships) == model["relationships"]
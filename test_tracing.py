@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+# config.settings needs a project root; nothing below writes there
+os.environ.setdefault("PROJECT_ROOT", tempfile.mkdtemp())
+
+from core.tracing import Tracer, carry_span, set_tracer, trace_span
+from pipeline import make_tracer
+
+
+def flags(**kwargs):
+    return SimpleNamespace(**{"trace": None, "chrome_trace": None, "profile": "", "trace_memory": False, **kwargs})
+
+
+def test_trace_memory_alone_makes_a_tracer():
+    assert make_tracer(flags()) is None
+    tracer = make_tracer(flags(trace_memory=True))
+    assert tracer is not None and tracer.trace_memory and not tracer.profile
+    assert make_tracer(flags(profile="binding,layout")).profile == {"binding", "layout"}
+
+
+def test_worker_spans_keep_their_parent():
+    tracer = Tracer()
+    previous = set_tracer(tracer)
+    try:
+        def work(i):
+            with trace_span("bind_visual", visual=i):
+                with trace_span("resolve"):
+                    pass
+
+        with trace_span("dashboard"):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(carry_span(work), range(8)))
+            # A bare thread has no way to know its parent
+            bare = threading.Thread(target=work, args=(99,))
+            bare.start()
+            bare.join()
+    finally:
+        set_tracer(previous)
+
+    parents = {(s.name, s.attributes.get("visual")): s.parent for s in tracer.spans}
+    assert all(parents[("bind_visual", i)] == "dashboard" for i in range(8))
+    assert parents[("resolve", None)] == "bind_visual"
+    assert parents[("dashboard", None)] is None
+    assert parents[("bind_visual", 99)] is None
+    # Carried parents do not leak into later work on the same pool threads
+    assert tracer.current() is None
+
+
+def test_carry_span_without_tracer_is_identity():
+    def fn():
+        return 1
+    assert carry_span(fn) is fn
+
+
+def test_memory_peaks_are_measured_one_span_at_a_time():
+    tracer = Tracer(profile=["outer", "inner"], trace_memory=True)
+    previous = set_tracer(tracer)
+    try:
+        with trace_span("outer"):
+            block = bytearray(2 * 1024 * 1024)
+            with trace_span("inner"):
+                pass
+            del block
+    finally:
+        set_tracer(previous)
+
+    spans = {s.name: s for s in tracer.spans}
+    # The nested stage does not reset the outer stage's peak
+    assert "peak_memory_kb" not in spans["inner"].attributes
+    assert spans["outer"].attributes["peak_memory_kb"] >= 2048
+    assert tracer.summary()["outer"]["peak_memory_kb"] == spans["outer"].attributes["peak_memory_kb"]
+    assert "profile" in spans["outer"].attributes
+
+
+def test_trace_memory_without_profile_measures_root_spans():
+    tracer = Tracer(trace_memory=True)
+    previous = set_tracer(tracer)
+    try:
+        with trace_span("pipeline"):
+            with trace_span("binding"):
+                pass
+    finally:
+        set_tracer(previous)
+
+    spans = {s.name: s for s in tracer.spans}
+    assert "peak_memory_kb" in spans["pipeline"].attributes
+    assert "peak_memory_kb" not in spans["binding"].attributes
+    assert "profile" not in spans["pipeline"].attributes
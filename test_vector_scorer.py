@@ -0,0 +1,91 @@
+import os
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from compiler.concept_index import SUBSTRING_BONUS, ConceptIndex, normalize_term
+from compiler.resolver import NUMERIC_CONCEPTS, NUMERIC_TYPES, ConceptResolver, _numeric_measure
+from compiler.vector_scorer import VectorScorer
+from discovery.indexer import extract_semantic_index
+from discovery.linguistic import generate_linguistic_metadata
+from discovery.tmdl_parser import load_tmdl_files
+from benchmarks.bench_resolver import WORDS, synthetic_concepts, synthetic_semantic_index
+
+TABLES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "PowerBI", "PowerBI-GenAI-Dashboard.SemanticModel", "definition", "tables"
+)
+
+
+def key(result):
+    return None if isinstance(result, Exception) else (result["entity"], result["column"])
+
+
+def both(linguistic, concepts):
+    return (
+        ConceptResolver(linguistic, backend="exact").resolve_concepts(concepts),
+        ConceptResolver(linguistic, backend="vector").resolve_concepts(concepts)
+    )
+
+
+def test_term_scores_keep_the_exact_scorers_bonus():
+    rng = random.Random(4)
+    terms = [normalize_term(" ".join(rng.sample(WORDS, rng.randint(1, 3)))) for _ in range(300)]
+    index = ConceptIndex({"entities": {
+        f"e{i}": {"terms": [term], "binding": {"column": f"c{i}"}} for i, term in enumerate(terms)
+    }})
+    scorer = VectorScorer(index, _numeric_measure)
+
+    for concept in [normalize_term(w) for w in WORDS] + terms[:20]:
+        scores = scorer.term_scores(concept)
+        assert ((scores >= 0) & (scores <= 1 + SUBSTRING_BONUS + 1e-6)).all()
+        for term_id, term in enumerate(index.terms):
+            if concept == term:
+                assert scores[term_id] == pytest.approx(1 + SUBSTRING_BONUS)
+            elif concept in term or term in concept:
+                # Every substring the exact scorer rewards gets the bonus here too
+                assert scores[term_id] >= SUBSTRING_BONUS
+
+
+def test_backends_agree_on_the_sample_model():
+    concepts = ["amount", "country", "product", "boxes shipped", "sales person", "date",
+                "person", "boxes", "geography", "team", "sales", "price"]
+    exact, vector = both(generate_linguistic_metadata(extract_semantic_index(load_tmdl_files(TABLES))), concepts)
+    assert {c: key(r) for c, r in vector.items()} == {c: key(r) for c, r in exact.items()}
+
+
+def test_backends_agree_on_synthetic_models():
+    for seed in range(3):
+        linguistic = generate_linguistic_metadata(synthetic_semantic_index(600, seed=seed))
+        concepts = synthetic_concepts(80, seed=seed + 1)
+        exact, vector = both(linguistic, concepts)
+
+        # A concept that equals a term scores the maximum in both backends
+        identical = [
+            c for c in concepts
+            if not isinstance(exact[c], Exception) and exact[c]["score"] >= 1 + SUBSTRING_BONUS
+        ]
+        assert identical and all(key(vector[c]) == key(exact[c]) for c in identical)
+        # Fuzzy matches are approximate (0.83-0.93 at this size)
+        assert sum(key(vector[c]) == key(exact[c]) for c in concepts) / len(concepts) >= 0.8
+
+        measures = {
+            (table, column)
+            for table, info in synthetic_semantic_index(600, seed=seed)["tables"].items()
+            for column, col in info["columns"].items()
+            if column in info["measures"] and col["dataType"] in NUMERIC_TYPES
+        }
+        for concept in NUMERIC_CONCEPTS:
+            if not isinstance(vector[concept], Exception):
+                assert key(vector[concept]) in measures
+
+
+def test_ties_break_by_metadata_order():
+    entities = {
+        f"e{i}": {"terms": [{"term": "order date", "weight": 1.0}], "binding": {"table": "T", "column": f"c{i}"}}
+        for i in range(5)
+    }
+    exact, vector = both({"entities": entities}, ["order date", "order", "date"])
+    assert {c: key(r) for c, r in vector.items()} == {c: key(r) for c, r in exact.items()}
+    assert all(key(r) == ("T", "c0") for r in vector.values())
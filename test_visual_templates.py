@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+import random
+from core.models import BoundVisual, PhysicalBinding, VisualLayout
+from backend.pbip_writer import build_visual_container, render_visual
+from backend.visual_templates import TEMPLATE_MAP, VisualTemplate
+
+TYPES = ["table", "bar", "column", "line", "pie", "card", "textbox", "unknown"]
+AGGREGATIONS = [None, "sum", "avg", "min", "max", "count"]
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_visual_templates.golden")
+
+
+def random_visual(rng, i):
+    bindings = [
+        PhysicalBinding(
+            concept_name=f"c{k}",
+            table=rng.choice(["Sales", "Dim Date", "Customers"]),
+            column=rng.choice(["Amount", "Order Date", "country_name", "Ünits"]),
+            kind=rng.choice(["dimension", "measure"]),
+            aggregation=rng.choice(AGGREGATIONS),
+            explicit_measure=rng.random() < 0.2
+        )
+        for k in range(rng.randint(0, 4))
+    ]
+    return BoundVisual(
+        visual_name=f"v{i}",
+        visual_type=rng.choice(TYPES),
+        bindings=bindings,
+        title=rng.choice(["Sales by Country", "It's \"quoted\"", "Ümsatz\nneu"]),
+        top_n=rng.choice([None, None, 5]),
+        layout=rng.choice([None, VisualLayout(x=i, y=2 * i, width=300, height=200, tabOrder=i)])
+    )
+
+
+def test_spliced_text_matches_the_dict_builder():
+    # SHA-256 of each visual.json written by the json.dumps(indent=2) builder
+    # this template engine replaced, for the same 300 seeded visuals
+    with open(GOLDEN, encoding="utf-8") as f:
+        golden = f.read().split()
+    rng = random.Random(42)
+    for i, digest in enumerate(golden):
+        visual = random_visual(rng, i)
+        text = render_visual(visual.model_copy(deep=True), i, f"name_{i}", compact=False)
+        assert hashlib.sha256(text.encode("utf-8")).hexdigest() == digest, f"visual {i} ({visual.visual_type})"
+        compact = render_visual(visual.model_copy(deep=True), i, f"name_{i}", compact=True)
+        assert compact == json.dumps(json.loads(text), separators=(",", ":"))
+        assert build_visual_container(visual.model_copy(deep=True), i, f"name_{i}") == json.loads(text)
+    assert len(golden) == 300
+
+
+def test_optional_members_are_dropped():
+    template = VisualTemplate.load(TEMPLATE_MAP["column"])
+    assert set(template.slot_names) >= {"name", "queryState", "sortDefinition", "filterConfig"}
+    container = json.loads(template.render({
+        "name": "n", "x": 1, "y": 2, "width": 3, "height": 4, "tabOrder": 5,
+        "visualType": "columnChart", "queryState": {}, "sortDefinition": None,
+        "filterConfig": {}, "titleLiteral": "'t'"
+    }))
+    assert "sortDefinition" not in container["visual"]["query"]
+    assert "filterConfig" not in container
+    assert container["position"] == {"x": 1, "y": 2, "z": 0, "width": 3, "height": 4, "tabOrder": 5}
+
+
+def test_templates_carry_the_constant_objects():
+    rng = random.Random(5)
+    visual = random_visual(rng, 1)
+    visual.visual_type = "card"
+    card = build_visual_container(visual, 1, "card")
+    assert card["visual"]["visualType"] == "cardVisual"
+    assert "cardCalloutArea" in card["visual"]["objects"]
+    assert "padding" in card["visual"]["visualContainerObjects"]
+
+    visual.visual_type = "textbox"
+    textbox = build_visual_container(visual, 1, "header")
+    run = textbox["visual"]["objects"]["general"][0]["properties"]["paragraphs"][0]["textRuns"][0]
+    assert run["value"] == visual.title
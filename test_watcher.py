@@ -0,0 +1,138 @@
+import os
+import shutil
+import time
+from unittest.mock import patch
+from compiler.resolver import ConceptResolver
+from discovery.indexer import extract_semantic_index
+from discovery.linguistic import generate_linguistic_metadata
+from discovery.model_cache import load_semantic_model
+from discovery.tmdl_parser import load_tmdl_files
+from discovery.watcher import IncrementalModel, TableWatcher
+from benchmarks.synthetic_tmdl import write_synthetic_model
+
+TABLES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "PowerBI", "PowerBI-GenAI-Dashboard.SemanticModel", "definition", "tables"
+)
+
+
+def _full_rebuild(tmdl_root):
+    index = extract_semantic_index(load_tmdl_files(tmdl_root))
+    return index, generate_linguistic_metadata(index)
+
+
+def _positions(index):
+    """(entity, term) in tie-break order; the position values themselves may differ."""
+    occurrences = sorted((o[0], o[2], index.terms[term_id]) for term_id, occs in index.occurrences.items() for o in occs)
+    return [(entity_id, term) for _, entity_id, term in occurrences]
+
+
+def test_patch_matches_full_rebuild(tmp_path):
+    tmdl_root = str(tmp_path / "tables")
+    shutil.copytree(TABLES, tmdl_root)
+
+    tables = load_tmdl_files(tmdl_root)
+    index = extract_semantic_index(tables)
+    linguistic = generate_linguistic_metadata(index)
+    model = IncrementalModel(tmdl_root, tables, index, linguistic)
+    resolver = ConceptResolver(linguistic)
+    model.register_resolver(resolver)
+    watcher = TableWatcher(model)
+
+    assert resolver.resolve("amount")["column"] == "Amount"
+    assert watcher.poll() is None
+
+    # Rename a measure column in one table
+    path = os.path.join(tmdl_root, "data.tmdl")
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace("column Amount", "column 'Sales Revenue'"))
+
+    result = watcher.poll()
+    assert result["tables"] == ["data"]
+
+    expected_index, expected_linguistic = _full_rebuild(tmdl_root)
+    assert index == expected_index
+    assert linguistic == expected_linguistic
+
+    # Patched resolver == one built from scratch on the patched metadata
+    fresh = ConceptResolver(expected_linguistic)
+    assert _positions(resolver.index) == _positions(fresh.index)
+    concepts = ["amount", "revenue", "country", "product", "date", "boxes shipped"]
+    assert (
+        {c: str(r) for c, r in resolver.resolve_concepts(concepts).items()}
+        == {c: str(r) for c, r in fresh.resolve_concepts(concepts).items()}
+    )
+    assert resolver.resolve("revenue")["column"] == "Sales Revenue"
+
+    # Deleting the file drops the table and its entities
+    os.remove(path)
+    watcher.poll()
+    assert "data" not in index["tables"]
+    assert not any(key.startswith("data.") for key in linguistic["entities"])
+    assert index == _full_rebuild(tmdl_root)[0]
+
+
+def test_compact_model_is_patched_through_its_store(tmp_path):
+    tmdl_root = str(tmp_path / "tables")
+    shutil.copytree(TABLES, tmdl_root)
+
+    cache = str(tmp_path / "cache.json")
+    load_semantic_model(tmdl_root, cache, compact=True)
+    # Warm start: the store comes from the cached dicts, terms are not derived again
+    with patch("discovery.semantic_store._expand_terms", side_effect=AssertionError("re-derived")):
+        tables, index, linguistic = load_semantic_model(tmdl_root, cache, compact=True)
+
+    model = IncrementalModel(tmdl_root, tables, index, linguistic)
+    resolver = ConceptResolver(linguistic)
+    model.register_resolver(resolver)
+    watcher = TableWatcher(model)
+
+    path = os.path.join(tmdl_root, "data.tmdl")
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace("column Amount", "column 'Sales Revenue'"))
+    assert watcher.poll()["tables"] == ["data"]
+
+    expected_index, expected_linguistic = _full_rebuild(tmdl_root)
+    assert index.to_dict() == expected_index
+    assert linguistic.to_dict() == expected_linguistic
+    assert _positions(resolver.index) == _positions(ConceptResolver(expected_linguistic).index)
+    assert resolver.resolve("revenue")["column"] == "Sales Revenue"
+
+
+def test_one_table_patch_does_not_scale_with_the_model(tmp_path):
+    model_dir = write_synthetic_model(str(tmp_path / "Synthetic.SemanticModel"), 20000, columns_per_table=40, seed=5)
+    tmdl_root = model_dir["tables_path"]
+
+    tables = load_tmdl_files(tmdl_root)
+    index = extract_semantic_index(tables)
+    linguistic = generate_linguistic_metadata(index)
+    model = IncrementalModel(tmdl_root, tables, index, linguistic)
+
+    started = time.perf_counter()
+    resolver = ConceptResolver(linguistic)
+    resolver.resolve_concepts(["amount", "quantity"])
+    cold = time.perf_counter() - started
+    model.register_resolver(resolver)
+
+    file = sorted(model.files)[len(model.files) // 2]
+    path = os.path.join(tmdl_root, file)
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace("column ", "column Patched", 1))
+
+    started = time.perf_counter()
+    result = model.apply(changed=[file])
+    resolver.resolve_concepts(["amount", "quantity"])
+    patched = time.perf_counter() - started
+
+    assert result["tables"] == [model.files[file]]
+    assert len(model.files) >= 400
+    # One table out of hundreds: far below a rebuild even on a noisy machine
+    assert patched < cold / 10, (patched, cold)
+    fresh = ConceptResolver(generate_linguistic_metadata(extract_semantic_index(load_tmdl_files(tmdl_root))))
+    assert _positions(resolver.index) == _positions(fresh.index)